@@ -0,0 +1,66 @@
+"""Benchmark per-branch context isolation for fork steps.
+
+Compares giving every branch a deep copy of the context data with copy-on-write
+branch contexts, for 2- to 64-way forks over context data of different sizes. Each
+branch reads one key and writes one key, then the branches are merged back.
+
+Usage: python -m benchmarks.fork [--widths 2 8 32 64] [--keys 10 1000 10000]
+"""
+import argparse
+import copy
+import time
+from typing import Callable
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
+
+
+def make_context(keys: int) -> BaseContext:
+    data = {f"key_{i}": {"value": i, "tags": [f"tag_{i}"]} for i in range(keys)}
+    return BaseContext(visited_steps=[], data=data, embedding_memo=EmbeddingMemo())
+
+
+def deep_copy_fork(context: BaseContext, width: int) -> None:
+    branches = []
+    for i in range(width):
+        branch = BaseContext(visited_steps=[], data=copy.deepcopy(context.data), embedding_memo=context.embedding_memo)
+        branch.data[f"branch_{i}"] = branch.data["key_0"]
+        branches.append(branch)
+    for i, branch in enumerate(branches):
+        context.data[f"branch_{i}"] = branch.data[f"branch_{i}"]
+
+
+def overlay_fork(context: BaseContext, width: int) -> None:
+    branches = [context.branch() for _ in range(width)]
+    for i, branch in enumerate(branches):
+        branch.data[f"branch_{i}"] = branch.data["key_0"]
+    context.merge(*branches, strategy="overwrite")
+
+
+def timed(fork: Callable[[BaseContext, int], None], keys: int, width: int, runs: int) -> float:
+    total = 0.0
+    for _ in range(runs):
+        context = make_context(keys)
+        start = time.perf_counter()
+        fork(context, width)
+        total += time.perf_counter() - start
+    return total / runs * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--widths", type=int, nargs="+", default=[2, 8, 32, 64])
+    parser.add_argument("--keys", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'keys':>7} {'width':>6} {'deepcopy ms':>12} {'overlay ms':>11}")
+    for keys in args.keys:
+        for width in args.widths:
+            deep = timed(deep_copy_fork, keys, width, args.runs)
+            overlay = timed(overlay_fork, keys, width, args.runs)
+            print(f"{keys:>7} {width:>6} {deep:>12.3f} {overlay:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
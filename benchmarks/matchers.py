@@ -0,0 +1,68 @@
+"""Benchmark pattern matching of tool names: per-matcher Python, compiled Python and Rust.
+
+The Rust rows need the rust_core/tag_matcher extension (rust_tag_matcher) installed.
+
+Usage: python -m benchmarks.matchers [--names 1000 10000] [--patterns 50]
+"""
+import argparse
+import random
+import string
+import time
+from typing import Callable
+
+from vogonpoetry.utils.matcher_set import MatcherSet, rust_available
+from vogonpoetry.utils.pattern_matcher import MatcherString, PatternMatcher
+
+WORDS = ["get", "set", "list", "search", "read", "write", "delete", "file", "web", "home", "light", "media", "play", "user"]
+
+
+def synthetic_names(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "_".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + "".join(rng.choices(string.digits, k=2))
+        for _ in range(count)
+    ]
+
+
+def synthetic_patterns(count: int, seed: int = 1) -> list[PatternMatcher]:
+    rng = random.Random(seed)
+    patterns = []
+    for i in range(count):
+        a, b = rng.choice(WORDS), rng.choice(WORDS)
+        patterns.append([f"{a}_*_{b}*", f"{a}_{b}", f"r'^{a}_(?:{b}|x)\\d+$'"][i % 3])
+    return [PatternMatcher(pattern=MatcherString(pattern)) for pattern in patterns]
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--patterns", type=int, default=50)
+    args = parser.parse_args()
+
+    matchers = synthetic_patterns(args.patterns)
+    backends = ["python", "rust"] if rust_available() else ["python"]
+    print(f"{'names':>8} {'path':>18} {'ms':>10}")
+    for count in args.names:
+        names = synthetic_names(count)
+        expected = [any(matcher.matches(name) for matcher in matchers) for name in names]
+        ms = timed(lambda: [any(matcher.matches(name) for matcher in matchers) for name in names])
+        print(f"{count:>8} {'per-matcher':>18} {ms:>10.2f}")
+        for backend in backends:
+            # Fresh sets so the memo does not answer from an earlier run.
+            compiled = MatcherSet(matchers, max_entries=0, backend=backend)  # type: ignore[arg-type]
+            ms = timed(lambda: compiled.matches_many(names))
+            assert compiled.matches_many(names) == expected
+            print(f"{count:>8} {backend + ' batch':>18} {ms:>10.2f}")
+            compiled = MatcherSet(matchers, max_entries=0, backend=backend)  # type: ignore[arg-type]
+            ms = timed(lambda: [compiled.matches(name) for name in names])
+            print(f"{count:>8} {backend + ' single':>18} {ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark the per-run overhead of the pipeline engine with no-op steps.
+
+Steps are arranged as a chain (each step requires the previous one), fanned out (no
+requirements) or layered (each step requires two steps of the previous layer of 10).
+
+Usage: python -m benchmarks.pipeline [--sizes 10 100 1000] [--runs 20]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+import structlog
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
+from vogonpoetry.metrics import MetricsCollection
+from vogonpoetry.pipeline.pipeline import Pipeline, run_steps
+from vogonpoetry.pipeline.steps.dummy import DummyConfiguration, DummyStep
+
+
+def chain(i: int) -> Optional[list[str]]:
+    return [f"s{i - 1}"] if i else None
+
+
+def fan(i: int) -> Optional[list[str]]:
+    return None
+
+
+def layered(i: int, width: int = 10) -> Optional[list[str]]:
+    layer = i // width
+    if layer == 0:
+        return None
+    base = (layer - 1) * width
+    return [f"s{base + i % width}", f"s{base + (i + 1) % width}"]
+
+
+SHAPES: dict[str, Callable[[int], Optional[list[str]]]] = {"chain": chain, "fan": fan, "layered": layered}
+
+
+def build(size: int, requires: Callable[[int], Optional[list[str]]]) -> Pipeline:
+    steps = [DummyStep(id=f"s{i}", requires=requires(i), output_key=f"s{i}", options=DummyConfiguration()) for i in range(size)]
+    return Pipeline(id=f"bench-{size}", steps=steps)  # type: ignore[arg-type]
+
+
+async def per_run_ms(pipeline: Pipeline, runs: int) -> float:
+    total = 0.0
+    for _ in range(runs):
+        context = BaseContext(visited_steps=[], data={}, metrics=MetricsCollection(), embedding_memo=EmbeddingMemo())
+        start = time.perf_counter()
+        await run_steps(pipeline, context, pipeline.steps)
+        total += time.perf_counter() - start
+    return total / runs * 1e3
+
+
+async def run(sizes: list[int], runs: int) -> None:
+    print(f"{'steps':>6} {'shape':>8} {'compile ms':>11} {'run ms':>9} {'us/step':>8}")
+    for size in sizes:
+        for name, requires in SHAPES.items():
+            start = time.perf_counter()
+            pipeline = build(size, requires)
+            compile_ms = (time.perf_counter() - start) * 1e3
+            ms = await per_run_ms(pipeline, runs)
+            print(f"{size:>6} {name:>8} {compile_ms:>11.2f} {ms:>9.2f} {ms / size * 1e3:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    # The steps log at info level on every run, which would dominate the timings.
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(run(args.sizes, args.runs))
+
+
+if __name__ == "__main__":
+    main()
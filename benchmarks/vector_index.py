@@ -0,0 +1,63 @@
+"""Benchmark approximate vector search against exact search on synthetic catalogs.
+
+Usage: python -m benchmarks.vector_index [--sizes 1000 10000 100000] [--dim 384]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from vogonpoetry.index.base import BaseVectorIndex, normalize
+from vogonpoetry.index.exact import ExactVectorIndex
+from vogonpoetry.index.ivf import IVFVectorIndex
+
+
+def synthetic_catalog(size: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered catalog, loosely shaped like tag and tool description embeddings."""
+    rng = np.random.default_rng(seed)
+    clusters = max(8, size // 100)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(clusters, size=size)] + 0.3 * rng.normal(size=(size, dim))
+    return normalize(points)
+
+
+def run(index: BaseVectorIndex, queries: np.ndarray, k: int) -> tuple[list[np.ndarray], float]:
+    start = time.perf_counter()
+    results = [index.search(query, k=k)[0] for query in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'index':>12} {'build ms':>10} {'query ms':>10} {'recall@' + str(args.k):>10}")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size, args.dim)
+        rng = np.random.default_rng(1)
+        queries = normalize(catalog[rng.integers(size, size=args.queries)] + 0.2 * rng.normal(size=(args.queries, args.dim)))
+
+        exact = ExactVectorIndex()
+        start = time.perf_counter()
+        exact.build(catalog)
+        build_ms = (time.perf_counter() - start) * 1e3
+        expected, query_ms = run(exact, queries, args.k)
+        print(f"{size:>8} {'exact':>12} {build_ms:>10.1f} {query_ms:>10.3f} {1.0:>10.3f}")
+
+        for n_probe in args.n_probe:
+            ivf = IVFVectorIndex(n_probe=n_probe, min_size=0)
+            start = time.perf_counter()
+            ivf.build(catalog)
+            build_ms = (time.perf_counter() - start) * 1e3
+            found, query_ms = run(ivf, queries, args.k)
+            recall = np.mean([np.intersect1d(f, e).size / e.size for f, e in zip(found, expected)])
+            print(f"{size:>8} {'ivf/' + str(n_probe):>12} {build_ms:>10.1f} {query_ms:>10.3f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,200 @@
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
-use pyo3::types::PyList;
 use aho_corasick::AhoCorasick;
-use globset::{Glob, GlobSetBuilder};
-use regex::Regex;
+use globset::{Glob, GlobBuilder, GlobSet, GlobSetBuilder};
+use regex::{RegexSet, RegexSetBuilder};
 
-#[pyfunction]
-fn match_tags(text: &str, patterns: Vec<String>) -> PyResult<Vec<String>> {
-    let mut matched = Vec::new();
-
-    let mut builder = GlobSetBuilder::new();
-    for pattern in &patterns {
-        let glob = Glob::new(pattern).unwrap_or_else(|_| Glob::new("*").unwrap());
-        builder.add(glob);
-    }
-    let globset = builder.build().unwrap();
-
-    if globset.is_match(text) {
-        for pattern in &patterns {
-            let glob = Glob::new(pattern).unwrap_or_else(|_| Glob::new("*").unwrap());
-            let re_str = glob.regex().to_string();
-            let re = Regex::new(&re_str).unwrap_or_else(|_| Regex::new(".*").unwrap());
-            if re.is_match(text) {
-                matched.push(pattern.clone());
+/// How a pattern is matched against a text.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum PatternKind {
+    /// Shell glob, matched against the whole text.
+    Glob,
+    /// Regular expression, matched anywhere in the text.
+    Regex,
+    /// Literal substring.
+    Literal,
+}
+
+impl PatternKind {
+    pub fn parse(kind: &str) -> Result<Self, String> {
+        match kind {
+            "glob" => Ok(PatternKind::Glob),
+            "regex" => Ok(PatternKind::Regex),
+            "literal" | "snake" => Ok(PatternKind::Literal),
+            other => Err(format!("Unknown pattern kind: {}", other)),
+        }
+    }
+}
+
+/// A pattern list compiled once into a glob set, a regex set and an Aho-Corasick
+/// automaton. Matching reports the indices of the patterns, in the order given.
+pub struct TagMatcher {
+    patterns: Vec<String>,
+    globs: GlobSet,
+    glob_ids: Vec<usize>,
+    regexes: RegexSet,
+    regex_ids: Vec<usize>,
+    literals: AhoCorasick,
+    literal_ids: Vec<usize>,
+}
+
+impl TagMatcher {
+    pub fn new(patterns: &[String], kinds: &[PatternKind]) -> Result<Self, String> {
+        TagMatcher::with_case(patterns, kinds, true)
+    }
+
+    /// Compile the patterns, ignoring case unless ``case_sensitive``. Literals only
+    /// ignore ASCII case.
+    pub fn with_case(patterns: &[String], kinds: &[PatternKind], case_sensitive: bool) -> Result<Self, String> {
+        if patterns.len() != kinds.len() {
+            return Err("Expected one kind per pattern.".to_string());
+        }
+        let mut globs = GlobSetBuilder::new();
+        let mut glob_ids = Vec::new();
+        let mut regexes = Vec::new();
+        let mut regex_ids = Vec::new();
+        let mut literals = Vec::new();
+        let mut literal_ids = Vec::new();
+        for (id, (pattern, kind)) in patterns.iter().zip(kinds).enumerate() {
+            match kind {
+                PatternKind::Glob => {
+                    let glob = GlobBuilder::new(pattern)
+                        .case_insensitive(!case_sensitive)
+                        .build()
+                        .map_err(|e| e.to_string())?;
+                    globs.add(glob);
+                    glob_ids.push(id);
+                }
+                PatternKind::Regex => {
+                    regexes.push(pattern.as_str());
+                    regex_ids.push(id);
+                }
+                PatternKind::Literal => {
+                    literals.push(pattern.as_str());
+                    literal_ids.push(id);
+                }
             }
         }
+        Ok(TagMatcher {
+            patterns: patterns.to_vec(),
+            globs: globs.build().map_err(|e| e.to_string())?,
+            glob_ids,
+            regexes: RegexSetBuilder::new(&regexes)
+                .case_insensitive(!case_sensitive)
+                .build()
+                .map_err(|e| e.to_string())?,
+            regex_ids,
+            literals: AhoCorasick::builder()
+                .ascii_case_insensitive(!case_sensitive)
+                .build(&literals)
+                .map_err(|e| e.to_string())?,
+            literal_ids,
+        })
+    }
+
+    pub fn globs(patterns: &[String]) -> Result<Self, String> {
+        TagMatcher::new(patterns, &vec![PatternKind::Glob; patterns.len()])
+    }
+
+    pub fn patterns(&self) -> &[String] {
+        &self.patterns
+    }
+
+    pub fn is_match(&self, text: &str) -> bool {
+        self.literals.is_match(text) || self.globs.is_match(text) || self.regexes.is_match(text)
+    }
+
+    /// Indices of all patterns matching the text, sorted.
+    pub fn matches(&self, text: &str) -> Vec<usize> {
+        let mut matched: Vec<usize> = Vec::new();
+        matched.extend(self.globs.matches(text).into_iter().map(|i| self.glob_ids[i]));
+        matched.extend(self.regexes.matches(text).into_iter().map(|i| self.regex_ids[i]));
+        matched.extend(
+            self.literals
+                .find_overlapping_iter(text)
+                .map(|m| self.literal_ids[m.pattern().as_usize()]),
+        );
+        matched.sort_unstable();
+        matched.dedup();
+        matched
+    }
+
+    pub fn is_match_batch(&self, texts: &[String]) -> Vec<bool> {
+        texts.iter().map(|text| self.is_match(text)).collect()
+    }
+
+    pub fn match_batch(&self, texts: &[String]) -> Vec<Vec<usize>> {
+        texts.iter().map(|text| self.matches(text)).collect()
+    }
+}
+
+/// A pattern list compiled once, reusable across calls and threads.
+#[pyclass(frozen, module = "rust_tag_matcher")]
+struct CompiledMatcher {
+    inner: TagMatcher,
+}
+
+#[pymethods]
+impl CompiledMatcher {
+    /// Compile the patterns; ``kinds`` gives "glob", "regex" or "literal" per pattern
+    /// and defaults to all globs.
+    #[new]
+    #[pyo3(signature = (patterns, kinds=None, case_sensitive=true))]
+    fn new(patterns: Vec<String>, kinds: Option<Vec<String>>, case_sensitive: bool) -> PyResult<Self> {
+        let kinds = match kinds {
+            Some(kinds) => kinds
+                .iter()
+                .map(|kind| PatternKind::parse(kind))
+                .collect::<Result<Vec<_>, _>>()
+                .map_err(PyValueError::new_err)?,
+            None => vec![PatternKind::Glob; patterns.len()],
+        };
+        TagMatcher::with_case(&patterns, &kinds, case_sensitive)
+            .map(|inner| CompiledMatcher { inner })
+            .map_err(PyValueError::new_err)
+    }
+
+    #[getter]
+    fn patterns(&self) -> Vec<String> {
+        self.inner.patterns().to_vec()
+    }
+
+    fn __len__(&self) -> usize {
+        self.inner.patterns().len()
+    }
+
+    fn is_match(&self, text: &str) -> bool {
+        self.inner.is_match(text)
+    }
+
+    fn matches(&self, text: &str) -> Vec<usize> {
+        self.inner.matches(text)
     }
 
+    /// Whether any pattern matches, for each text. Runs without the GIL.
+    fn is_match_batch(&self, py: Python<'_>, texts: Vec<String>) -> Vec<bool> {
+        py.allow_threads(|| self.inner.is_match_batch(&texts))
+    }
+
+    /// Indices of the matching patterns, for each text. Runs without the GIL.
+    fn match_batch(&self, py: Python<'_>, texts: Vec<String>) -> Vec<Vec<usize>> {
+        py.allow_threads(|| self.inner.match_batch(&texts))
+    }
+}
+
+#[pyfunction]
+pub fn match_tags(text: &str, patterns: Vec<String>) -> PyResult<Vec<String>> {
+    // Invalid globs have always matched everything.
+    let globs: Vec<String> = patterns
+        .iter()
+        .map(|pattern| if Glob::new(pattern).is_ok() { pattern.clone() } else { "*".to_string() })
+        .collect();
+    let matcher = TagMatcher::globs(&globs).map_err(PyValueError::new_err)?;
+    let mut matched: Vec<String> = matcher
+        .matches(text)
+        .into_iter()
+        .map(|i| patterns[i].clone())
+        .collect();
     matched.sort();
     matched.dedup();
     Ok(matched)
@@ -34,5 +203,64 @@ fn match_tags(text: &str, patterns: Vec<String>) -> PyResult<Vec<String>> {
 #[pymodule]
 fn rust_tag_matcher(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(match_tags, m)?)?;
+    m.add_class::<CompiledMatcher>()?;
     Ok(())
-}
\ No newline at end of file
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn strings(values: &[&str]) -> Vec<String> {
+        values.iter().map(|value| value.to_string()).collect()
+    }
+
+    fn matcher(patterns: &[&str], kinds: &[PatternKind]) -> TagMatcher {
+        TagMatcher::new(&strings(patterns), kinds).unwrap()
+    }
+
+    #[test]
+    fn reports_matching_pattern_indices_in_order() {
+        let matcher = matcher(
+            &["get_*", "web", r"\d+"],
+            &[PatternKind::Glob, PatternKind::Literal, PatternKind::Regex],
+        );
+        assert_eq!(matcher.matches("get_web"), vec![0, 1]);
+        assert_eq!(matcher.matches("x1"), vec![2]);
+        assert!(matcher.matches("other").is_empty());
+    }
+
+    #[test]
+    fn globs_match_the_whole_text() {
+        let matcher = TagMatcher::globs(&strings(&["foo*bar"])).unwrap();
+        assert!(matcher.is_match("foo_bar"));
+        assert!(!matcher.is_match("xfoo_bar"));
+    }
+
+    #[test]
+    fn batches_agree_with_single_matches() {
+        let matcher = matcher(&["web", "get_*"], &[PatternKind::Literal, PatternKind::Glob]);
+        let texts = strings(&["search_web", "get_x", "other"]);
+        assert_eq!(matcher.is_match_batch(&texts), vec![true, true, false]);
+        assert_eq!(matcher.match_batch(&texts), vec![vec![0], vec![1], vec![]]);
+    }
+
+    #[test]
+    fn case_insensitive_patterns_ignore_case() {
+        let patterns = strings(&["Netflix", r"\bTV\b", "Get_*"]);
+        let kinds = [PatternKind::Literal, PatternKind::Regex, PatternKind::Glob];
+        let insensitive = TagMatcher::with_case(&patterns, &kinds, false).unwrap();
+        assert_eq!(insensitive.matches("open netflix on the tv"), vec![0, 1]);
+        assert_eq!(insensitive.matches("GET_WEATHER"), vec![2]);
+        let sensitive = TagMatcher::new(&patterns, &kinds).unwrap();
+        assert!(sensitive.matches("open netflix on the tv").is_empty());
+    }
+
+    #[test]
+    fn rejects_invalid_patterns_and_kinds() {
+        assert!(TagMatcher::new(&strings(&["a"]), &[]).is_err());
+        assert!(TagMatcher::new(&strings(&["("]), &[PatternKind::Regex]).is_err());
+        assert!(PatternKind::parse("fuzzy").is_err());
+        assert_eq!(PatternKind::parse("snake"), Ok(PatternKind::Literal));
+    }
+}
@@ -1,4 +1,4 @@
-use rust_tag_matcher::match_tags;
+use rust_tag_matcher::TagMatcher;
 use serde::{Deserialize, Serialize};
 use std::io::{self, Read};
 
@@ -18,13 +18,14 @@ fn main() -> anyhow::Result<()> {
     io::stdin().read_to_string(&mut buffer)?;
     let input: MatchInput = serde_json::from_str(&buffer)?;
 
-    let results = input
-        .texts
-        .iter()
-        .map(|text| match_tags(text, &input.patterns))
+    let matcher = TagMatcher::globs(&input.patterns).map_err(anyhow::Error::msg)?;
+    let results = matcher
+        .match_batch(&input.texts)
+        .into_iter()
+        .map(|ids| ids.into_iter().map(|i| input.patterns[i].clone()).collect())
         .collect();
 
     let output = MatchOutput { results };
     println!("{}", serde_json::to_string(&output)?);
     Ok(())
-}
\ No newline at end of file
+}
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.embedders.batching import BatchingConfig, EmbeddingBatcher
+from vogonpoetry.metrics import MetricsCollection
+
+
+class RecordingEmbedder(BaseEmbedder):
+    batches: list = []
+
+    async def _embed(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0)
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_batched():
+    embedder = RecordingEmbedder(name="rec", batches=[], batching=BatchingConfig(max_batch_size=10, max_wait_ms=5))
+    results = await asyncio.gather(*[embedder.embed(["x" * i]) for i in range(1, 5)])
+    assert results == [[[1.0]], [[2.0]], [[3.0]], [[4.0]]]
+    assert embedder.batches == [["x", "xx", "xxx", "xxxx"]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_dispatches_without_waiting():
+    embedder = RecordingEmbedder(name="rec", batches=[], batching=BatchingConfig(max_batch_size=2, max_wait_ms=10_000))
+    results = await asyncio.wait_for(asyncio.gather(embedder.embed(["a"]), embedder.embed(["bb"])), timeout=1)
+    assert results == [[[1.0]], [[2.0]]]
+    assert embedder.batches == [["a", "bb"]]
+
+
+@pytest.mark.asyncio
+async def test_large_calls_bypass_queue_in_full_batches():
+    embedder = RecordingEmbedder(name="rec", batches=[], batching=BatchingConfig(max_batch_size=2, max_wait_ms=10_000))
+    assert await embedder.embed(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert embedder.batches == [["a", "bb"], ["ccc"]]
+
+
+@pytest.mark.asyncio
+async def test_batches_never_exceed_max_batch_size():
+    embedder = RecordingEmbedder(name="rec", batches=[], batching=BatchingConfig(max_batch_size=4, max_wait_ms=5))
+    results = await asyncio.gather(embedder.embed(["a", "b", "c"]), embedder.embed(["d", "e"]))
+    assert results == [[[1.0]] * 3, [[1.0]] * 2]
+    assert embedder.batches == [["a", "b", "c"], ["d", "e"]]
+
+
+@pytest.mark.asyncio
+async def test_calls_with_options_bypass_the_batcher():
+    embedder = RecordingEmbedder(name="rec", batches=[], batching=BatchingConfig(max_batch_size=10, max_wait_ms=10_000))
+    assert await asyncio.wait_for(embedder.embed(["a"], normalize=True), timeout=1) == [[1.0]]
+
+
+@pytest.mark.asyncio
+async def test_errors_fan_out_to_all_callers():
+    async def failing(texts):
+        raise RuntimeError("boom")
+
+    batcher = EmbeddingBatcher("failing", failing, BatchingConfig(max_batch_size=10, max_wait_ms=1))
+    results = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["b"]), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_metrics_are_recorded():
+    embedder = RecordingEmbedder(name="rec", batches=[], batching=BatchingConfig(max_batch_size=10, max_wait_ms=1))
+    metrics = MetricsCollection()
+    await asyncio.gather(embedder.embed(["a"], metrics=metrics), embedder.embed(["b"], metrics=metrics))
+    names = [metric.name for metric in metrics.get_all_metrics()]
+    assert names.count("vogonpoetry.embedder.batch_size") == 2
+    assert names.count("vogonpoetry.embedder.queue_wait") == 2
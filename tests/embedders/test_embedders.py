@@ -7,7 +7,7 @@ from vogonpoetry.embedders.local import LocalEmbedder
 from vogonpoetry.embedders.remote import RemoteEmbedder
 
 
-@patch("vogonpoetry.embedders.local.SentenceTransformer", new=DummySentenceTransformer)
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=DummySentenceTransformer)
 def test_embedder_typeadapter_local():
     data = {"name": "My Test Embedder", "type": "local", "model_name": "my_model"}
     embedder = EmbedderTypeAdapter.validate_python(data)
@@ -0,0 +1,79 @@
+import pytest
+from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.embedders.cache import EmbeddingCache
+
+
+class CountingEmbedder(BaseEmbedder):
+    calls: list = []
+
+    async def _embed(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_cache_put_and_get(tmp_path):
+    cache = EmbeddingCache(tmp_path, "embedder", "model")
+    cache.put(["foo", "barbaz"], [[1.0, 2.0], [3.0, 4.0]])
+    hits = cache.get(["barbaz", "missing", "foo"])
+    assert hits[0] is not None and list(hits[0]) == [3.0, 4.0]
+    assert hits[1] is None
+    assert hits[2] is not None and list(hits[2]) == [1.0, 2.0]
+    assert len(cache) == 2
+
+
+def test_cache_is_shared_between_instances(tmp_path):
+    writer = EmbeddingCache(tmp_path, "embedder", "model")
+    reader = EmbeddingCache(tmp_path, "embedder", "model")
+    assert reader.get(["foo"]) == [None]
+    writer.put(["foo"], [[1.0, 2.0]])
+    hit = reader.get(["foo"])[0]
+    assert hit is not None and list(hit) == [1.0, 2.0]
+
+
+def test_cache_namespaces_are_isolated(tmp_path):
+    EmbeddingCache(tmp_path, "embedder", "model-a").put(["foo"], [[1.0]])
+    assert EmbeddingCache(tmp_path, "embedder", "model-b").get(["foo"]) == [None]
+
+
+def test_cache_ignores_partial_index_line(tmp_path):
+    cache = EmbeddingCache(tmp_path, "embedder", "model")
+    cache.put(["foo"], [[1.0]])
+    with open(cache.path / EmbeddingCache.INDEX_FILE, "a") as f:
+        f.write('["abc", "seg"')
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_embedder_only_embeds_misses(tmp_path):
+    embedder = CountingEmbedder(name="counting", cache_dir=str(tmp_path), calls=[])
+    first = await embedder.embed(["a", "bb"], persist=True)
+    second = await embedder.embed(["bb", "ccc", "a"], persist=True)
+    assert [list(v) for v in first] == [[1.0, 1.0], [2.0, 1.0]]
+    assert [list(v) for v in second] == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert embedder.calls == [["a", "bb"], ["ccc"]]
+
+
+@pytest.mark.asyncio
+async def test_embedder_without_cache_dir():
+    embedder = CountingEmbedder(name="counting", calls=[])
+    await embedder.embed(["a"])
+    await embedder.embed(["a"])
+    assert embedder.calls == [["a"], ["a"]]
+
+
+@pytest.mark.asyncio
+async def test_embedder_only_persists_when_asked(tmp_path):
+    embedder = CountingEmbedder(name="counting", cache_dir=str(tmp_path), calls=[])
+    await embedder.embed(["turn off the lights"])
+    await embedder.embed(["turn off the lights"])
+    assert len(embedder.calls) == 2
+    assert len(EmbeddingCache(tmp_path, "counting", "")) == 0
+
+
+@pytest.mark.asyncio
+async def test_embed_options_are_part_of_the_key(tmp_path):
+    embedder = CountingEmbedder(name="counting", cache_dir=str(tmp_path), calls=[])
+    await embedder.embed(["a"], persist=True)
+    await embedder.embed(["a"], persist=True, normalize=True)
+    await embedder.embed(["a"], persist=True, normalize=True)
+    assert embedder.calls == [["a"], ["a"]]
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
+
+
+class SlowEmbedder:
+    name = "slow"
+    embedding_model = "model"
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def embed(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("boom")
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_embed():
+    memo = EmbeddingMemo()
+    embedder = SlowEmbedder()
+    results = await asyncio.gather(*[memo.embed(embedder, "hello") for _ in range(5)])  # type: ignore
+    assert results == [[5.0]] * 5
+    assert embedder.calls == [["hello"]]
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest():
+    memo = EmbeddingMemo(max_entries=2)
+    embedder = SlowEmbedder()
+    for text in ["a", "b", "a", "c"]:
+        await memo.embed(embedder, text)  # type: ignore
+    assert EmbeddingMemo.key(embedder, "a") in memo  # type: ignore
+    assert EmbeddingMemo.key(embedder, "b") not in memo  # type: ignore
+    assert len(memo) == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_memoized():
+    memo = EmbeddingMemo()
+    embedder = SlowEmbedder(fail=True)
+    with pytest.raises(RuntimeError):
+        await memo.embed(embedder, "x")  # type: ignore
+    with pytest.raises(RuntimeError):
+        await memo.embed(embedder, "x")  # type: ignore
+    assert len(embedder.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_context_embed_is_request_scoped():
+    memo = EmbeddingMemo()
+    embedder = SlowEmbedder()
+    context = BaseContext(embedding_memo=memo)
+    first = await context.embed(embedder, "hi")  # type: ignore
+    memo.clear()
+    second = await context.embed(embedder, "hi")  # type: ignore
+    assert first == second == [2.0]
+    assert embedder.calls == [["hi"]]
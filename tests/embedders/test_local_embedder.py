@@ -1,6 +1,14 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from vogonpoetry.embedders.local import LocalEmbedder
+from vogonpoetry.embedders.models import model_registry
+
+
+@pytest.fixture(autouse=True)
+def clear_model_registry():
+    model_registry.clear()
+    yield
+    model_registry.clear()
 
 
 class Tensor:
@@ -22,7 +30,7 @@ class DummySentenceTransformer:
         return [Tensor([0.1 * i for i in range(3)]) for i in range(len(texts))]
 
 
-@patch("vogonpoetry.embedders.local.SentenceTransformer", new=DummySentenceTransformer)
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=DummySentenceTransformer)
 @patch("vogonpoetry.embedders.local.logger")
 @pytest.mark.asyncio
 async def test_local_embedder_embed(mock_logger):
@@ -39,7 +47,7 @@ async def test_local_embedder_embed(mock_logger):
     )
 
 
-@patch("vogonpoetry.embedders.local.SentenceTransformer", new=DummySentenceTransformer)
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=DummySentenceTransformer)
 @patch("vogonpoetry.embedders.local.logger")
 @pytest.mark.asyncio
 async def test_local_embedder_embed_single_encoding(mock_logger):
@@ -49,7 +57,7 @@ async def test_local_embedder_embed_single_encoding(mock_logger):
             return Tensor([0.5, 0.6, 0.7])
 
     with patch(
-        "vogonpoetry.embedders.local.SentenceTransformer", new=SingleEncodingDummy
+        "vogonpoetry.embedders.models.load_sentence_transformer", new=SingleEncodingDummy
     ):
         embedder = LocalEmbedder(name="test", model_name="test-model")
         embedder.model_post_init(None)
@@ -58,3 +66,91 @@ async def test_local_embedder_embed_single_encoding(mock_logger):
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0] == [0.5, 0.6, 0.7]
+
+
+class ThreadRecordingDummy(DummySentenceTransformer):
+    threads: list = []
+
+    def encode(self, texts, convert_to_tensor=False):
+        import threading
+        ThreadRecordingDummy.threads.append(threading.current_thread().name)
+        return super().encode(texts, convert_to_tensor)
+
+
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=ThreadRecordingDummy)
+@pytest.mark.asyncio
+async def test_local_embedder_runs_off_event_loop():
+    import threading
+    ThreadRecordingDummy.threads = []
+    embedder = LocalEmbedder(name="threaded", model_name="test-model")
+    await embedder.embed(["hello"])
+    assert ThreadRecordingDummy.threads == ["LocalEmbedder-threaded_0"]
+    assert threading.current_thread().name not in ThreadRecordingDummy.threads
+    await embedder.aclose()
+
+
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=ThreadRecordingDummy)
+@pytest.mark.asyncio
+async def test_local_embedder_inline_executor():
+    import threading
+    ThreadRecordingDummy.threads = []
+    embedder = LocalEmbedder(name="inline", model_name="test-model", executor="inline")
+    await embedder.embed(["hello"])
+    assert ThreadRecordingDummy.threads == [threading.current_thread().name]
+
+
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=DummySentenceTransformer)
+@pytest.mark.asyncio
+async def test_local_embedder_rejects_when_queue_full():
+    embedder = LocalEmbedder(name="full", model_name="test-model", max_queue_depth=1)
+    embedder._queue_depth = 1
+    with pytest.raises(RuntimeError, match="queue is full"):
+        await embedder.embed(["hello"])
+
+
+def test_encode_flattens_ndarray_batches():
+    import numpy as np
+    from vogonpoetry.embedders.local import _encode
+
+    class NdarrayModel:
+        def encode(self, texts, convert_to_tensor=False):
+            return np.ones((len(texts), 2))
+
+    assert _encode(NdarrayModel(), ["a", "b"]) == [[1.0, 1.0], [1.0, 1.0]]  # type: ignore
+
+
+class CountingDummy(DummySentenceTransformer):
+    loads: list = []
+
+    def __init__(self, model_name=""):
+        super().__init__(model_name)
+        CountingDummy.loads.append(model_name)
+
+
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=CountingDummy)
+@pytest.mark.asyncio
+async def test_local_embedders_share_lazily_loaded_model():
+    CountingDummy.loads = []
+    first = LocalEmbedder(name="first", model_name="shared-model", executor="inline")
+    second = LocalEmbedder(name="second", model_name="shared-model", executor="inline")
+    assert CountingDummy.loads == []
+    await first.embed(["a"])
+    await second.embed(["b"])
+    assert CountingDummy.loads == ["shared-model"]
+    assert model_registry.ref_count("shared-model") == 2
+    await first.aclose()
+    assert "shared-model" in model_registry
+    await second.aclose()
+    assert "shared-model" not in model_registry
+
+
+@patch("vogonpoetry.embedders.models.load_sentence_transformer", new=CountingDummy)
+@pytest.mark.asyncio
+async def test_local_embedder_warm_up_loads_model():
+    CountingDummy.loads = []
+    embedder = LocalEmbedder(name="warm", model_name="warm-model")
+    await embedder.warm_up()
+    assert CountingDummy.loads == ["warm-model"]
+    await embedder.embed(["a"])
+    assert CountingDummy.loads == ["warm-model"]
+    await embedder.aclose()
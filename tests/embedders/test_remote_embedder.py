@@ -36,4 +36,74 @@ async def test_embed(monkeypatch):
     monkeypatch.setattr("httpx.AsyncClient", lambda **kwargs: MockAsyncClient(MockResponse(response_data)))
 
     result = await embedder.embed(["foo"])
-    assert result == [[0.1, 0.2, 0.3]]
\ No newline at end of file
+    assert result == [[0.1, 0.2, 0.3]]
+
+def mock_transport(monkeypatch, handler):
+    real_client = httpx.AsyncClient
+    created = []
+
+    def factory(**kwargs):
+        kwargs.pop("http2", None)
+        kwargs.pop("limits", None)
+        client = real_client(transport=httpx.MockTransport(handler), **kwargs)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr("httpx.AsyncClient", factory)
+    return created
+
+def make_embedder(**kwargs):
+    return RemoteEmbedder(name="test", type="remote", model="mock", url="http://mock", retry_backoff=0, **kwargs)
+
+@pytest.mark.asyncio
+async def test_client_is_reused(monkeypatch):
+    created = mock_transport(monkeypatch, lambda request: httpx.Response(200, json={"data": [[1.0]]}))
+    embedder = make_embedder()
+    await embedder.embed(["a"])
+    await embedder.embed(["b"])
+    assert len(created) == 1
+    await embedder.aclose()
+    assert created[0].is_closed
+
+@pytest.mark.asyncio
+async def test_large_inputs_are_chunked(monkeypatch):
+    import json
+    requests = []
+
+    def handler(request):
+        texts = json.loads(request.content)["input"]
+        requests.append(texts)
+        return httpx.Response(200, json={"data": [[float(len(t))] for t in texts]})
+
+    mock_transport(monkeypatch, handler)
+    embedder = make_embedder(chunk_size=2)
+    result = await embedder.embed(["a", "bb", "ccc", "dddd", "eeeee"])
+    assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert sorted(requests) == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+@pytest.mark.asyncio
+async def test_retries_transient_failures(monkeypatch):
+    statuses = [503, 429, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"data": [[1.0]]})
+
+    mock_transport(monkeypatch, handler)
+    embedder = make_embedder(max_retries=2)
+    assert await embedder.embed(["a"]) == [[1.0]]
+    assert statuses == []
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={})
+
+    mock_transport(monkeypatch, handler)
+    embedder = make_embedder(max_retries=3)
+    with pytest.raises(httpx.HTTPStatusError):
+        await embedder.embed(["a"])
+    assert len(calls) == 1
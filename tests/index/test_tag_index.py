@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+from vogonpoetry.index.tags import TagToolIndex, tag_weights
+
+
+def tool(name, *tags):
+    return SimpleNamespace(name=name, description=name, tags=list(tags))
+
+def test_match_is_union_of_postings_in_catalog_order():
+    search, files, shell = tool("search", "web"), tool("files", "fs", "local"), tool("shell", "local")
+    index = TagToolIndex()
+    index.update([search, files, shell])
+    assert index.match(["local", "web"]) == [search, files, shell]
+    assert index.match(["fs"]) == [files]
+    assert index.match(["missing"]) == []
+
+def test_update_is_incremental():
+    index = TagToolIndex()
+    catalog = [tool("search", "web"), tool("files", "fs")]
+    index.update(catalog)
+    slot = next(iter(index.postings("fs")))
+    index.update([tool("files", "fs", "local"), tool("shell", "local")])
+    assert "search" not in index
+    assert index.postings("web") == frozenset()
+    # Unchanged tools keep their slot.
+    assert index.postings("fs") == {slot}
+    assert [t.name for t in index.match(["local"])] == ["files", "shell"]
+
+def test_score_sums_matched_tag_weights():
+    index = TagToolIndex()
+    index.update([tool("a", "x"), tool("b", "x", "y"), tool("c", "z")])
+    ranked = index.score({"x": 0.5, "y": 0.25})
+    assert [(t.name, score) for t, score in ranked] == [("b", 0.75), ("a", 0.5)]
+
+def test_tag_weights_accepts_sequences_and_scores():
+    assert tag_weights(["a", "b"]) == {"a": 1.0, "b": 1.0}
+    assert tag_weights({"a": SimpleNamespace(score=0.3), "b": 0.7}) == {"a": 0.3, "b": 0.7}
@@ -0,0 +1,81 @@
+import asyncio
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from vogonpoetry.index.tools import ToolVectorIndex
+
+
+VECTORS = {
+    "search the web": [1.0, 0.0],
+    "read a file": [0.0, 1.0],
+    "write a file": [0.6, 0.8],
+}
+
+class CountingEmbedder:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return [VECTORS[text] for text in texts]
+
+def tool(name, description):
+    return SimpleNamespace(name=name, description=description)
+
+@pytest.mark.asyncio
+async def test_update_only_embeds_changed_tools():
+    embedder = CountingEmbedder()
+    index = ToolVectorIndex()
+    await index.update(embedder, [tool("search", "search the web"), tool("files", "read a file")])
+    await index.update(embedder, [tool("search", "search the web"), tool("files", "read a file")])
+    await index.update(embedder, [tool("search", "search the web"), tool("files", "write a file")])
+    assert embedder.calls == [["search the web", "read a file"], ["write a file"]]
+    assert index.search([0.0, 1.0], 0.5) == ["files"]
+
+@pytest.mark.asyncio
+async def test_update_drops_removed_tools():
+    embedder = CountingEmbedder()
+    index = ToolVectorIndex()
+    await index.update(embedder, [tool("search", "search the web"), tool("files", "read a file")])
+    await index.update(embedder, [tool("files", "read a file")])
+    assert len(index) == 1
+    assert "search" not in index
+    assert index.search([1.0, 0.0], 0.0) == ["files"]
+    await index.update(embedder, [])
+    assert index.search([1.0, 0.0], 0.0) == []
+
+@pytest.mark.asyncio
+async def test_search_threshold_is_inclusive():
+    index = ToolVectorIndex()
+    await index.update(CountingEmbedder(), [tool("search", "search the web"), tool("write", "write a file")])
+    assert sorted(index.search(np.array([1.0, 0.0]), 0.6)) == ["search", "write"]
+
+@pytest.mark.asyncio
+async def test_update_with_duplicate_keys_is_stable(monkeypatch):
+    embedder = CountingEmbedder()
+    index = ToolVectorIndex()
+    tools = [tool("search", "search the web"), tool("search", "search the web"), tool("files", "read a file")]
+    await index.update(embedder, tools)
+    builds = []
+    monkeypatch.setattr(index, "_build", lambda: builds.append(1))
+    await index.update(embedder, tools)
+    assert embedder.calls == [["search the web", "read a file"]]
+    assert builds == [] and len(index) == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_do_not_interleave():
+    class SlowEmbedder(CountingEmbedder):
+        async def embed(self, texts, **kwargs):
+            await asyncio.sleep(0.01)
+            return await super().embed(texts, **kwargs)
+
+    embedder = SlowEmbedder()
+    index = ToolVectorIndex()
+    await index.update(embedder, [tool("search", "search the web")])
+    await asyncio.gather(
+        index.update(embedder, [tool("files", "read a file")]),
+        index.update(embedder, [tool("search", "search the web"), tool("write", "write a file")]),
+    )
+    assert sorted(index.search([0.6, 0.8], 0.0)) == ["search", "write"]
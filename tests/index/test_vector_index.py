@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from vogonpoetry.index import VectorIndexTypeAdapter
+from vogonpoetry.index.base import normalize
+from vogonpoetry.index.exact import ExactVectorIndex
+from vogonpoetry.index.ivf import IVFVectorIndex
+
+
+def clustered(n, dim=16, clusters=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(clusters, size=n)] + 0.1 * rng.normal(size=(n, dim))
+    return normalize(points)
+
+def test_typeadapter_selects_backend():
+    assert isinstance(VectorIndexTypeAdapter.validate_python({"type": "exact"}), ExactVectorIndex)
+    ivf = VectorIndexTypeAdapter.validate_python({"type": "ivf", "n_probe": 4})
+    assert isinstance(ivf, IVFVectorIndex)
+    assert ivf.n_probe == 4
+
+def test_exact_search_top_k_and_threshold():
+    index = ExactVectorIndex()
+    index.build(normalize(np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0]])))
+    query = normalize(np.array([1.0, 0.0]))
+    indices, scores = index.search(query, k=2)
+    assert indices.tolist() == [0, 1]
+    assert scores.tolist() == pytest.approx([1.0, 0.8])
+    indices, _ = index.search(query, threshold=0.5)
+    assert indices.tolist() == [0, 1]
+    assert index.stats.searches == 2
+
+def test_empty_index():
+    index = ExactVectorIndex()
+    indices, scores = index.search(np.zeros(2, dtype=np.float32), k=3)
+    assert len(indices) == 0 and len(scores) == 0
+
+def test_ivf_small_catalog_is_exact():
+    matrix = clustered(100)
+    ivf = IVFVectorIndex(min_size=1000)
+    ivf.build(matrix)
+    exact = ExactVectorIndex()
+    exact.build(matrix)
+    query = matrix[3]
+    assert ivf.search(query, k=10)[0].tolist() == exact.search(query, k=10)[0].tolist()
+
+def test_ivf_recall_on_clustered_catalog():
+    matrix = clustered(5000)
+    ivf = IVFVectorIndex(min_size=0, n_probe=8, recall_sample_rate=1.0)
+    ivf.build(matrix)
+    for query in matrix[:50]:
+        ivf.search(query, k=10)
+    assert ivf.stats.recall_samples == 50
+    assert ivf.stats.recall is not None and ivf.stats.recall >= 0.9
+    assert ivf.stats.mean_latency_ms > 0
+
+def test_ivf_partitions_cover_all_rows():
+    matrix = clustered(2000)
+    ivf = IVFVectorIndex(min_size=0, n_lists=20)
+    ivf.build(matrix)
+    assert sorted(np.concatenate(ivf._lists).tolist()) == list(range(2000))
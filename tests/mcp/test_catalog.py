@@ -0,0 +1,108 @@
+import pytest
+from types import SimpleNamespace
+from mcp.types import ServerNotification, ToolListChangedNotification
+from fastmcp import Client, FastMCP
+from vogonpoetry.index.tags import TagToolIndex
+from vogonpoetry.index.tools import ToolVectorIndex
+from vogonpoetry.mcp.catalog import CatalogCache
+from vogonpoetry.mcp.client import MCPClient
+from vogonpoetry.mcp.pool import SessionPool
+
+
+def tool(name, description="", tags=()):
+    return SimpleNamespace(name=name, description=description, tags=list(tags))
+
+class Source:
+    def __init__(self, items):
+        self.items = items
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        return list(self.items)
+
+class CountingEmbedder:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+@pytest.mark.asyncio
+async def test_catalog_is_cached_until_invalidated():
+    source = Source([tool("a"), tool("b")])
+    cache = CatalogCache("test", source.fetch, lambda t: t.name)
+    first = await cache.get()
+    assert (await cache.get()) is first
+    assert source.calls == 1
+    cache.invalidate()
+    second = await cache.get()
+    assert source.calls == 2
+    # Unchanged content keeps its version.
+    assert second.version == first.version
+
+@pytest.mark.asyncio
+async def test_catalog_ttl_expires(monkeypatch):
+    source = Source([tool("a")])
+    cache = CatalogCache("test", source.fetch, lambda t: t.name, ttl=10.0)
+    now = [100.0]
+    monkeypatch.setattr("vogonpoetry.mcp.catalog.time.monotonic", lambda: now[0])
+    await cache.get()
+    now[0] += 5
+    await cache.get()
+    assert source.calls == 1
+    now[0] += 6
+    await cache.get()
+    assert source.calls == 2
+
+@pytest.mark.asyncio
+async def test_listeners_receive_diff_and_indexes_update_incrementally():
+    source = Source([tool("a", "alpha", ["x"]), tool("b", "beta", ["y"])])
+    cache = CatalogCache("test", source.fetch, lambda t: t.name)
+    tags = TagToolIndex()
+    vectors = ToolVectorIndex()
+    embedder = CountingEmbedder()
+    diffs = []
+    cache.subscribe(diffs.append)
+    cache.subscribe(tags.apply)
+    cache.subscribe(lambda diff: vectors.apply(embedder, diff))
+    await cache.get()
+    source.items = [tool("b", "beta", ["y", "z"]), tool("c", "gamma", ["z"])]
+    cache.invalidate()
+    await cache.get()
+    assert [t.name for t in diffs[1].added] == ["c"]
+    assert [t.name for t in diffs[1].changed] == ["b"]
+    assert diffs[1].removed == ["a"]
+    assert [t.name for t in tags.match(["z"])] == ["b", "c"]
+    assert "a" not in tags and "a" not in vectors
+    # Only the new tool is embedded, b's description did not change.
+    assert embedder.calls == [["alpha", "beta"], ["gamma"]]
+    assert len(vectors) == 2
+
+@pytest.mark.asyncio
+async def test_list_changed_notification_invalidates_tools():
+    server = FastMCP("test")
+
+    @server.tool
+    def echo(text: str) -> str:
+        return text
+
+    client = MCPClient(id="test", transport={"type": "stdio", "command": "unused"}, pool={"health_check_interval": None})
+    client._pool = SessionPool("test", lambda: Client(server), client.pool)
+    try:
+        assert [t.name for t in await client.list_tools()] == ["echo"]
+        await client.list_tools()
+        assert client.tool_catalog.fetches == 1
+
+        @server.tool
+        def add(a: int, b: int) -> int:
+            return a + b
+
+        await client.handle_message(ServerNotification(ToolListChangedNotification(method="notifications/tools/list_changed")))
+        assert sorted(t.name for t in await client.list_tools()) == ["add", "echo"]
+        assert client.tool_catalog.fetches == 2
+    finally:
+        await client.close()
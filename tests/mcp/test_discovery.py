@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from fastmcp import Client, FastMCP
+from mcp.types import Tool
+from vogonpoetry.mcp.client import MCPClient
+from vogonpoetry.mcp.discovery import DiscoveryConfig, ToolDiscovery
+from vogonpoetry.mcp.pool import SessionPool
+from vogonpoetry.metrics import MetricsCollection
+from vogonpoetry.utils.filter_config import FilterConfig
+from vogonpoetry.utils.pattern_matcher import MatcherString, PatternMatcher
+
+
+def make_tool(name, tags=()):
+    return Tool(name=name, description=f"{name} tool", inputSchema={"type": "object"}, _meta={"_fastmcp": {"tags": list(tags)}})
+
+class FakeServer:
+    def __init__(self, id, tools, delay=0.0, error=None, discovery_timeout=None):
+        self.id = id
+        self.tools = tools
+        self.delay = delay
+        self.error = error
+        self.discovery_timeout = discovery_timeout
+        self.tool_catalog = SimpleNamespace(version=None)
+        self.calls = 0
+
+    async def list_tools(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.tool_catalog.version = ",".join(tool.name for tool in self.tools)
+        return self.tools
+
+@pytest.mark.asyncio
+async def test_discovers_servers_concurrently_into_namespaced_catalog():
+    one = FakeServer("one", [make_tool("search", ["web"])], delay=0.05)
+    two = FakeServer("two", [make_tool("search"), make_tool("read")], delay=0.05)
+    discovery = ToolDiscovery([one, two])  # type: ignore
+    start = asyncio.get_running_loop().time()
+    tools = await discovery.refresh()
+    assert asyncio.get_running_loop().time() - start < 0.09
+    assert [tool.name for tool in tools] == ["one.search", "two.search", "two.read"]
+    assert tools[0].server == "one" and tools[0].tool.name == "search"
+    assert tools[0].tags == ["web"]
+    assert tools[0].description == "search tool"
+
+@pytest.mark.asyncio
+async def test_unchanged_catalog_keeps_list_identity():
+    discovery = ToolDiscovery([FakeServer("one", [make_tool("search")])])  # type: ignore
+    first = await discovery.refresh()
+    assert await discovery.refresh() is first
+
+@pytest.mark.asyncio
+async def test_failing_server_keeps_last_known_tools():
+    good = FakeServer("good", [make_tool("a")])
+    flaky = FakeServer("flaky", [make_tool("b")])
+    discovery = ToolDiscovery([good, flaky])  # type: ignore
+    await discovery.refresh()
+    flaky.error = ConnectionError("down")
+    metrics = MetricsCollection()
+    tools = await discovery.refresh(metrics)
+    assert [tool.name for tool in tools] == ["good.a", "flaky.b"]
+    assert "vogonpoetry.mcp.discovery_failures" in [metric.name for metric in metrics.get_all_metrics()]
+
+@pytest.mark.asyncio
+async def test_slow_server_does_not_hold_back_catalog():
+    fast = FakeServer("fast", [make_tool("a")])
+    slow = FakeServer("slow", [make_tool("b")], delay=0.2, discovery_timeout=0.01)
+    discovery = ToolDiscovery([fast, slow], DiscoveryConfig(timeout=1.0))  # type: ignore
+    start = asyncio.get_running_loop().time()
+    tools = await discovery.refresh()
+    assert asyncio.get_running_loop().time() - start < 0.15
+    assert [tool.name for tool in tools] == ["fast.a"]
+    # The slow fetch keeps running and is merged when it completes.
+    await asyncio.sleep(0.25)
+    assert [tool.name for tool in discovery.tools] == ["fast.a", "slow.b"]
+    await discovery.refresh()
+    assert slow.calls == 2
+    await discovery.close()
+
+@pytest.mark.asyncio
+async def test_applies_server_filters():
+    server = FastMCP("test")
+
+    @server.tool
+    def keep_me() -> str:
+        return ""
+
+    @server.tool
+    def drop_me() -> str:
+        return ""
+
+    client = MCPClient(
+        id="srv",
+        transport={"type": "stdio", "command": "unused"},
+        tools=[FilterConfig(blacklist=[PatternMatcher(pattern=MatcherString("drop_*"))])],
+        pool={"health_check_interval": None},
+    )
+    client._pool = SessionPool("srv", lambda: Client(server), client.pool)
+    discovery = ToolDiscovery([client])
+    try:
+        assert [tool.name for tool in await discovery.refresh()] == ["srv.keep_me"]
+    finally:
+        await client.close()
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_diffs_keyed_by_namespaced_name():
+    server = FakeServer("one", [make_tool("a"), make_tool("b")])
+    discovery = ToolDiscovery([server])  # type: ignore
+    diffs = []
+    discovery.subscribe(diffs.append)
+    await discovery.refresh()
+    server.tools = [make_tool("b", ["new"]), make_tool("c")]
+    await discovery.refresh()
+    await discovery.refresh()
+    assert len(diffs) == 2
+    assert [tool.name for tool in diffs[0].added] == ["one.a", "one.b"]
+    assert [tool.name for tool in diffs[1].added] == ["one.c"]
+    assert [tool.name for tool in diffs[1].changed] == ["one.b"]
+    assert diffs[1].removed == ["one.a"]
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import pytest
+from vogonpoetry.mcp import launcher
+from vogonpoetry.mcp.launcher import apply_limits
+from vogonpoetry.mcp.limits import ProcessLimits
+
+
+def test_wrap_builds_launcher_command():
+    command, args = ProcessLimits(memory_mb=256, cpu_seconds=60).wrap("npx", ["server", "--flag"])
+    assert command == sys.executable
+    assert args == [launcher.__file__, "--memory-mb", "256", "--cpu-seconds", "60", "--", "npx", "server", "--flag"]
+    assert ProcessLimits().wrap("npx", [])[1] == [launcher.__file__, "--", "npx"]
+
+def test_launcher_applies_limits_before_exec(tmp_path):
+    command, args = ProcessLimits(memory_mb=1024, cpu_seconds=30).wrap(
+        sys.executable,
+        ["-c", "import resource; print(resource.getrlimit(resource.RLIMIT_DATA)[0], resource.getrlimit(resource.RLIMIT_CPU)[0])"],
+    )
+    # Run like a stdio server: outside the repository and without PYTHONPATH.
+    output = subprocess.run([command, *args], capture_output=True, text=True, check=True, cwd=tmp_path, env={"PATH": "/usr/bin:/bin"}).stdout
+    assert output.split() == [str(1024 * 1024 * 1024), "30"]
+
+def test_limits_need_the_resource_module(monkeypatch):
+    monkeypatch.setattr(launcher, "resource", None)
+    with pytest.raises(RuntimeError, match="POSIX"):
+        apply_limits(512, None, None)
@@ -0,0 +1,206 @@
+import asyncio
+import pytest
+from fastmcp import Client, FastMCP
+from vogonpoetry.mcp.client import MCPClient
+from vogonpoetry.mcp.pool import SessionPool, SessionPoolConfig
+
+
+def make_server():
+    server = FastMCP("test")
+
+    @server.tool
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    @server.tool
+    def echo(text: str) -> str:
+        return text
+
+    return server
+
+def make_client(created):
+    server = make_server()
+
+    def factory():
+        client = Client(server)
+        created.append(client)
+        return client
+    return factory
+
+class FlakyClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.connected = False
+        self.connects = 0
+
+    async def __aenter__(self):
+        self.connects += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("refused")
+        self.connected = True
+        return self
+
+    async def close(self):
+        self.connected = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def ping(self):
+        return True
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused_across_calls():
+    created = []
+    client = MCPClient(id="test", transport={"type": "stdio", "command": "unused"}, pool={"health_check_interval": None})
+    client._pool = SessionPool("test", make_client(created), client.pool)
+    await client.start()
+    try:
+        for _ in range(3):
+            tools = await client.list_tools()
+            assert sorted(tool.name for tool in tools) == ["add", "echo"]
+        result = await client.call_tool("add", {"a": 1, "b": 2})
+        assert result.data == 3
+        assert len(created) == 1
+        assert created[0].is_connected()
+    finally:
+        await client.close()
+    assert not created[0].is_connected()
+
+@pytest.mark.asyncio
+async def test_pool_bounds_concurrent_sessions():
+    created = []
+    pool = SessionPool("test", make_client(created), SessionPoolConfig(size=2, health_check_interval=None))
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with pool.session() as client:
+            active += 1
+            peak = max(peak, active)
+            await client.list_tools()
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*[call() for _ in range(6)])
+    await pool.close()
+    assert len(created) == 2
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_dropped_session_reconnects_transparently():
+    created = []
+    pool = SessionPool("test", make_client(created), SessionPoolConfig(health_check_interval=None))
+    async with pool.session() as client:
+        await client.close()
+    async with pool.session() as client:
+        assert client.is_connected()
+        assert len(await client.list_tools()) == 2
+    assert pool.reconnects == 1
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_reconnect_backs_off_until_connected():
+    client = FlakyClient(failures=2)
+    pool = SessionPool("test", lambda: client, SessionPoolConfig(health_check_interval=None, reconnect_backoff=0.001))  # type: ignore
+    await pool.start()
+    assert client.connects == 3 and client.is_connected()
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_reconnect_gives_up_after_max_attempts():
+    client = FlakyClient(failures=10)
+    config = SessionPoolConfig(health_check_interval=None, reconnect_backoff=0.0, max_reconnect_attempts=3)
+    pool = SessionPool("test", lambda: client, config)  # type: ignore
+    with pytest.raises(RuntimeError, match="Could not connect to MCP server 'test'."):
+        await pool.start()
+    assert client.connects == 3
+
+@pytest.mark.asyncio
+async def test_health_check_reconnects_idle_sessions():
+    client = FlakyClient(failures=0)
+    pool = SessionPool("test", lambda: client, SessionPoolConfig(health_check_interval=None))  # type: ignore
+    await pool.start()
+    client.connected = False
+    await pool.check_health()
+    async with pool.session() as session:
+        assert session.is_connected() and pool.reconnects == 1
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_dead_sessions_restart_in_background_while_others_serve():
+    clients = [FlakyClient(failures=0), FlakyClient(failures=0)]
+    factory = iter(clients)
+    config = SessionPoolConfig(size=2, health_check_interval=None, reconnect_backoff=0.05)
+    pool = SessionPool("test", lambda: next(factory), config)  # type: ignore
+    await pool.start()
+    clients[0].connected = False
+    clients[0].failures = 1
+    # The dead session is skipped, the call gets the healthy one without waiting for a restart.
+    async with pool.session() as session:
+        assert session is clients[1]
+    assert not clients[0].is_connected()
+    await asyncio.sleep(0.1)
+    assert clients[0].is_connected() and pool.reconnects == 1
+    # Sessions are handed out round-robin.
+    seen = []
+    for _ in range(4):
+        async with pool.session() as session:
+            seen.append(session)
+    assert seen == [clients[1], clients[0], clients[1], clients[0]]
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_acquire_times_out_when_no_session_is_healthy():
+    client = FlakyClient(failures=0)
+    config = SessionPoolConfig(health_check_interval=None, acquire_timeout=0.05, reconnect_backoff=1.0, max_reconnect_attempts=1)
+    pool = SessionPool("test", lambda: client, config)  # type: ignore
+    await pool.start()
+    client.connected = False
+    client.failures = 100
+    with pytest.raises(RuntimeError, match="No healthy session"):
+        async with pool.session():
+            pass
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_health_check_leaves_other_sessions_available():
+    class SlowPingClient(FlakyClient):
+        async def ping(self):
+            await asyncio.sleep(0.2)
+            return True
+
+    clients = [SlowPingClient(failures=0) for _ in range(3)]
+    factory = iter(clients)
+    pool = SessionPool("test", lambda: next(factory), SessionPoolConfig(size=3, health_check_interval=None))  # type: ignore
+    await pool.start()
+    check = asyncio.create_task(pool.check_health())
+    await asyncio.sleep(0.01)
+    start = asyncio.get_running_loop().time()
+    async with pool.session():
+        assert asyncio.get_running_loop().time() - start < 0.1
+    assert not check.done()
+    await check
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_dropped_tool_call_is_not_retried():
+    class DroppingClient(FlakyClient):
+        calls = 0
+
+        async def call_tool(self, name, arguments):
+            DroppingClient.calls += 1
+            self.connected = False
+            raise ConnectionError("dropped")
+
+    client = MCPClient(id="test", transport={"type": "stdio", "command": "unused"}, pool={"size": 1, "health_check_interval": None})
+    client._pool = SessionPool("test", lambda: DroppingClient(failures=0), client.pool)  # type: ignore
+    await client.start()
+    try:
+        with pytest.raises(ConnectionError):
+            await client.call_tool("add", {"a": 1, "b": 2})
+        assert DroppingClient.calls == 1
+    finally:
+        await client.close()
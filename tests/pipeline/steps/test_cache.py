@@ -0,0 +1,107 @@
+from typing import Any
+
+import pytest
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
+from vogonpoetry.messages.base import BaseMessage
+from vogonpoetry.metrics import MetricsCollection
+from vogonpoetry.pipeline.steps.cache import StepCacheConfig, StepResultCache, shared_step_caches
+from vogonpoetry.pipeline.steps.dummy import DummyConfiguration, DummyStep
+from vogonpoetry.tags.tag_score import TagScore
+
+
+class CountingStep(DummyStep):
+    calls: int = 0
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+
+    async def _process_step(self, context: BaseContext) -> Any:
+        self.calls += 1
+        return {"text": context.latest_message.content, "calls": self.calls}
+
+
+def make_context(text: str, **data: Any) -> BaseContext:
+    return BaseContext(
+        visited_steps=[],
+        data=data,
+        messages=[BaseMessage(role="user", content=text)],
+        metrics=MetricsCollection(),
+        embedding_memo=EmbeddingMemo(),
+    )
+
+
+def metric_names(context: BaseContext) -> list[str]:
+    return [metric.name for metric in context.metrics.get_all_metrics()]
+
+
+@pytest.mark.asyncio
+async def test_identical_inputs_reuse_the_result():
+    step = CountingStep(id="s", cache=StepCacheConfig(key_fields=["mode"]), options=DummyConfiguration())
+    first = make_context("turn off the lights", mode="tags")
+    assert await step.execute(first) == {"text": "turn off the lights", "calls": 1}
+    assert "vogonpoetry.step.cache_misses" in metric_names(first)
+    second = make_context("turn off the lights", mode="tags")
+    assert await step.execute(second) == {"text": "turn off the lights", "calls": 1}
+    assert "vogonpoetry.step.cache_hits" in metric_names(second)
+    assert step.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_different_inputs_miss():
+    step = CountingStep(id="s", cache=StepCacheConfig(key_fields=["mode"]), options=DummyConfiguration())
+    await step.execute(make_context("turn off the lights", mode="tags"))
+    await step.execute(make_context("turn on the lights", mode="tags"))
+    await step.execute(make_context("turn on the lights", mode="vector"))
+    assert step.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_without_cache_config_steps_always_run():
+    step = CountingStep(id="s", options=DummyConfiguration())
+    await step.execute(make_context("hi"))
+    await step.execute(make_context("hi"))
+    assert step.calls == 2 and step.result_cache is None
+
+
+@pytest.mark.asyncio
+async def test_shared_scope_shares_between_identical_steps():
+    shared_step_caches.clear()
+    config = StepCacheConfig(scope="shared")
+    first = CountingStep(id="a", cache=config, options=DummyConfiguration())
+    second = CountingStep(id="b", cache=config, options=DummyConfiguration())
+    await first.execute(make_context("hi"))
+    assert await second.execute(make_context("hi")) == {"text": "hi", "calls": 1}
+    assert second.calls == 0
+    assert first.result_cache is second.result_cache
+
+
+def test_result_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("vogonpoetry.pipeline.steps.cache.time.monotonic", lambda: now[0])
+    cache = StepResultCache(max_entries=2)
+    cache.put("a", 1, ttl=10)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    now[0] = 111.0
+    assert cache.get("a") == (False, None)
+    assert cache.get("c") == (True, 3)
+
+
+def test_key_depends_on_tag_scores():
+    config = StepCacheConfig(key_fields=["tags"], include_message=False)
+
+    def tags(score: float) -> dict[str, TagScore]:
+        return {"media": TagScore(id="media", name="Media", description="Media", score=score)}
+
+    assert config.key(make_context("", tags=tags(0.9))) != config.key(make_context("", tags=tags(0.1)))
+    assert config.key(make_context("", tags=tags(0.9))) == config.key(make_context("", tags=tags(0.9)))
+
+
+def test_key_rejects_values_without_stable_representation():
+    config = StepCacheConfig(key_fields=["handle"], include_message=False)
+    with pytest.raises(TypeError, match="stable representation"):
+        config.key(make_context("", handle=object()))
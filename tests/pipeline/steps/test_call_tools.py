@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from vogonpoetry.context import BaseContext
+from vogonpoetry.metrics import MetricsCollection
+from vogonpoetry.pipeline.steps.call_tools import CallToolsOptions, CallToolsStep
+
+
+class FakeServer:
+    def __init__(self, delays=None, errors=None):
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append((name, arguments))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(name, 0.05))
+            if name in self.errors:
+                raise RuntimeError(self.errors[name])
+            return f"{name}:{arguments}"
+        finally:
+            self.active -= 1
+
+def discovered(server, tool):
+    return SimpleNamespace(name=f"{server}.{tool}", server=server, tool=SimpleNamespace(name=tool))
+
+def make_step(**options):
+    return CallToolsStep(id="call", type="call_tools", options=CallToolsOptions(calls_key="selected", **options))
+
+def make_context(servers, selected, **data):
+    return BaseContext(data={"selected": selected, **data}, mcp_servers=servers, metrics=MetricsCollection())  # type: ignore
+
+@pytest.mark.asyncio
+async def test_calls_tools_in_parallel():
+    home = FakeServer()
+    selected = [discovered("home", f"light{i}") for i in range(5)]
+    context = make_context({"home": home}, selected, args={"home.light0": {"on": True}})
+    step = make_step(arguments_key="args", max_concurrency_per_server=5)
+    start = asyncio.get_running_loop().time()
+    results = await step._process_step(context)
+    assert asyncio.get_running_loop().time() - start < 0.15
+    assert [result.status for result in results] == ["ok"] * 5
+    assert results[0].result == "light0:{'on': True}"
+    assert [context.data["tool_results"][i].name for i in range(5)] == [tool.name for tool in selected]
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_per_server():
+    one, two = FakeServer(), FakeServer()
+    selected = [discovered("one", f"t{i}") for i in range(4)] + [{"name": f"two.t{i}", "arguments": {}} for i in range(4)]
+    await make_step(max_concurrency_per_server=2)._process_step(make_context({"one": one, "two": two}, selected))
+    assert one.peak == 2 and two.peak == 2
+    assert len(two.calls) == 4
+
+@pytest.mark.asyncio
+async def test_timeouts_errors_and_missing_servers_are_reported():
+    server = FakeServer(delays={"slow": 1.0}, errors={"broken": "boom"})
+    selected = [discovered("srv", "slow"), discovered("srv", "broken"), discovered("srv", "fine"), discovered("gone", "x")]
+    results = await make_step(timeout=0.1)._process_step(make_context({"srv": server}, selected))
+    assert [result.status for result in results] == ["timeout", "error", "ok", "error"]
+    assert results[1].error == "boom"
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_outstanding_calls_and_streams_finished_ones():
+    server = FakeServer(delays={"fast": 0.01, "slow": 1.0})
+    context = make_context({"srv": server}, [discovered("srv", "fast"), discovered("srv", "slow")])
+    step = make_step(deadline=0.1)
+    task = asyncio.create_task(step._process_step(context))
+    await asyncio.sleep(0.05)
+    # Finished calls are visible before the step completes.
+    assert context.data["tool_results"][0].status == "ok"
+    results = await task
+    assert [result.status for result in results] == ["ok", "cancelled"]
+    assert server.active == 0
+
+@pytest.mark.asyncio
+async def test_repeated_calls_to_one_tool_keep_their_own_results():
+    server = FakeServer(delays={"add": 0.01})
+    selected = [{"name": "srv.add", "arguments": {"a": 1}}, {"name": "srv.add", "arguments": {"a": 2}}]
+    context = make_context({"srv": server}, selected)
+    results = await make_step()._process_step(context)
+    assert [result.result for result in results] == ["add:{'a': 1}", "add:{'a': 2}"]
+    assert [context.data["tool_results"][i].result for i in range(2)] == ["add:{'a': 1}", "add:{'a': 2}"]
+
+@pytest.mark.asyncio
+async def test_cancelling_the_step_cancels_its_calls():
+    server = FakeServer(delays={"slow": 0.1})
+    context = make_context({"srv": server}, [discovered("srv", "slow"), discovered("srv", "slow")])
+    step = CallToolsStep(id="call", type="call_tools", timeout=0.02, options=CallToolsOptions(calls_key="selected"))
+    with pytest.raises(TimeoutError):
+        await step.execute(context)
+    assert server.active == 0
+    await asyncio.sleep(0.15)
+    assert [result.status for result in context.data["tool_results"].values()] == ["cancelled", "cancelled"]
+
+@pytest.mark.asyncio
+async def test_call_timeout_is_capped_by_the_context_deadline():
+    server = FakeServer(delays={"slow": 1.0})
+    context = make_context({"srv": server}, [discovered("srv", "slow")])
+    context.set_timeout(0.05)
+    start = asyncio.get_running_loop().time()
+    results = await make_step(timeout=10.0)._process_step(context)
+    assert asyncio.get_running_loop().time() - start < 0.5
+    assert [result.status for result in results] == ["timeout"]
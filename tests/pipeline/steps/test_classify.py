@@ -0,0 +1,113 @@
+import pytest
+from vogonpoetry.context import BaseContext
+from vogonpoetry.messages.base import BaseMessage
+from vogonpoetry.pipeline.steps.classify import ClassifyStep, EmbedderClassifyTagsOptions, KeywordClassifyTagsOptions
+from vogonpoetry.tags.tag import Tag
+
+VECTORS = {
+    "Media": [1.0, 0.0, 0.0],
+    "Movies": [0.9, 0.1, 0.0],
+    "Home": [0.0, 1.0, 0.0],
+    "play a movie": [1.0, 0.0, 0.0],
+}
+
+class DummyEmbedder:
+    name = "dummy"
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return [VECTORS[text] for text in texts]
+
+def make_step(threshold=0.5):
+    options = EmbedderClassifyTagsOptions(
+        embedder="dummy",
+        threshold=threshold,
+        tags=[
+            Tag(id="media", name="Media", description="Media", sub_tags=[
+                Tag(id="media.movies", name="Movies", description="Movies"),
+            ]),
+            Tag(id="home", name="Home", description="Home"),
+        ],
+    )
+    return ClassifyStep(id="classify", type="classify_request", options=options)
+
+@pytest.mark.asyncio
+async def test_initialize_embeds_all_tags():
+    embedder = DummyEmbedder()
+    step = make_step()
+    await step.initialize(BaseContext(embedders={"dummy": embedder}))  # type: ignore
+    assert embedder.calls == [["Media", "Movies", "Home"]]
+    assert len(step._tag_matrix) == 3
+
+@pytest.mark.asyncio
+async def test_process_step_scores_above_threshold():
+    embedder = DummyEmbedder()
+    step = make_step(threshold=0.5)
+    context = BaseContext(
+        embedders={"dummy": embedder},  # type: ignore
+        messages=[BaseMessage(role="user", content="play a movie")],
+    )
+    await step.initialize(context)
+    result = await step._process_step(context)
+    assert set(result.keys()) == {"media", "media.movies"}
+    assert result["media"].score == pytest.approx(1.0)
+    assert result["media.movies"].parent is result["media"]
+
+@pytest.mark.asyncio
+async def test_process_step_hierarchical_reports_accuracy():
+    from vogonpoetry.embedders.memo import EmbeddingMemo
+    from vogonpoetry.pipeline.steps.classify import HierarchyOptions
+    embedder = DummyEmbedder()
+    step = make_step(threshold=0.5)
+    step.options.hierarchy = HierarchyOptions(branch_threshold=0.5, accuracy_sample_rate=1.0)  # type: ignore
+    context = BaseContext(
+        embedders={"dummy": embedder},  # type: ignore
+        messages=[BaseMessage(role="user", content="play a movie")],
+        embedding_memo=EmbeddingMemo(),
+    )
+    await step.initialize(context)
+    result = await step._process_step(context)
+    assert set(result.keys()) == {"media", "media.movies"}
+    assert step._hierarchy_stats.recall == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_keyword_classification_matches_patterns():
+    options = KeywordClassifyTagsOptions(
+        tags=[
+            Tag(id="media", name="Media", description="Media", sub_tags=[
+                Tag(id="media.movies", name="Movies", description="Movies"),
+            ]),
+            Tag(id="home", name="Home", description="Home"),
+        ],
+        patterns={"media.movies": ["movie", "r'\\bfilms?\\b'"], "home": ["*lights*"]},
+        backend="python",
+    )
+    step = ClassifyStep(id="classify", type="classify_request", options=options)
+    await step.initialize(BaseContext())
+    context = BaseContext(messages=[BaseMessage(role="user", content="Play a Movie")])  # type: ignore
+    scores = await step._process_step(context)
+    assert list(scores) == ["media.movies"]
+    assert scores["media.movies"].score == 1.0
+    assert scores["media.movies"].parent.score == pytest.approx(0.8)  # type: ignore
+    context = BaseContext(messages=[BaseMessage(role="user", content="turn off the lights")])  # type: ignore
+    assert list(await step._process_step(context)) == ["home"]
+
+
+@pytest.mark.asyncio
+async def test_keyword_classification_ignores_case_of_patterns():
+    options = KeywordClassifyTagsOptions(
+        tags=[Tag(id="streaming", name="Streaming", description="Streaming"), Tag(id="tv", name="TV", description="TV")],
+        patterns={"streaming": ["Netflix"], "tv": ["r'\\bTV\\b'"]},
+        backend="python",
+    )
+    step = ClassifyStep(id="classify", type="classify_request", options=options)
+    await step.initialize(BaseContext())
+    context = BaseContext(messages=[BaseMessage(role="user", content="put netflix on the tv")])  # type: ignore
+    assert sorted(await step._process_step(context)) == ["streaming", "tv"]
+    options.case_sensitive = True
+    step = ClassifyStep(id="classify", type="classify_request", options=options)
+    await step.initialize(BaseContext())
+    assert list(await step._process_step(context)) == []
@@ -4,7 +4,9 @@ import pytest
 from typing import Any, Sequence
 from types import SimpleNamespace
 from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
 from vogonpoetry.messages.base import BaseMessage
+from vogonpoetry.tags.tag_score import TagScore
 from vogonpoetry.pipeline.steps import filter_tools as ft_mod
 
 from vogonpoetry.pipeline.steps.filter_tools import (
@@ -29,16 +31,22 @@ class Tensor:
         return self.data
 
 class DummyEmbedder:
+    name = "dummy"
+
     def __init__(self, vectors):
         self._vectors = vectors
         self.called_with = None
-    async def embed(self, texts, convert_to_tensor=False):
+    async def embed(self, texts, convert_to_tensor=False, **kwargs):
         self.called_with = (texts, convert_to_tensor)
         # Return a list of lists of floats, one per text
         return [v for v in self._vectors]
 
 class DummyTool:
+    count = 0
+
     def __init__(self, tags=None, description="desc"):
+        DummyTool.count += 1
+        self.name = f"tool{DummyTool.count}"
         self.tags = tags or []
         self.description = description
 
@@ -91,18 +99,17 @@ async def test_process_step_context_tag_no_tools():
 
 @pytest.mark.asyncio
 async def test_process_step_embedder_similarity(monkeypatch):
-    # Patch cosine_similarity to control output
-    monkeypatch.setattr(ft_mod, "cosine_similarity", lambda v1, v2: 0.8 if v1 == [1] else 0.3)
     options = EmbedderSimilarityFilterOptions(type='embedder_similarity', embedder='emb', threshold=0.5)
     step = FilterToolsStep(id="test1", requires=[], type="filter_tools", if_=None, options=options)
     step._logger = DummyLogger() # type: ignore
-    step._embedder = DummyEmbedder([[1], [2], [3]])  # type: ignore
+    # The message embeds to the first vector, the tools to the first and second.
+    step._embedder = DummyEmbedder([[1.0, 0.0], [0.0, 1.0]])  # type: ignore
     tool1 = DummyTool(description="desc1")
     tool2 = DummyTool(description="desc2")
     context = BaseContext(
         tools=[tool1, tool2],
-        data={'tools': [tool1, tool2]},
         messages=[BaseMessage(role="user", content="msg")], # type: ignore
+        embedding_memo=EmbeddingMemo(),
     )
     filtered = await step._process_step(context)
     assert filtered == [tool1]
@@ -114,8 +121,45 @@ async def test_process_step_embedder_similarity_no_latest_message():
     step._logger = DummyLogger() # type: ignore
     step._embedder = DummyEmbedder([[1], [2]]) # type: ignore
     context = BaseContext(
-        data={'tools': [DummyTool()]},
         tools=[DummyTool()]
     )
     result = await step._process_step(context)
     assert result == []
+
+@pytest.mark.asyncio
+async def test_process_step_embedder_similarity_reuses_tool_vectors():
+    options = EmbedderSimilarityFilterOptions(type='embedder_similarity', embedder='emb', threshold=0.5)
+    step = FilterToolsStep(id="test1", requires=[], type="filter_tools", if_=None, options=options)
+    step._logger = DummyLogger() # type: ignore
+    step._embedder = DummyEmbedder([[1.0, 0.0], [0.0, 1.0]])  # type: ignore
+    tool1 = DummyTool(description="desc1")
+    tool2 = DummyTool(description="desc2")
+    memo = EmbeddingMemo()
+    for content in ("first", "second"):
+        context = BaseContext(
+            tools=[tool1, tool2],
+                messages=[BaseMessage(role="user", content=content)], # type: ignore
+            embedding_memo=memo,
+        )
+        assert await step._process_step(context) == [tool1]
+        # Tools are embedded once, later requests only embed the message.
+        assert step._embedder.called_with[0] == [content] # type: ignore
+
+@pytest.mark.asyncio
+async def test_process_step_context_tag_weighted():
+    options = ContextTagFilterOptions(type='context_tag', context_key='mytags', mode='weighted', min_score=0.5, top_k=2)
+    step = FilterToolsStep(id="test1", requires=[], type="filter_tools", if_=None, options=options)
+    step._logger = DummyLogger() # type: ignore
+    tool1 = DummyTool(tags=['a'])
+    tool2 = DummyTool(tags=['a', 'b'])
+    tool3 = DummyTool(tags=['c'])
+    tool4 = DummyTool(tags=['d'])
+    context = BaseContext()
+    context.tools = [tool1, tool2, tool3, tool4]
+    context.data = {'mytags': {
+        'a': TagScore.model_construct(id='a', score=0.4),
+        'b': TagScore.model_construct(id='b', score=0.5),
+        'c': TagScore.model_construct(id='c', score=0.6),
+        'd': TagScore.model_construct(id='d', score=0.2),
+    }}
+    assert await step._process_step(context) == [tool2, tool3]
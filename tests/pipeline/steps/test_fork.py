@@ -1,8 +1,17 @@
+import asyncio
 import pytest
 from typing import Any
 
 from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
+from vogonpoetry.metrics import MetricsCollection
 from vogonpoetry.pipeline.steps.dummy import DummyConfiguration, DummyStep
+from vogonpoetry.pipeline.steps.fork import (
+    ConcatenateStepOptions,
+    ForkStep,
+    PrefixStepOptions,
+    ReplaceStepOptions,
+)
 
 class DummyLogger:
     def __init__(self):
@@ -39,10 +48,6 @@ async def test_initialize_calls_all_steps():
         output={"key2": "value2"},
         options=DummyConfiguration(),
     )
-    from vogonpoetry.pipeline.steps.fork import (
-        ForkStep,
-        ConcatenateStepOptions,
-    )
     options = ConcatenateStepOptions(merge_strategy='concatenate', steps=[step1, step2])
     fork = ForkStep(id="fork1", requires=[], type="fork", if_=None, options=options)
     fork._logger = DummyLogger() # type: ignore
@@ -68,10 +73,6 @@ async def test_process_step_concatenate_merges_results():
         if_=None,
         output={"a": 3, "c": 4},
         options=DummyConfiguration())
-    from vogonpoetry.pipeline.steps.fork import (
-        ForkStep,
-        ConcatenateStepOptions,
-    )
     options = ConcatenateStepOptions(steps=[step1, step2])
     fork = ForkStep(id="fork2", requires=[], type="fork", if_=None, options=options)
     fork._logger = DummyLogger() # type: ignore
@@ -99,10 +100,6 @@ async def test_process_step_replace_merges_results():
         output={"y": 2},
         output_key="bar"
     )
-    from vogonpoetry.pipeline.steps.fork import (
-        ForkStep,
-        ReplaceStepOptions,
-    )
     options = ReplaceStepOptions(steps=[step1, step2])
     fork = ForkStep(id="fork3", requires=[], type="fork", if_=None, options=options)
     fork._logger = DummyLogger() # type: ignore
@@ -128,10 +125,6 @@ async def test_process_step_replace_merges_results_with_default_key():
         if_=None,
         output={"y": 2}
     )
-    from vogonpoetry.pipeline.steps.fork import (
-        ForkStep,
-        ReplaceStepOptions,
-    )
     options = ReplaceStepOptions(steps=[step1, step2])
     fork = ForkStep(id="fork4", requires=[], type="fork", if_=None, options=options)
     fork._logger = DummyLogger() # type: ignore
@@ -157,10 +150,6 @@ async def test_process_step_prefix_merges_results():
         options=DummyConfiguration(),
         output={"b": 2}
     )
-    from vogonpoetry.pipeline.steps.fork import (
-        ForkStep,
-        PrefixStepOptions,
-    )
     options = PrefixStepOptions(steps=[step1, step2], prefix="pfx_")
     fork = ForkStep(id="fork5", requires=[], type="fork", if_=None, options=options)
     fork._logger = DummyLogger() # type: ignore
@@ -178,13 +167,118 @@ async def test_merge_results_unknown_strategy():
         options=DummyConfiguration(),
         output={"a": 1}
     )
-    from vogonpoetry.pipeline.steps.fork import (
-        ForkStep,
-        ConcatenateStepOptions,
-    )
     options = ConcatenateStepOptions(steps=[step1])
     fork = ForkStep(id="fork6", requires=[], type="fork", if_=None, options=options)
     fork._logger = DummyLogger() # type: ignore
     fork.options.merge_strategy = "unknown"  # type: ignore
     with pytest.raises(ValueError, match="Unknown merge strategy: unknown"):
-        await fork.merge_results([{"a": 1}])
\ No newline at end of file
+        await fork.merge_results([{"a": 1}])
+
+
+@pytest.mark.asyncio
+async def test_branches_write_to_isolated_views_merged_after_fork():
+    class Writer(DummyStep):
+        async def _process_step(self, context):
+            seen = sorted(k for k in context.data if k.startswith("written_"))
+            context.data[f"written_{self.id}"] = seen
+            return self.id
+
+    steps = [Writer(id=f"w{i}", output_key=f"w{i}", options=DummyConfiguration()) for i in range(3)]
+    fork = ForkStep(id="fork", options=ReplaceStepOptions(steps=steps))
+    context = BaseContext(visited_steps=[], data={"base": True}, embedding_memo=EmbeddingMemo())
+    assert await fork.execute(context) == {"w0": "w0", "w1": "w1", "w2": "w2"}
+    # No branch saw the writes of another.
+    assert context.data == {"base": True, "written_w0": [], "written_w1": [], "written_w2": []}
+    assert all(context.has_visited(step.id) for step in steps)
+
+
+class SleepyStep(DummyStep):
+    delay: float = 0.0
+
+    async def _process_step(self, context):
+        await asyncio.sleep(self.delay)
+        context.data[self.id] = True
+        return {self.id: self.delay}
+
+
+def sleepy_fork(completion, quorum=None):
+    steps = [SleepyStep(id=f"s{i}", delay=delay, options=DummyConfiguration()) for i, delay in enumerate([0.2, 0.01, 0.02])]
+    return ForkStep(id="fork", options=ConcatenateStepOptions(steps=steps, completion=completion, quorum=quorum))
+
+
+def fork_context():
+    return BaseContext(visited_steps=[], data={}, metrics=MetricsCollection(), embedding_memo=EmbeddingMemo())
+
+
+@pytest.mark.asyncio
+async def test_first_completed_cancels_remaining_branches():
+    context = fork_context()
+    assert await sleepy_fork("first_completed").execute(context) == {"s1": [0.01]}
+    assert context.data == {"s1": True}
+    outcomes = {(m.tags.get("step_id"), m.tags.get("outcome")) for m in context.metrics.get_all_metrics() if m.name == "vogonpoetry.step.outcomes"}
+    assert {("s0", "cancelled"), ("s1", "ok"), ("s2", "cancelled")} <= outcomes
+
+
+@pytest.mark.asyncio
+async def test_quorum_waits_for_n_branches():
+    context = fork_context()
+    assert await sleepy_fork("quorum", quorum=2).execute(context) == {"s1": [0.01], "s2": [0.02]}
+    assert "s0" not in context.data
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("completion", ["first_completed", "all"])
+async def test_skipped_branches_do_not_count_as_completed(completion):
+    steps = [
+        SleepyStep(id="slow", delay=0.05, options=DummyConfiguration()),
+        SleepyStep(id="gated", if_="flag == 1", options=DummyConfiguration()),
+    ]
+    fork = ForkStep(id="fork", options=ConcatenateStepOptions(steps=steps, completion=completion))
+    context = fork_context()
+    context.data["flag"] = 0
+    assert await fork.execute(context) == {"slow": [0.05]}
+    assert context.data == {"flag": 0, "slow": True}
+    assert context.has_visited("gated")
+
+
+@pytest.mark.asyncio
+async def test_prefix_keys_use_the_branch_position():
+    steps = [SleepyStep(id=f"s{i}", delay=delay, options=DummyConfiguration()) for i, delay in enumerate([0.2, 0.01])]
+    fork = ForkStep(id="fork", options=ConcatenateStepOptions(steps=steps, context_merge="prefix_keys", completion="first_completed"))
+    context = fork_context()
+    await fork.execute(context)
+    # The second branch finished first, it still writes under its own position.
+    assert context.data == {"fork_1.s1": True}
+
+
+def test_quorum_must_fit_the_branches():
+    with pytest.raises(ValueError):
+        sleepy_fork("quorum", quorum=4)
+
+
+@pytest.mark.asyncio
+async def test_step_timeout_and_context_deadline():
+    context = fork_context()
+    slow = SleepyStep(id="slow", delay=0.2, timeout=0.01, options=DummyConfiguration())
+    with pytest.raises(TimeoutError):
+        await slow.execute(context)
+    outcomes = {(m.name, m.tags.get("outcome")) for m in context.metrics.get_all_metrics()}
+    assert ("vogonpoetry.step.outcomes", "timeout") in outcomes
+
+    context = fork_context()
+    context.set_timeout(0.01)
+    with pytest.raises(TimeoutError):
+        await SleepyStep(id="slow", delay=0.2, options=DummyConfiguration()).execute(context)
+    assert "slow" not in context.data
+
+
+@pytest.mark.asyncio
+async def test_replace_default_keys_follow_the_branch_position():
+    steps = [
+        SleepyStep(id="gated", if_="flag == 1", options=DummyConfiguration()),
+        SleepyStep(id="s1", delay=0.01, options=DummyConfiguration()),
+    ]
+    fork = ForkStep(id="fork", options=ReplaceStepOptions(steps=steps))
+    context = fork_context()
+    context.data["flag"] = 0
+    assert await fork.execute(context) == {"step_1": {"s1": 0.01}}
@@ -0,0 +1,183 @@
+import asyncio
+from typing import Any, Optional
+
+import pytest
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.embedders.memo import EmbeddingMemo
+from vogonpoetry.metrics import MetricsCollection
+from vogonpoetry.pipeline.pipeline import Pipeline
+from vogonpoetry.pipeline.steps.dummy import DummyConfiguration, DummyStep
+from vogonpoetry.pipeline.steps.fork import ConcatenateStepOptions, ForkStep
+
+
+class SleepStep(DummyStep):
+    delay: float = 0.0
+
+    async def _process_step(self, context: BaseContext) -> Any:
+        events = context.data["events"]
+        events.append(("start", self.id))
+        await asyncio.sleep(self.delay)
+        events.append(("end", self.id))
+        return {self.id: self.delay}
+
+
+def step(id: str, delay: float = 0.0, requires: Optional[list[str]] = None) -> SleepStep:
+    return SleepStep(id=id, requires=requires, output_key=id, delay=delay, options=DummyConfiguration())
+
+
+def make_context() -> BaseContext:
+    return BaseContext(visited_steps=[], data={"events": []}, metrics=MetricsCollection(), embedding_memo=EmbeddingMemo())
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently():
+    pipeline = Pipeline(id="p", steps=[step("a", 0.05), step("b", 0.05), step("c", 0.05)])
+    context = await pipeline.run(make_context())
+    assert [context.data[name] for name in "abc"] == [{"a": 0.05}, {"b": 0.05}, {"c": 0.05}]
+    assert context.schedule is not None
+    assert context.schedule.total < 0.12
+
+
+@pytest.mark.asyncio
+async def test_steps_wait_for_their_requirements():
+    pipeline = Pipeline(id="p", steps=[
+        step("late", requires=["slow", "fast"]),
+        step("slow", 0.05),
+        step("fast", 0.01),
+    ])
+    context = await pipeline.run(make_context())
+    events = context.data["events"]
+    assert events.index(("start", "late")) > events.index(("end", "slow"))
+    assert events[0] == ("start", "slow")
+    assert context.schedule.critical_path == ["slow", "late"]
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_bounds_running_steps():
+    pipeline = Pipeline(id="p", max_concurrency=1, steps=[step(name, 0.01) for name in "abc"])
+    context = await pipeline.run(make_context())
+    assert context.data["events"] == [(kind, name) for name in "abc" for kind in ("start", "end")]
+
+
+@pytest.mark.asyncio
+async def test_requiring_a_fork_child_waits_for_the_fork():
+    fork = ForkStep(id="fork", options=ConcatenateStepOptions(
+        merge_strategy="concatenate", steps=[step("child", 0.03)]
+    ))
+    pipeline = Pipeline(id="p", steps=[step("after", requires=["child"]), fork])
+    context = await pipeline.run(make_context())
+    assert context.data["events"] == [("start", "child"), ("end", "child"), ("start", "after"), ("end", "after")]
+    assert context.schedule.critical_path == ["fork", "after"]
+    names = {metric.name for metric in context.metrics.get_all_metrics()}
+    assert "vogonpoetry.pipeline.critical_path_ms" in names
+
+
+def test_unknown_requirement_is_rejected():
+    with pytest.raises(ValueError, match="unknown step"):
+        Pipeline(id="p", steps=[step("a", requires=["missing"])])
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        Pipeline(id="p", steps=[step("a", requires=["b"]), step("b", requires=["a"])])
+
+
+@pytest.mark.asyncio
+async def test_failing_step_cancels_running_steps():
+    class FailStep(DummyStep):
+        async def _process_step(self, context: BaseContext) -> Any:
+            raise RuntimeError("boom")
+
+    pipeline = Pipeline(id="p", steps=[
+        FailStep(id="fail", options=DummyConfiguration()),
+        step("slow", 1.0),
+    ])
+    context = make_context()
+    with pytest.raises(RuntimeError, match="boom"):
+        await pipeline.run(context)
+    assert ("end", "slow") not in context.data["events"]
+
+
+def test_plan_levels_and_dependency_bitsets():
+    pipeline = Pipeline(id="p", steps=[
+        step("c", requires=["a", "b"]),
+        step("a"),
+        step("b", requires=["a"]),
+    ])
+    plan = pipeline.plan
+    assert plan.levels == ((1,), (2,), (0,))
+    assert plan.steps[0].requires == 0b110
+    assert plan.steps[1].dependents == (0, 2)
+    assert plan.steps[0].output_key == "c"
+
+
+def test_duplicate_ids_in_forks_are_rejected():
+    fork = ForkStep(id="fork", options=ConcatenateStepOptions(merge_strategy="concatenate", steps=[step("a")]))
+    with pytest.raises(ValueError, match="Duplicate"):
+        Pipeline(id="p", steps=[step("a"), fork])
+
+
+class InitCountingStep(DummyStep):
+    initializations: int = 0
+
+    async def initialize(self, context: BaseContext) -> None:
+        self.initializations += 1
+        return await super().initialize(context)
+
+
+@pytest.mark.asyncio
+async def test_steps_are_initialized_once():
+    first = InitCountingStep(id="a", options=DummyConfiguration())
+    pipeline = Pipeline(id="p", steps=[first])
+    assert not pipeline.initialized
+    await pipeline.initialize(make_context())
+    await pipeline.run(make_context())
+    await pipeline.run(make_context())
+    assert pipeline.initialized
+    assert pipeline.steps[0].initializations == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_timeout_sets_the_deadline():
+    pipeline = Pipeline(id="p", timeout=0.02, steps=[step("fast", 0.0), step("slow", 1.0, requires=["fast"])])
+    context = make_context()
+    with pytest.raises(TimeoutError):
+        await pipeline.run(context)
+    assert context.deadline is not None
+    assert context.data["events"] == [("start", "fast"), ("end", "fast"), ("start", "slow")]
+
+
+def test_requiring_a_sibling_in_the_same_fork_is_rejected():
+    fork = ForkStep(id="fork", options=ConcatenateStepOptions(
+        merge_strategy="concatenate", steps=[step("first"), step("second", requires=["first"])]
+    ))
+    with pytest.raises(ValueError, match="same fork 'fork'"):
+        Pipeline(id="p", steps=[fork])
+
+
+def test_conditions_on_step_outputs_are_dependencies():
+    pipeline = Pipeline(id="p", steps=[
+        SleepStep(id="gated", if_="classify is not None", output_key="gated", options=DummyConfiguration()),
+        step("classify", 0.01),
+    ])
+    assert pipeline.plan.steps[0].requires == 0b10
+
+
+@pytest.mark.asyncio
+async def test_condition_waits_for_the_step_producing_its_key():
+    pipeline = Pipeline(id="p", steps=[
+        SleepStep(id="gated", if_="classify is not None", output_key="gated", options=DummyConfiguration()),
+        step("classify", 0.02),
+    ])
+    context = await pipeline.run(make_context())
+    assert context.data["events"] == [("start", "classify"), ("end", "classify"), ("start", "gated"), ("end", "gated")]
+
+
+def test_condition_on_a_sibling_in_the_same_fork_is_rejected():
+    fork = ForkStep(id="fork", options=ConcatenateStepOptions(merge_strategy="concatenate", steps=[
+        step("first"),
+        SleepStep(id="second", if_="first", options=DummyConfiguration()),
+    ]))
+    with pytest.raises(ValueError, match="condition on 'first'"):
+        Pipeline(id="p", steps=[fork])
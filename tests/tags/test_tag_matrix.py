@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from vogonpoetry.tags.tag_matrix import TagMatrix, normalize
+from vogonpoetry.tags.tag_score import cosine_similarity
+from vogonpoetry.tags.tag_vector import TagVector
+
+
+def make_tags():
+    parent = TagVector(id="media", name="Media", description="Media", vector=[1.0, 0.0, 0.0], parent=None, sub_tags=None)
+    child = TagVector(id="media.movies", name="Movies", description="Movies", vector=[1.0, 1.0, 0.0], parent=parent, sub_tags=None)
+    other = TagVector(id="home", name="Home", description="Home", vector=[0.0, 0.0, 2.0], parent=None, sub_tags=None)
+    zero = TagVector(id="zero", name="Zero", description="Zero", vector=[0.0, 0.0, 0.0], parent=None, sub_tags=None)
+    return [parent, child, other, zero]
+
+def test_normalize_leaves_zero_rows():
+    result = normalize(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert result.dtype == np.float32
+    assert result[0] == pytest.approx([0.6, 0.8])
+    assert result[1] == pytest.approx([0.0, 0.0])
+
+def test_scores_match_cosine_similarity():
+    tags = make_tags()
+    matrix = TagMatrix(tags)
+    query = [0.5, 0.25, 1.0]
+    scores = matrix.scores(query)
+    assert matrix.matrix.flags["C_CONTIGUOUS"]
+    for tag, score in zip(tags, scores):
+        assert score == pytest.approx(cosine_similarity(tag.vector, query), abs=1e-6)
+
+def test_above_threshold():
+    matrix = TagMatrix(make_tags())
+    indices, scores = matrix.above([1.0, 0.0, 0.0], 0.5)
+    assert [matrix.ids[i] for i in indices] == ["media", "media.movies"]
+    assert scores[0] == pytest.approx(1.0)
+
+def test_score_tags_materializes_survivors_and_ancestors():
+    matrix = TagMatrix(make_tags())
+    scored = matrix.score_tags([1.0, 1.0, 0.0], 0.9)
+    assert list(scored.keys()) == ["media.movies"]
+    movies = scored["media.movies"]
+    assert movies.score == pytest.approx(1.0)
+    assert movies.parent is not None
+    assert movies.parent.id == "media"
+    assert movies.parent.score == pytest.approx(2 ** -0.5)
+    assert movies.parent.sub_tags == [movies]
+
+def test_empty_matrix():
+    matrix = TagMatrix([])
+    assert len(matrix) == 0
+    assert matrix.score_tags([1.0, 0.0], 0.0) == {}
+
+def make_tree():
+    media = TagVector(id="media", name="Media", description="Media", vector=[1.0, 0.2, 0.0], parent=None, sub_tags=None)
+    movies = TagVector(id="media.movies", name="Movies", description="Movies", vector=[1.0, 0.0, 0.0], parent=media, sub_tags=None)
+    horror = TagVector(id="media.movies.horror", name="Horror", description="Horror", vector=[1.0, 0.0, 0.1], parent=movies, sub_tags=None)
+    home = TagVector(id="home", name="Home", description="Home", vector=[0.0, 1.0, 0.0], parent=None, sub_tags=None)
+    lights = TagVector(id="home.lights", name="Lights", description="Lights", vector=[0.9, 0.1, 0.0], parent=home, sub_tags=None)
+    return [media, movies, horror, home, lights]
+
+def test_children_and_roots():
+    matrix = TagMatrix(make_tree())
+    assert matrix.roots.tolist() == [0, 3]
+    assert matrix.children[0].tolist() == [1]
+    assert matrix.children[1].tolist() == [2]
+    assert matrix.children[3].tolist() == [4]
+    assert matrix.children[2].tolist() == []
+
+def test_hierarchical_prunes_unpromising_subtrees():
+    matrix = TagMatrix(make_tree())
+    query = [1.0, 0.0, 0.0]
+    exhaustive = matrix.score_tags(query, 0.5)
+    assert "home.lights" in exhaustive
+    hierarchical = matrix.score_tags_hierarchical(query, 0.5, branch_threshold=0.5)
+    # "home" scores 0, so its sub-tags are never scored even though "home.lights" would pass.
+    assert list(hierarchical.keys()) == ["media", "media.movies", "media.movies.horror"]
+    assert hierarchical["media.movies"].score == pytest.approx(exhaustive["media.movies"].score)
+    assert hierarchical["media.movies.horror"].parent is hierarchical["media.movies"]
+
+def test_hierarchical_beam_width():
+    matrix = TagMatrix(make_tree())
+    query = [1.0, 1.0, 0.0]
+    wide = matrix.score_tags_hierarchical(query, 0.1, branch_threshold=0.1)
+    narrow = matrix.score_tags_hierarchical(query, 0.1, branch_threshold=0.1, beam_width=1)
+    assert "home.lights" in wide and "media.movies" in wide
+    assert len(narrow) < len(wide)
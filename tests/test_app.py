@@ -0,0 +1,122 @@
+import pytest
+from fastmcp import Client, FastMCP
+from mcp.types import ServerNotification, ToolListChangedNotification
+
+from vogonpoetry.app import App
+from vogonpoetry.config import Configuration, WarmUpConfig
+from vogonpoetry.mcp.client import MCPClient
+from vogonpoetry.mcp.pool import SessionPool
+from vogonpoetry.pipeline.pipeline import Pipeline
+from vogonpoetry.messages.base import BaseMessage
+from vogonpoetry.pipeline.steps.filter_tools import ContextTagFilterOptions, EmbedderSimilarityFilterOptions, FilterToolsStep
+
+
+def make_app(**warm_up) -> App:
+    return App(Configuration(name="test", pipeline=Pipeline(id="p", steps=[]), warm_up=WarmUpConfig(**warm_up)))
+
+
+@pytest.mark.asyncio
+async def test_warm_up_initializes_pipeline_and_reports_ready():
+    app = make_app(inputs=["turn off the lights"], run_pipeline=True)
+    assert app.readiness == "cold" and not app.ready
+    await app.warm_up()
+    assert app.ready
+    assert app.pipeline.initialized
+    await app.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_is_reported(monkeypatch):
+    app = make_app()
+
+    async def fail(self, context):
+        raise RuntimeError("model missing")
+
+    monkeypatch.setattr(Pipeline, "initialize", fail)
+    with pytest.raises(RuntimeError):
+        await app.warm_up()
+    assert app.readiness == "failed"
+
+
+class KeywordEmbedder:
+    """Embeds a text onto the media or the lights axis by keyword."""
+    name = "keyword"
+
+    def __init__(self):
+        self.texts = []
+
+    async def warm_up(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def embed(self, texts, **kwargs):
+        self.texts.extend(texts)
+        return [[1.0, 0.0] if "play" in text.lower() else [0.0, 1.0] for text in texts]
+
+
+def mcp_client(id: str, server: FastMCP) -> MCPClient:
+    client = MCPClient(id=id, transport={"type": "stdio", "command": "unused"}, pool={"health_check_interval": None})
+    client._pool = SessionPool(id, lambda: Client(server), client.pool)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_embedder_filter_searches_the_discovered_tools():
+    server = FastMCP("test")
+
+    @server.tool
+    def play(title: str) -> str:
+        """Play a title."""
+        return title
+
+    @server.tool
+    def dim(level: int) -> int:
+        """Dim the lights."""
+        return level
+
+    step = FilterToolsStep(id="filter", output_key="filter", options=EmbedderSimilarityFilterOptions(embedder="keyword", threshold=0.5))
+    app = App(Configuration(name="test", pipeline=Pipeline(id="p", steps=[step]), mcp_servers=[mcp_client("tv", server)]))
+    embedder = KeywordEmbedder()
+    app.embedders = {"keyword": embedder}  # type: ignore
+    try:
+        await app.warm_up()
+        assert len(step._tool_index) == 2
+        context = app.create_context()
+        context.messages.append(BaseMessage(role="user", content="play something"))
+        context = await app.run(context)
+        assert [tool.name for tool in context.data["filter"]] == ["tv.play"]
+        # The tools were embedded at warm-up, the request only embedded its message.
+        assert embedder.texts == ["Play a title.", "Dim the lights.", "play something"]
+    finally:
+        await app.close()
+
+
+@pytest.mark.asyncio
+async def test_list_changed_notification_updates_filter_index():
+    server = FastMCP("test")
+
+    @server.tool(tags={"media"})
+    def play(title: str) -> str:
+        return title
+
+    client = mcp_client("tv", server)
+    step = FilterToolsStep(id="filter", output_key="filter", options=ContextTagFilterOptions(context_key="tags"))
+    app = App(Configuration(name="test", pipeline=Pipeline(id="p", steps=[step]), mcp_servers=[client]))
+    try:
+        await app.warm_up()
+        assert "tv.play" in step._tag_index
+
+        @server.tool(tags={"media"})
+        def pause() -> str:
+            return "paused"
+
+        await client.handle_message(ServerNotification(ToolListChangedNotification(method="notifications/tools/list_changed")))
+        context = app.create_context()
+        context.data["tags"] = ["media"]
+        context = await app.run(context)
+        assert "tv.pause" in step._tag_index
+        assert [tool.name for tool in context.data["filter"]] == ["tv.play", "tv.pause"]
+    finally:
+        await app.close()
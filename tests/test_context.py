@@ -0,0 +1,50 @@
+from vogonpoetry.context import BaseContext, OverlayData
+from vogonpoetry.embedders.memo import EmbeddingMemo
+
+
+def make_context(**data) -> BaseContext:
+    return BaseContext(visited_steps=[], data=data, embedding_memo=EmbeddingMemo())
+
+
+def test_overlay_reads_through_and_keeps_writes():
+    base = {"a": 1, "b": 2}
+    overlay = OverlayData(base)
+    overlay["a"] = 10
+    overlay["c"] = 3
+    del overlay["b"]
+    assert dict(overlay) == {"a": 10, "c": 3}
+    assert "b" not in overlay and len(overlay) == 2
+    assert base == {"a": 1, "b": 2}
+    overlay["b"] = 4
+    assert overlay["b"] == 4 and not overlay.deleted
+
+
+def test_branches_are_isolated_until_merged():
+    context = make_context(shared=1)
+    left, right = context.branch(), context.branch()
+    left.data["result"] = "left"
+    right.data["result"] = "right"
+    left.visit("left_step")
+    assert left.data["shared"] == 1
+    assert "result" not in context.data
+    assert left.has_visited("left_step") and not right.has_visited("left_step")
+    context.merge(left, right, strategy="prefix_keys")
+    assert context.data == {"shared": 1, "fork_0.result": "left", "fork_1.result": "right"}
+    assert context.visited_steps == ["left_step"]
+    context.merge(right, strategy="prefix_keys", indices=[3])
+    assert context.data["fork_3.result"] == "right"
+
+
+def test_merge_overwrite_and_deep_merge_apply_only_branch_writes():
+    context = make_context(keep=1, drop=2, nested={"a": 1})
+    branch = context.branch()
+    branch.data["new"] = 3
+    del branch.data["drop"]
+    context.data["keep"] = 5
+    context.merge(branch, strategy="overwrite")
+    assert context.data == {"keep": 5, "nested": {"a": 1}, "new": 3}
+
+    branch = context.branch()
+    branch.data["nested"] = {"b": 2}
+    context.merge(branch, strategy="deep_merge")
+    assert context.data["nested"] == {"a": 1, "b": 2}
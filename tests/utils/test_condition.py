@@ -0,0 +1,69 @@
+import pytest
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.pipeline.steps.dummy import DummyConfiguration, DummyStep
+from vogonpoetry.utils.condition import Condition, compile_condition
+
+
+@pytest.mark.parametrize("expression,data,expected", [
+    ("flag", {"flag": True}, True),
+    ("not flag", {"flag": True}, False),
+    ("count > 2 and count <= 5", {"count": 3}, True),
+    ("0 < count < 2", {"count": 3}, False),
+    ("kind == 'tool' or fallback", {"kind": "chat", "fallback": 0}, False),
+    ("'weather' in tags", {"tags": ["weather", "home"]}, True),
+    ("kind not in ('a', 'b')", {"kind": "c"}, True),
+    ("result['status'] == 'ok'", {"result": {"status": "ok"}}, True),
+    ("items[0] is None", {"items": [None]}, True),
+    ("score >= -1", {"score": -0.5}, True),
+])
+def test_condition_evaluates(expression, data, expected):
+    assert Condition(expression)(data) is expected
+
+
+def test_condition_extracts_keys():
+    condition = Condition("a > 1 and b['x'] in c")
+    assert condition.keys == {"a", "b", "c"}
+    assert condition.ready({"a": 2, "b": {}, "c": []})
+    assert not condition.ready({"a": 2})
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "flag.__class__",
+    "len(tags) > 0",
+    "[x for x in tags]",
+    "(x := 1)",
+    "a + b",
+])
+def test_condition_rejects_unsafe_expressions(expression):
+    with pytest.raises(ValueError, match="Unsupported"):
+        Condition(expression)
+
+
+def test_condition_rejects_invalid_syntax():
+    with pytest.raises(ValueError, match="Invalid condition"):
+        Condition("a >")
+
+
+def test_compiled_conditions_are_cached():
+    assert compile_condition("a == 1") is compile_condition("a == 1")
+
+
+def test_step_condition_is_validated_and_evaluated():
+    with pytest.raises(ValueError):
+        DummyStep(id="s", if_="open('x')", options=DummyConfiguration())
+    step = DummyStep(id="s", if_="enabled == True", options=DummyConfiguration())
+    assert step.condition is not None and step.condition.keys == {"enabled"}
+    assert not step.should_skip(BaseContext(data={"enabled": True}))
+    assert step.should_skip(BaseContext(data={"enabled": False}))
+    assert step.should_skip(BaseContext(data={}))
+
+
+def test_step_condition_with_missing_keys_skips_without_evaluating(monkeypatch):
+    step = DummyStep(id="s", if_="classify['media'] > 0.5", options=DummyConfiguration())
+    evaluated = []
+    monkeypatch.setattr(Condition, "__call__", lambda self, data: evaluated.append(data) or True)
+    assert step.should_skip(BaseContext(data={"other": 1}))
+    assert not step.should_skip(BaseContext(data={"classify": {"media": 0.9}}))
+    assert len(evaluated) == 1
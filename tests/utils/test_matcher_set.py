@@ -0,0 +1,80 @@
+import pytest
+from vogonpoetry.utils.filter_config import FilterConfig, FilterUtility
+from vogonpoetry.utils.matcher_set import MatcherSet, rust_available
+from vogonpoetry.utils.pattern_matcher import MatcherString, PatternMatcher
+
+
+def matchers(*patterns):
+    return [PatternMatcher(pattern=MatcherString(pattern)) for pattern in patterns]
+
+NAMES = ["get_weather", "search_web", "file1.txt", "file12.txt", "delete_all", "123-45-6789", "READ_FILE", "snakecase"]
+
+def test_matcher_set_agrees_with_individual_matchers():
+    patterns = matchers("r'\\d{3}-\\d{2}-\\d{4}'", "file?.txt", "get_*", "_web", "/^(del|rm)_(\\w+)$/", "r'(?i)read'")
+    compiled = MatcherSet(patterns)
+    for name in NAMES:
+        assert compiled.matches(name) == any(matcher.matches(name) for matcher in patterns), name
+
+def test_globs_are_anchored_and_literals_escaped():
+    compiled = MatcherSet(matchers("foo*bar", "a.b"))
+    assert compiled.matches("foo_bar")
+    assert not compiled.matches("xfoo_bar")
+    assert compiled.matches("xa.by")
+    assert not compiled.matches("axb")
+
+def test_several_multi_star_globs_compile_together():
+    compiled = MatcherSet(matchers("a*b*c", "x*y*z"))
+    assert compiled.matches("a1b2c") and compiled.matches("x1y2z")
+    assert not compiled.matches("a1b2")
+
+def test_matcher_set_memo_is_bounded():
+    compiled = MatcherSet(matchers("web"), max_entries=2)
+    for name in NAMES:
+        compiled.matches(name)
+    assert len(compiled) == 2
+    assert compiled.matches("search_web")
+
+def test_empty_matcher_set_matches_nothing():
+    assert not MatcherSet([]).matches("anything")
+
+def test_filter_items_applies_chain_in_one_pass():
+    calls = []
+
+    def prop_fn(item):
+        calls.append(item)
+        return item
+
+    filters = [FilterConfig(whitelist=matchers("file*", "get_*")), FilterConfig(blacklist=matchers("12"))]
+    assert FilterUtility.filter_items(filters, NAMES, prop_fn) == ["get_weather", "file1.txt"]
+    assert calls == NAMES
+
+def test_matches_many_batches_and_memoizes():
+    compiled = MatcherSet(matchers("get_*", "web"), backend="python")
+    assert compiled.matches_many(["get_x", "search_web", "other", "get_x"]) == [True, True, False, True]
+    assert len(compiled) == 3
+
+def test_which_reports_matching_pattern_indices():
+    compiled = MatcherSet(matchers("get_*", "web", "r'\\d+'"), backend="python")
+    assert compiled.which("get_web") == [0, 1]
+    assert compiled.which("x1") == [2]
+
+def test_rust_backend_requires_extension():
+    if rust_available():
+        pytest.skip("rust_tag_matcher is installed")
+    with pytest.raises(RuntimeError, match="rust_tag_matcher"):
+        MatcherSet(matchers("web"), backend="rust")
+    assert MatcherSet(matchers("web")).backend == "python"
+
+def test_rust_backend_agrees_with_python():
+    pytest.importorskip("rust_tag_matcher")
+    patterns = matchers("r'\\d{3}-\\d{2}-\\d{4}'", "file?.txt", "get_*", "_web")
+    rust, python = MatcherSet(patterns, backend="rust"), MatcherSet(patterns, backend="python")
+    assert rust.matches_many(NAMES) == python.matches_many(NAMES)
+    assert [rust.which(name) for name in NAMES] == [python.which(name) for name in NAMES]
+
+def test_case_insensitive_set_ignores_case_of_patterns_and_values():
+    compiled = MatcherSet(matchers("Netflix", "r'\\bTV\\b'", "Get_*", "r'(?P<x>Hulu)'"), backend="python", case_sensitive=False)
+    assert compiled.which("open netflix on the tv") == [0, 1]
+    assert compiled.which("GET_WEATHER") == [2]
+    assert compiled.matches("watch HULU")
+    assert not MatcherSet(matchers("Netflix"), backend="python").matches("netflix")
@@ -13,8 +13,12 @@ if __name__ == "__main__":
     context = app.create_context()
 
     async def run_app():
-        result = await app.run(context)
-        _logger.info(f"Pipeline result", result=result)
+        try:
+            await app.warm_up()
+            result = await app.run(context)
+            _logger.info(f"Pipeline result", result=result)
+        finally:
+            await app.close()
 
     asyncio.run(run_app())
     context.metrics.publish_all()
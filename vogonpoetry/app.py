@@ -1,10 +1,21 @@
+import asyncio
+from typing import Literal
+
 from pydantic import BaseModel, Field
 from vogonpoetry.config import Configuration
 from vogonpoetry.context import BaseContext
 from vogonpoetry.embedders import Embedder, EmbedderTypeAdapter
+from vogonpoetry.logging import logger
+from vogonpoetry.mcp.discovery import ToolDiscovery
 from vogonpoetry.messages.base import BaseMessage
 from vogonpoetry.metrics import MetricsCollection
 from vogonpoetry.pipeline.pipeline import Pipeline
+from vogonpoetry.pipeline.scheduler import fork_children
+from vogonpoetry.pipeline.steps.filter_tools import FilterToolsStep
+
+_logger = logger("App")
+
+Readiness = Literal['cold', 'warming_up', 'ready', 'failed']
 
 
 class App:
@@ -14,6 +25,14 @@ class App:
             embedder.name: EmbedderTypeAdapter.validate_python(embedder)
             for embedder in config.embedders
         }
+        self.mcp_servers = {server.id: server for server in config.mcp_servers}
+        self.discovery = ToolDiscovery(config.mcp_servers, config.discovery)
+        self.readiness: Readiness = 'cold'
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up completed and requests are served at full speed."""
+        return self.readiness == 'ready'
 
     @property
     def pipeline(self) -> Pipeline:
@@ -23,17 +42,74 @@ class App:
         return BaseContext(
             visited_steps=[],
             embedders=self.embedders,
-            tools=[],
+            tools=self.discovery.tools,
             data={},
             messages=[
                 BaseMessage(role="system", content="You are a helpful assistant.")
             ],
             metrics=MetricsCollection(),
+            mcp_servers=self.mcp_servers,
         )
 
     async def run(self, context: BaseContext) -> BaseContext:
+        # Served from the catalog caches unless a server's catalog expired or changed.
+        context.tools = await self.discovery.refresh(context.metrics)
+        # Only executes the steps once warmed up; initializes them otherwise.
         return await self.pipeline.run(context)
 
+    async def warm_up(self) -> None:
+        """Get everything a request needs ready ahead of the first request.
+
+        Loads the embedders' models, opens the MCP sessions, discovers the tools,
+        initializes the pipeline steps once and subscribes the tool filters to the tool
+        catalog, then handles the configured warm-up inputs.
+        """
+        self.readiness = 'warming_up'
+        try:
+            await self._warm_up()
+        except Exception:
+            self.readiness = 'failed'
+            raise
+        self.readiness = 'ready'
+        _logger.info("App ready")
+
+    async def _warm_up(self) -> None:
+        servers = list(self.mcp_servers.values())
+        _, started = await asyncio.gather(
+            asyncio.gather(*[embedder.warm_up() for embedder in self.embedders.values()]),
+            asyncio.gather(*[server.start() for server in servers], return_exceptions=True),
+        )
+        for server, result in zip(servers, started):
+            if isinstance(result, Exception):
+                # Sessions are opened again on first use, discovery serves the other servers meanwhile.
+                _logger.warning("MCP server unavailable at startup", server=server.id, error=str(result))
+        context = self.create_context()
+        context.tools = await self.discovery.refresh(context.metrics)
+        await self.pipeline.initialize(context)
+        # Tool filters update their indexes from the catalog diffs rather than on every request.
+        steps = [nested for step in self.pipeline.steps for nested in [step, *fork_children(step)]]
+        await asyncio.gather(*[
+            step.follow(self.discovery, context.metrics) for step in steps if isinstance(step, FilterToolsStep)
+        ])
+
+        inputs = self.config.warm_up.inputs
+        await asyncio.gather(*[
+            context.embed(embedder, text) for embedder in self.embedders.values() for text in inputs
+        ])
+        if self.config.warm_up.run_pipeline:
+            for text in inputs:
+                context = self.create_context()
+                context.messages.append(BaseMessage(role="user", content=text))
+                await self.run(context)
+
+    async def close(self) -> None:
+        """Release resources held by the embedders and MCP sessions."""
+        await self.discovery.close()
+        await asyncio.gather(
+            *[embedder.aclose() for embedder in self.embedders.values()],
+            *[server.close() for server in self.mcp_servers.values()],
+        )
+
 
 # def build(self, config: Configuration) -> Pipeline:
 #         return self._build_pipeline(config.pipeline)
@@ -6,9 +6,23 @@ from pydantic import BaseModel, Field
 
 from vogonpoetry.embedders import Embedder
 from vogonpoetry.mcp.client import MCPClient
+from vogonpoetry.mcp.discovery import DiscoveryConfig
 from vogonpoetry.pipeline.pipeline import Pipeline
 
 
+class WarmUpConfig(BaseModel):
+    """Synthetic requests handled at startup, before the app reports ready."""
+
+    inputs: Annotated[
+        list[str],
+        Field([], description="Messages embedded with every embedder at startup, loading the models and the embedding memo."),
+    ]
+    run_pipeline: Annotated[
+        bool,
+        Field(False, description="Whether the inputs are also run through the whole pipeline, warming step caches. Steps with side effects, such as tool calls, run too."),
+    ]
+
+
 class Configuration(BaseModel):
     """Base configuration for the Vogon Poetry project."""
 
@@ -29,3 +43,11 @@ class Configuration(BaseModel):
     mcp_servers: Annotated[
         list[MCPClient], Field([], description="List of MCP clients in the configuration.")
     ]
+    discovery: Annotated[
+        DiscoveryConfig,
+        Field(default_factory=DiscoveryConfig, description="Tool discovery configuration for the MCP servers."),
+    ]
+    warm_up: Annotated[
+        WarmUpConfig,
+        Field(default_factory=WarmUpConfig, description="Warm-up performed once at startup."),
+    ]
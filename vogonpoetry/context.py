@@ -1,12 +1,71 @@
 """Context classes for the pipeline."""
 
-from typing import Annotated, Any, Optional
+import time
+from collections.abc import Mapping, MutableMapping
+from typing import TYPE_CHECKING, Annotated, Any, Iterator, Optional, Sequence
 from pydantic import BaseModel, Field
 
 from vogonpoetry.embedders import Embedder
+from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.embedders.memo import EmbeddingMemo, MemoKey, shared_embedding_memo
+from vogonpoetry.mcp.client import MCPClient
 from vogonpoetry.messages.base import BaseMessage
 from vogonpoetry.metrics import MetricsCollection
 
+if TYPE_CHECKING:
+    from vogonpoetry.pipeline.scheduler import ScheduleReport
+
+
+class OverlayData(MutableMapping[str, Any]):
+    """Copy-on-write view over a mapping.
+
+    Reads fall through to the base mapping, writes and deletions are kept in the
+    overlay, so creating a view is O(1) regardless of the size of the base. Only
+    top-level keys are copied on write: mutating a value read from the base mutates it
+    in the base as well.
+    """
+
+    def __init__(self, base: Mapping[str, Any]):
+        self.base = base
+        self.writes: dict[str, Any] = {}
+        self.deleted: set[str] = set()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.writes:
+            return self.writes[key]
+        if key in self.deleted:
+            raise KeyError(key)
+        return self.base[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.writes[key] = value
+        self.deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.writes:
+            del self.writes[key]
+            if key in self.base:
+                self.deleted.add(key)
+        elif key in self.base and key not in self.deleted:
+            self.deleted.add(key)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.writes or (key not in self.deleted and key in self.base)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.writes
+        for key in self.base:
+            if key not in self.writes and key not in self.deleted:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"OverlayData(writes={self.writes!r}, deleted={self.deleted!r})"
+
 
 class BaseContext:
     """Base context class for the pipeline."""
@@ -19,6 +78,9 @@ class BaseContext:
         embedders: dict[str, Embedder] = {},
         tools: list[Any] = [],
         metrics: MetricsCollection = MetricsCollection(),
+        embedding_memo: EmbeddingMemo = shared_embedding_memo,
+        mcp_servers: dict[str, MCPClient] = {},
+        deadline: Optional[float] = None,
     ):
         self.visited_steps = visited_steps
         self.data = data
@@ -26,6 +88,53 @@ class BaseContext:
         self.embedders = embedders
         self.tools = tools
         self.metrics = metrics
+        self.embedding_memo = embedding_memo
+        self.embeddings: dict[MemoKey, Sequence[float]] = {}
+        self.mcp_servers = mcp_servers
+        self.schedule: Optional["ScheduleReport"] = None
+        self.parent: Optional["BaseContext"] = None
+        self.deadline = deadline
+
+    def set_timeout(self, seconds: float) -> None:
+        """Set the deadline ``seconds`` from now, unless an earlier deadline is already set."""
+        deadline = time.monotonic() + seconds
+        if self.deadline is None or deadline < self.deadline:
+            self.deadline = deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, never negative, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def branch(self) -> "BaseContext":
+        """A context for a fork branch, with a copy-on-write view of the data.
+
+        Messages, embedders, tools, metrics and the request's embeddings are shared with
+        this context; the data and the steps visited in the branch are the branch's own
+        until merged back with ``merge``.
+        """
+        branch = BaseContext(
+            visited_steps=[],
+            data=OverlayData(self.data),  # type: ignore[arg-type]
+            messages=self.messages,
+            embedders=self.embedders,
+            tools=self.tools,
+            metrics=self.metrics,
+            embedding_memo=self.embedding_memo,
+            mcp_servers=self.mcp_servers,
+            deadline=self.deadline,
+        )
+        branch.embeddings = self.embeddings
+        branch.parent = self
+        return branch
+
+    @property
+    def changes(self) -> Mapping[str, Any]:
+        """The data written in this context: only the branch's own writes for a branch."""
+        if isinstance(self.data, OverlayData):
+            return self.data.writes
+        return self.data
 
     # visited_steps: Annotated[
     #     list[str],
@@ -62,22 +171,46 @@ class BaseContext:
             return None
         return self.messages[-1]
 
+    async def embed(self, embedder: BaseEmbedder, text: str) -> Sequence[float]:
+        """Embed a text once per request, sharing in-flight and recent embeddings across requests."""
+        key = EmbeddingMemo.key(embedder, text)
+        if key in self.embeddings:
+            self.metrics.increment("embedding.request_hits", embedder=embedder.name)
+            return self.embeddings[key]
+        self.metrics.increment(
+            "embedding.memo_hits" if key in self.embedding_memo else "embedding.memo_misses",
+            embedder=embedder.name,
+        )
+        vector = await self.embedding_memo.embed(embedder, text, self.metrics)
+        self.embeddings[key] = vector
+        return vector
+
     def visit(self, step_id: str) -> None:
         self.visited_steps.append(step_id)
 
     def has_visited(self, step_id: str) -> bool:
-        return step_id in self.visited_steps
+        return step_id in self.visited_steps or (self.parent is not None and self.parent.has_visited(step_id))
+
+    def merge(self, *contexts: "BaseContext", strategy="prefix_keys", indices: Optional[Sequence[int]] = None) -> None:
+        """Merge the data written in other contexts, such as fork branches, into this one.
 
-    def merge(self, *contexts: "BaseContext", strategy="prefix_keys") -> None:
+        With ``prefix_keys``, keys are prefixed with ``indices``, the position of each
+        context among the branches of the fork, defaulting to the order given.
+        """
+        for ctx in contexts:
+            if ctx.parent is self:
+                self.visited_steps.extend(ctx.visited_steps)
         if strategy == "prefix_keys":
-            for i, ctx in enumerate(contexts):
-                for k, v in ctx.data.items():
+            for i, ctx in zip(indices if indices is not None else range(len(contexts)), contexts):
+                for k, v in ctx.changes.items():
                     self.data[f"fork_{i}.{k}"] = v
         elif strategy == "overwrite":
             for ctx in contexts:
-                self.data.update(ctx.data)
+                self.data.update(ctx.changes)
+                if isinstance(ctx.data, OverlayData):
+                    for k in ctx.data.deleted:
+                        self.data.pop(k, None)
         elif strategy == "deep_merge":
-            from collections.abc import Mapping
 
             def recursive_merge(d1, d2):
                 for k, v in d2.items():
@@ -91,6 +224,6 @@ class BaseContext:
                         d1[k] = v
 
             for ctx in contexts:
-                recursive_merge(self.data, ctx)
+                recursive_merge(self.data, ctx.changes)
         else:
             raise ValueError(f"Unknown merge strategy: {strategy}")
@@ -1,20 +1,88 @@
-from typing import Annotated, MutableSequence, Sequence
+import asyncio
+import json
+from typing import Annotated, Any, MutableSequence, Optional, Sequence
 
 from pydantic import BaseModel, Field
 
+from vogonpoetry.embedders.batching import BatchingConfig, EmbeddingBatcher
+from vogonpoetry.embedders.cache import EmbeddingCache
+from vogonpoetry.metrics import MetricsCollection
+
 
 class BaseEmbedder(BaseModel):
     """Base configuration class for all embedder configurations."""
     name: Annotated[str, Field(description="Name of the embedder.")]
+    cache_dir: Annotated[Optional[str], Field(None, description="Directory of the persistent cache of catalog embeddings (tag and tool descriptions), disabled if not set.")]
+    batching: Annotated[Optional[BatchingConfig], Field(None, description="Cross-request micro-batching of embed calls, disabled if not set.")]
 
     model_config = {
         "populate_by_name": True,
     }
 
+    @property
+    def embedding_model(self) -> str:
+        """Identifier of the model producing the embeddings."""
+        return ""
+
+    def model_post_init(self, context: Any) -> None:
+        self._cache: Optional[EmbeddingCache] = (
+            EmbeddingCache(self.cache_dir, self.name, self.embedding_model) if self.cache_dir else None
+        )
+        self._batcher: Optional[EmbeddingBatcher] = (
+            EmbeddingBatcher(self.name, self._embed, self.batching) if self.batching else None
+        )
+
     async def embed(
+        self,
+        texts: MutableSequence[str],
+        metrics: Optional[MetricsCollection] = None,
+        persist: bool = False,
+        **kwargs,
+    ) -> MutableSequence[Sequence[float]]:
+        """Embed the input texts.
+
+        With ``persist``, meant for catalog texts such as tag and tool descriptions,
+        unchanged texts are served from the persistent cache if configured and new ones
+        are added to it. Per-request texts like user messages should not be persisted,
+        since every miss adds a segment to the cache.
+        """
+        cache: Optional[EmbeddingCache] = getattr(self, "_cache", None)
+        if cache is None or not persist:
+            return await self._dispatch(texts, metrics, **kwargs)
+        options = json.dumps(kwargs, sort_keys=True, default=repr) if kwargs else ""
+        results: list[Optional[Sequence[float]]] = list(await asyncio.to_thread(cache.get, list(texts), options))
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            vectors = await self._dispatch([texts[i] for i in misses], metrics, **kwargs)
+            await asyncio.to_thread(cache.put, [texts[i] for i in misses], vectors, options)
+            for i, vector in zip(misses, vectors):
+                results[i] = vector
+        return results  # type: ignore
+
+    async def warm_up(self) -> None:
+        """Load models or open connections ahead of the first request."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release resources held by the embedder."""
+        pass
+
+    async def _dispatch(
+        self,
+        texts: MutableSequence[str],
+        metrics: Optional[MetricsCollection],
+        **kwargs,
+    ) -> MutableSequence[Sequence[float]]:
+        batcher: Optional[EmbeddingBatcher] = getattr(self, "_batcher", None)
+        # Calls with their own embed options are not batched with calls using the defaults.
+        if batcher is None or kwargs:
+            return await self._embed(texts, metrics=metrics, **kwargs)
+        return await batcher.embed(texts, metrics)
+
+    async def _embed(
         self,
         texts: MutableSequence[str],
         **kwargs,
     ) -> MutableSequence[Sequence[float]]:
         """Embed the input texts using the embedder model."""
-        raise NotImplementedError("Embed method not implemented.")
\ No newline at end of file
+        raise NotImplementedError("Embed method not implemented.")
@@ -0,0 +1,114 @@
+"""Cross-request micro-batching of embed calls."""
+import asyncio
+from dataclasses import dataclass
+from typing import Annotated, Awaitable, Callable, MutableSequence, Optional, Sequence
+
+from pydantic import BaseModel, Field
+from pymetrics.instruments import Timer, TimerResolution
+
+from vogonpoetry.logging import logger
+from vogonpoetry.metrics import MetricsCollection
+
+EmbedFn = Callable[[MutableSequence[str]], Awaitable[MutableSequence[Sequence[float]]]]
+
+
+class BatchingConfig(BaseModel):
+    """Micro-batching configuration for an embedder."""
+    max_batch_size: Annotated[int, Field(32, gt=0, description="Maximum number of texts sent to the model in one batch.")]
+    max_wait_ms: Annotated[float, Field(5.0, ge=0, description="Maximum time a text waits for a batch to fill, in milliseconds.")]
+
+
+@dataclass
+class _PendingEmbed:
+    texts: list[str]
+    future: asyncio.Future
+    metrics: Optional[MetricsCollection]
+    queue_timer: Optional[Timer]
+
+
+class EmbeddingBatcher:
+    """Collects concurrent embed calls into batches and fans the results back out.
+
+    A batch is dispatched once it holds ``max_batch_size`` texts or the oldest
+    pending call has waited ``max_wait_ms``; a call that would overflow the pending
+    batch dispatches it first. Calls of at least a full batch bypass the queue and are
+    split into batches of ``max_batch_size``.
+    """
+
+    def __init__(self, name: str, embed_fn: EmbedFn, config: BatchingConfig):
+        self.name = name
+        self.config = config
+        self._embed_fn = embed_fn
+        self._pending: list[_PendingEmbed] = []
+        self._pending_size = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: set[asyncio.Task[None]] = set()
+        self._logger = logger(f"EmbeddingBatcher-{name}")
+
+    async def embed(
+        self,
+        texts: MutableSequence[str],
+        metrics: Optional[MetricsCollection] = None,
+    ) -> MutableSequence[Sequence[float]]:
+        """Embed the texts as part of the next batch."""
+        size = self.config.max_batch_size
+        if len(texts) >= size:
+            chunks = [list(texts[i:i + size]) for i in range(0, len(texts), size)]
+            if metrics is not None:
+                for chunk in chunks:
+                    metrics.observe("embedder.batch_size", len(chunk), embedder=self.name)
+            results = await asyncio.gather(*[self._embed_fn(chunk) for chunk in chunks])
+            return [vector for vectors in results for vector in vectors]
+        if self._pending_size + len(texts) > size:
+            self._flush()
+        loop = asyncio.get_running_loop()
+        pending = _PendingEmbed(
+            texts=list(texts),
+            future=loop.create_future(),
+            metrics=metrics,
+            queue_timer=(
+                metrics.timer("embedder.queue_wait", force_new=True, resolution=TimerResolution.NANOSECONDS, embedder=self.name)
+                if metrics is not None
+                else None
+            ),
+        )
+        self._pending.append(pending)
+        self._pending_size += len(pending.texts)
+        if self._pending_size >= self.config.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.config.max_wait_ms / 1000, self._flush)
+        return await pending.future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_size = self._pending, [], 0
+        batch = [pending for pending in batch if not pending.future.done()]
+        if batch:
+            # Referenced until done so the task is not garbage collected mid-flight.
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list[_PendingEmbed]) -> None:
+        texts = [text for pending in batch for text in pending.texts]
+        for pending in batch:
+            if pending.queue_timer is not None:
+                pending.queue_timer.stop()
+            if pending.metrics is not None:
+                pending.metrics.observe("embedder.batch_size", len(texts), embedder=self.name)
+        self._logger.debug("Dispatching embedding batch", calls=len(batch), texts=len(texts))
+        try:
+            vectors = await self._embed_fn(texts)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        offset = 0
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_result(vectors[offset:offset + len(pending.texts)])
+            offset += len(pending.texts)
@@ -0,0 +1,111 @@
+"""Persistent, content-addressed embedding cache."""
+import hashlib
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from vogonpoetry.logging import logger
+
+_logger = logger(__name__)
+
+
+def _safe_component(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value) or "_"
+
+
+class EmbeddingCache:
+    """On-disk cache of embeddings keyed by the digest of the embedded text.
+
+    Vectors are stored in immutable ``.npy`` segments that are memory-mapped on read,
+    so unchanged texts load without re-embedding and the pages are shared by every
+    process using the same cache directory. An append-only ``index.jsonl`` maps text
+    digests to ``(segment, row)``; other processes' appends are picked up lazily.
+    """
+
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, root: str | os.PathLike, *namespace: str):
+        self.path = Path(root).joinpath(*[_safe_component(part) for part in namespace])
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.path / self.INDEX_FILE
+        self._index: dict[str, tuple[str, int]] = {}
+        self._index_offset = 0
+        self._segments: dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def digest(text: str, options: str = "") -> str:
+        """Content address of a text embedded with the given serialized embed options."""
+        payload = f"{options}\0{text}" if options else text
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._index)
+
+    def _refresh(self) -> None:
+        """Read index entries appended since the last refresh."""
+        if not self._index_path.exists():
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            chunk = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-append.
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line:
+                continue
+            try:
+                digest, segment, row = json.loads(line)
+            except ValueError:
+                _logger.warning("Skipping corrupt embedding cache index entry", path=str(self._index_path))
+                continue
+            self._index[digest] = (segment, row)
+        self._index_offset += end
+
+    def _segment(self, name: str) -> np.ndarray:
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = np.load(self.path / f"{name}.npy", mmap_mode="r")
+            self._segments[name] = segment
+        return segment
+
+    def get(self, texts: Sequence[str], options: str = "") -> list[Optional[np.ndarray]]:
+        """Look up the cached vectors of the texts, ``None`` for misses."""
+        self._refresh()
+        results: list[Optional[np.ndarray]] = []
+        for text in texts:
+            entry = self._index.get(self.digest(text, options))
+            if entry is None:
+                results.append(None)
+                continue
+            try:
+                results.append(self._segment(entry[0])[entry[1]])
+            except (OSError, ValueError, IndexError):
+                _logger.warning("Embedding cache segment unreadable", segment=entry[0])
+                results.append(None)
+        return results
+
+    def put(self, texts: Sequence[str], vectors: Sequence[Sequence[float]], options: str = "") -> None:
+        """Store the vectors of the texts as a new segment."""
+        if not texts:
+            return
+        segment = uuid.uuid4().hex
+        tmp_path = self.path / f".{segment}.npy.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32))
+        os.replace(tmp_path, self.path / f"{segment}.npy")
+        lines = "".join(
+            json.dumps([self.digest(text, options), segment, row]) + "\n"
+            for row, text in enumerate(texts)
+        )
+        # A single O_APPEND write keeps concurrent writers from interleaving lines.
+        fd = os.open(self._index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
@@ -1,8 +1,48 @@
-from typing import Annotated, Any, Literal, MutableSequence, Sequence
-from sentence_transformers import SentenceTransformer
+import asyncio
+import multiprocessing
+import threading
+from contextlib import nullcontext
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Annotated, Any, Literal, MutableSequence, Optional, Sequence
 from pydantic import Field
 from vogonpoetry.logging import logger
 from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.embedders.models import model_registry
+from vogonpoetry.metrics import MetricsCollection
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+ExecutorType = Literal['thread', 'process', 'inline']
+
+_worker_model: Optional["SentenceTransformer"] = None
+
+
+def _encode(model: "SentenceTransformer", texts: list[str]) -> list[list[float]]:
+    encodings = model.encode(texts, convert_to_tensor=False)
+    if isinstance(encodings, list):
+        return [encoding.tolist() for encoding in encodings]
+    result = encodings.tolist()
+    if result and not isinstance(result[0], list):
+        return [result]
+    return result
+
+
+def _init_worker(model_name: str) -> None:
+    """Load the model once per worker process."""
+    global _worker_model
+    _worker_model = model_registry.acquire(model_name)
+
+
+def _encode_in_worker(texts: list[str]) -> list[list[float]]:
+    if _worker_model is None:
+        raise RuntimeError("Embedding worker was not initialized.")
+    return _encode(_worker_model, texts)
+
+
+def _warm_up_worker() -> None:
+    """No-op submitted to force a worker, and with it the model, to start."""
+    pass
 
 
 class LocalEmbedder(BaseEmbedder):
@@ -12,22 +52,105 @@ class LocalEmbedder(BaseEmbedder):
     model_name: Annotated[
         str, Field(description="Name of the model to use for embedding.")
     ]
+    executor: Annotated[
+        ExecutorType,
+        Field(default="thread", description="Where inference runs: a thread pool, a process pool with the model loaded per worker, or inline on the event loop."),
+    ]
+    max_workers: Annotated[
+        int, Field(default=1, gt=0, description="Number of inference workers.")
+    ]
+    max_queue_depth: Annotated[
+        int, Field(default=64, gt=0, description="Maximum number of queued or running inference calls before new calls are rejected.")
+    ]
+
+    @property
+    def embedding_model(self) -> str:
+        return self.model_name
 
     def model_post_init(self, context: Any) -> None:
-        """Initialize the sentence transformer model."""
-        self._model = SentenceTransformer(self.model_name)
+        """Initialize the embedder. The model itself is loaded on first use or warm-up."""
+        super().model_post_init(context)
+        self._model: Optional["SentenceTransformer"] = None
+        self._model_lock = threading.Lock()
         self._logger = logger(f"LocalEmbedder-{self.name}")
+        self._executor: Optional[Executor] = None
+        self._queue_depth = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"LocalEmbedder-{self.name}",
+                )
+        return self._executor
 
-    async def embed(
+    def _acquire_model(self) -> "SentenceTransformer":
+        """Get the model from the shared registry, taking a single reference per embedder."""
+        with self._model_lock:
+            if self._model is None:
+                self._model = model_registry.acquire(self.model_name)
+            return self._model
+
+    def _encode_local(self, texts: list[str]) -> list[list[float]]:
+        return _encode(self._acquire_model(), texts)
+
+    async def warm_up(self) -> None:
+        """Load the model ahead of the first request."""
+        if self.executor == "inline":
+            self._acquire_model()
+            return
+        loop = asyncio.get_running_loop()
+        if self.executor == "process":
+            await asyncio.gather(*[
+                loop.run_in_executor(self._get_executor(), _warm_up_worker)
+                for _ in range(self.max_workers)
+            ])
+        else:
+            await loop.run_in_executor(self._get_executor(), self._acquire_model)
+
+    async def aclose(self) -> None:
+        """Shut down the inference executor and release the model."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self._model_lock:
+            if self._model is not None:
+                self._model = None
+                model_registry.release(self.model_name)
+
+    async def _embed(
         self,
         texts: MutableSequence[str],
+        metrics: Optional[MetricsCollection] = None,
         **kwargs,
     ) -> MutableSequence[Sequence[float]]:
         """Embed the input texts using the sentence transformer model."""
         self._logger.debug(
             "Classifying using local embeddings with model %s", self.model_name
         )
-        encodings = self._model.encode(list(texts), convert_to_tensor=False)
-        if not isinstance(encodings, list):
-            return [encodings.tolist()]
-        return [encoding.tolist() for encoding in encodings]
+        if self.executor == "inline":
+            return self._encode_local(list(texts))
+        if self._queue_depth >= self.max_queue_depth:
+            if metrics is not None:
+                metrics.increment("embedder.rejections", embedder=self.name)
+            raise RuntimeError(f"Local embedder '{self.name}' inference queue is full.")
+        self._queue_depth += 1
+        if metrics is not None:
+            metrics.observe("embedder.queue_depth", self._queue_depth, embedder=self.name)
+        try:
+            loop = asyncio.get_running_loop()
+            timer = metrics.timer("embedder.inference_time", embedder=self.name) if metrics is not None else nullcontext()
+            with timer:
+                if self.executor == "process":
+                    return await loop.run_in_executor(self._get_executor(), _encode_in_worker, list(texts))
+                return await loop.run_in_executor(self._get_executor(), self._encode_local, list(texts))
+        finally:
+            self._queue_depth -= 1
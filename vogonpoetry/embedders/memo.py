@@ -0,0 +1,74 @@
+"""Process-wide memo of single-text embeddings."""
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.metrics import MetricsCollection
+
+MemoKey = tuple[str, str, str]
+
+
+class EmbeddingMemo:
+    """Bounded LRU of embeddings with single-flight semantics.
+
+    Concurrent lookups of the same (embedder, text) share one in-flight ``embed``
+    call instead of each issuing their own. Failed calls are not memoized.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[MemoKey, Sequence[float]] = OrderedDict()
+        self._in_flight: dict[MemoKey, asyncio.Future[Sequence[float]]] = {}
+
+    @staticmethod
+    def key(embedder: BaseEmbedder, text: str) -> MemoKey:
+        return (embedder.name, getattr(embedder, "embedding_model", ""), text)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: MemoKey) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _store(self, key: MemoKey, vector: Sequence[float]) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(
+        self,
+        embedder: BaseEmbedder,
+        key: MemoKey,
+        text: str,
+        metrics: Optional[MetricsCollection],
+    ) -> Sequence[float]:
+        vectors = await embedder.embed([text], metrics=metrics)
+        self._store(key, vectors[0])
+        return vectors[0]
+
+    async def embed(
+        self,
+        embedder: BaseEmbedder,
+        text: str,
+        metrics: Optional[MetricsCollection] = None,
+    ) -> Sequence[float]:
+        """Get the embedding of the text, embedding it at most once across concurrent callers."""
+        key = self.key(embedder, text)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(embedder, key, text, metrics))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the call the others are waiting on.
+        return await asyncio.shield(future)
+
+
+shared_embedding_memo = EmbeddingMemo()
@@ -0,0 +1,72 @@
+"""Process-wide registry of local embedding models."""
+import threading
+from typing import TYPE_CHECKING, Any
+
+from vogonpoetry.logging import logger
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+_logger = logger(__name__)
+
+
+def load_sentence_transformer(model_name: str) -> "SentenceTransformer":
+    """Load a sentence transformer, deferring the heavy import until a model is needed."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+class ModelRegistry:
+    """Loads each model once per process and reference-counts its users.
+
+    Loading is thread-safe, so models can be acquired from inference worker threads
+    without blocking the event loop. A model is dropped once its last user releases it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._models: dict[str, Any] = {}
+        self._ref_counts: dict[str, int] = {}
+
+    def __contains__(self, model_name: str) -> bool:
+        return model_name in self._models
+
+    def ref_count(self, model_name: str) -> int:
+        return self._ref_counts.get(model_name, 0)
+
+    def acquire(self, model_name: str) -> "SentenceTransformer":
+        """Get the model, loading it on first use, and take a reference to it."""
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+        # Loads of different models proceed in parallel, loads of the same model only once.
+        with load_lock:
+            with self._lock:
+                model = self._models.get(model_name)
+            if model is None:
+                _logger.info("Loading embedding model", model=model_name)
+                model = load_sentence_transformer(model_name)
+            with self._lock:
+                self._models[model_name] = model
+                self._ref_counts[model_name] = self._ref_counts.get(model_name, 0) + 1
+        return model
+
+    def release(self, model_name: str) -> None:
+        """Drop a reference to the model, unloading it when it is no longer used."""
+        with self._lock:
+            count = self._ref_counts.get(model_name, 0) - 1
+            if count > 0:
+                self._ref_counts[model_name] = count
+                return
+            self._ref_counts.pop(model_name, None)
+            self._models.pop(model_name, None)
+        _logger.info("Unloaded embedding model", model=model_name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._ref_counts.clear()
+
+
+model_registry = ModelRegistry()
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Annotated, Any, Literal, MutableSequence, Optional, Sequence
 
 import httpx
@@ -5,6 +6,8 @@ from pydantic import Field
 from vogonpoetry.logging import logger
 from vogonpoetry.embedders.base import BaseEmbedder
 
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 502, 503, 504})
+
 
 class RemoteEmbedder(BaseEmbedder):
     """Configuration for remote embedder."""
@@ -13,26 +16,85 @@ class RemoteEmbedder(BaseEmbedder):
     url: Annotated[str, Field(description="URL of the remote embedder service.")]
     headers: Annotated[Optional[dict[str, str]], Field(default_factory=dict, description="Headers to include in the request to the remote embedder service.")]
     timeout: Annotated[Optional[int], Field(default=30, description="Timeout for the request to the remote embedder service.")]
+    http2: Annotated[bool, Field(default=False, description="Whether to use HTTP/2, requires the 'h2' package.")]
+    max_connections: Annotated[int, Field(default=10, gt=0, description="Maximum number of pooled connections to the remote embedder service.")]
+    keepalive_expiry: Annotated[float, Field(default=30.0, ge=0, description="Seconds an idle pooled connection is kept alive.")]
+    max_concurrency: Annotated[int, Field(default=8, gt=0, description="Maximum number of concurrent requests to the remote embedder service.")]
+    chunk_size: Annotated[int, Field(default=64, gt=0, description="Maximum number of texts sent in a single request.")]
+    max_retries: Annotated[int, Field(default=2, ge=0, description="Number of retries for transient failures.")]
+    retry_backoff: Annotated[float, Field(default=0.25, ge=0, description="Base delay in seconds of the exponential retry backoff.")]
+
+    @property
+    def embedding_model(self) -> str:
+        return self.model
 
     def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
         self._logger = logger(f"RemoteEmbedder-{self.name}")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
-    async def embed(
-        self,
-        texts: MutableSequence[str],
-        **kwargs,
-    ) -> MutableSequence[Sequence[float]]:
-        """Embed the input texts using the remote embedder model."""
-        self._logger.debug("Classifying using remote embeddings from %s", self.url)
+    def _get_client(self) -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """Get the pooled client, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._semaphore is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout or 30,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            self._client_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client, self._semaphore
+
+    async def aclose(self) -> None:
+        """Close the pooled client."""
+        client, self._client, self._client_loop, self._semaphore = self._client, None, None, None
+        if client is not None:
+            await client.aclose()
+
+    async def _post(self, texts: MutableSequence[str]) -> MutableSequence[Sequence[float]]:
         payload: dict[str, Any] = {"input": texts}
         headers: dict[str, str] = self.headers or {}
-        timeout: int = self.timeout or 30
 
         if self.model:
             payload["model"] = self.model
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(self.url, json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("data", [])
\ No newline at end of file
+        client, semaphore = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    response = await client.post(self.url, json=payload, headers=headers)
+                    response.raise_for_status()
+                    return response.json().get("data", [])
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                # Only retry failures that are safe to repeat: the request never reached the
+                # service, timed out, or the service asked us to back off.
+                retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                self._logger.warning("Retrying remote embedding request", attempt=attempt + 1, delay=delay, error=str(e))
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _embed(
+        self,
+        texts: MutableSequence[str],
+        **kwargs,
+    ) -> MutableSequence[Sequence[float]]:
+        """Embed the input texts using the remote embedder model."""
+        self._logger.debug("Classifying using remote embeddings from %s", self.url)
+        if len(texts) <= self.chunk_size:
+            return await self._post(texts)
+        chunks = await asyncio.gather(*[
+            self._post(texts[i:i + self.chunk_size])
+            for i in range(0, len(texts), self.chunk_size)
+        ])
+        return [vector for chunk in chunks for vector in chunk]
@@ -0,0 +1,21 @@
+"""Vector indexes for similarity search over tag and tool catalogs."""
+from typing import Annotated, Union
+
+from pydantic import Field, TypeAdapter
+
+from vogonpoetry.index.exact import ExactVectorIndex
+from vogonpoetry.index.ivf import IVFVectorIndex
+
+
+VectorIndex = Annotated[
+    Union[
+        ExactVectorIndex,
+        IVFVectorIndex,
+    ],
+    Field(
+        description="Configuration for the vector index used for similarity search.",
+        discriminator="type"
+    )
+]
+
+VectorIndexTypeAdapter = TypeAdapter(VectorIndex)
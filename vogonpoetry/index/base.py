@@ -0,0 +1,92 @@
+"""Base vector index for similarity search."""
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix (or a single vector), leaving zero rows untouched."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+
+@dataclass
+class IndexStats:
+    """Search latency and sampled recall of a vector index."""
+    searches: int = 0
+    total_time_ns: int = 0
+    recall_samples: int = 0
+    recall_total: float = 0.0
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return self.total_time_ns / self.searches / 1e6 if self.searches else 0.0
+
+    @property
+    def recall(self) -> Optional[float]:
+        """Mean recall against exact search over the sampled queries, if any."""
+        return self.recall_total / self.recall_samples if self.recall_samples else None
+
+
+SearchResult = tuple[np.ndarray, np.ndarray]
+
+
+class BaseVectorIndex(BaseModel):
+    """Base configuration class for vector indexes over row-normalized matrices.
+
+    Scores are cosine similarities, i.e. dot products of normalized vectors.
+    """
+
+    def model_post_init(self, context: Any) -> None:
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._stats = IndexStats()
+
+    @property
+    def stats(self) -> IndexStats:
+        return self._stats
+
+    def __len__(self) -> int:
+        return self._matrix.shape[0]
+
+    def build(self, matrix: np.ndarray) -> None:
+        """(Re)build the index over a row-normalized matrix."""
+        self._matrix = matrix
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> SearchResult:
+        """Find the rows most similar to the normalized query.
+
+        Returns the row indices and scores in descending score order, limited to the
+        top ``k`` and/or the rows scoring strictly above ``threshold``.
+        """
+        start = time.perf_counter_ns()
+        if len(self) == 0:
+            result: SearchResult = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        else:
+            result = self._search(query, k, threshold)
+        self.stats.searches += 1
+        self.stats.total_time_ns += time.perf_counter_ns() - start
+        return result
+
+    def _search(self, query: np.ndarray, k: Optional[int], threshold: Optional[float]) -> SearchResult:
+        raise NotImplementedError("Search method not implemented.")
+
+
+def select(indices: np.ndarray, scores: np.ndarray, k: Optional[int], threshold: Optional[float]) -> SearchResult:
+    """Apply the threshold and top-k to candidate rows, ordered by descending score."""
+    if threshold is not None:
+        mask = scores > threshold
+        indices, scores = indices[mask], scores[mask]
+    if k is not None and k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        indices, scores = indices[top], scores[top]
+    order = np.argsort(-scores, kind="stable")
+    return indices[order], scores[order]
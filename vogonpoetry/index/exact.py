@@ -0,0 +1,15 @@
+"""Exact (brute-force) vector index."""
+from typing import Literal, Optional
+
+import numpy as np
+
+from vogonpoetry.index.base import BaseVectorIndex, SearchResult, select
+
+
+class ExactVectorIndex(BaseVectorIndex):
+    """Scores the query against every row with a single matrix-vector product."""
+    type: Literal['exact'] = 'exact'
+
+    def _search(self, query: np.ndarray, k: Optional[int], threshold: Optional[float]) -> SearchResult:
+        scores = self._matrix @ query
+        return select(np.arange(len(scores)), scores, k, threshold)
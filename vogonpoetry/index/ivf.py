@@ -0,0 +1,76 @@
+"""Approximate inverted-file (IVF) vector index."""
+import random
+from typing import Annotated, Any, Literal, Optional
+
+import numpy as np
+from pydantic import Field
+
+from vogonpoetry.index.base import BaseVectorIndex, SearchResult, normalize, select
+
+
+class IVFVectorIndex(BaseVectorIndex):
+    """Partitions the rows with spherical k-means and only searches the closest partitions.
+
+    A query is compared against the ``n_lists`` centroids and then exhaustively against
+    the rows of the ``n_probe`` best partitions. Catalogs smaller than ``min_size`` are
+    searched exactly.
+    """
+    type: Literal['ivf'] = 'ivf'
+    n_lists: Annotated[Optional[int], Field(None, gt=0, description="Number of partitions, defaults to the square root of the catalog size.")]
+    n_probe: Annotated[int, Field(8, gt=0, description="Number of partitions searched per query.")]
+    iterations: Annotated[int, Field(10, gt=0, description="Number of k-means iterations when building.")]
+    min_size: Annotated[int, Field(1024, ge=0, description="Catalogs smaller than this are searched exactly.")]
+    recall_sample_rate: Annotated[float, Field(0.0, ge=0.0, le=1.0, description="Fraction of searches that are also run exactly to estimate recall.")]
+    seed: Annotated[int, Field(0, description="Seed for centroid initialization and recall sampling.")]
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        self._centroids = np.zeros((0, 0), dtype=np.float32)
+        self._lists: list[np.ndarray] = []
+        self._random = random.Random(self.seed)
+
+    def build(self, matrix: np.ndarray) -> None:
+        super().build(matrix)
+        n = matrix.shape[0]
+        if n < max(self.min_size, 1):
+            self._centroids = np.zeros((0, 0), dtype=np.float32)
+            self._lists = []
+            return
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(n))), n)
+        rng = np.random.default_rng(self.seed)
+        centroids = matrix[rng.choice(n, size=n_lists, replace=False)]
+        assignments = np.zeros(n, dtype=np.int64)
+        for _ in range(self.iterations):
+            assignments = np.argmax(matrix @ centroids.T, axis=1)
+            order = np.argsort(assignments, kind="stable")
+            sorted_assignments = assignments[order]
+            starts = np.flatnonzero(np.r_[True, sorted_assignments[1:] != sorted_assignments[:-1]])
+            sums = np.zeros_like(centroids)
+            sums[sorted_assignments[starts]] = np.add.reduceat(matrix[order], starts, axis=0)
+            empty = np.flatnonzero(np.bincount(assignments, minlength=n_lists) == 0)
+            if len(empty):
+                # Re-seed empty partitions with random rows so every centroid stays useful.
+                sums[empty] = matrix[rng.choice(n, size=len(empty), replace=False)]
+            centroids = normalize(sums)
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self._centroids = centroids
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(n_lists)]
+
+    def _exact(self, query: np.ndarray, k: Optional[int], threshold: Optional[float]) -> SearchResult:
+        scores = self._matrix @ query
+        return select(np.arange(len(scores)), scores, k, threshold)
+
+    def _search(self, query: np.ndarray, k: Optional[int], threshold: Optional[float]) -> SearchResult:
+        if not self._lists:
+            return self._exact(query, k, threshold)
+        n_probe = min(self.n_probe, len(self._lists))
+        probes = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        candidates = np.concatenate([self._lists[i] for i in probes])
+        result = select(candidates, self._matrix[candidates] @ query, k, threshold)
+        if self.recall_sample_rate and self._random.random() < self.recall_sample_rate:
+            expected = self._exact(query, k, threshold)[0]
+            found = np.intersect1d(result[0], expected).size
+            self.stats.recall_samples += 1
+            self.stats.recall_total += found / expected.size if expected.size else 1.0
+        return result
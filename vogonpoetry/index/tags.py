@@ -0,0 +1,133 @@
+"""Inverted index from tags to the tools carrying them."""
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from vogonpoetry.index.tools import default_tool_key
+from vogonpoetry.mcp.catalog import CatalogDiff
+
+
+def tag_weights(tags: Any) -> dict[str, float]:
+    """Normalize the tags found in the context to a tag → weight mapping.
+
+    Accepts a sequence of tag ids (all weighted 1.0) or a mapping of tag ids to
+    ``TagScore``-like objects or plain numbers, as produced by the classify step.
+    """
+    if isinstance(tags, Mapping):
+        return {
+            tag: float(getattr(value, "score", value) if value is not None else 0.0)
+            for tag, value in tags.items()
+        }
+    if isinstance(tags, str):
+        return {tags: 1.0}
+    return {tag: 1.0 for tag in tags}
+
+
+def tool_tags(tool: Any) -> frozenset[str]:
+    """Tags of a tool, either a ``tags`` attribute or the tags FastMCP servers put in the tool's meta."""
+    tags = getattr(tool, "tags", None)
+    if tags is None:
+        meta = getattr(tool, "meta", None) or {}
+        tags = (meta.get("_fastmcp") or {}).get("tags")
+    return frozenset(tags or ())
+
+
+class TagToolIndex:
+    """Posting sets of tool slots per tag.
+
+    Every tool gets a stable integer slot when it is added; filtering is the union of
+    the posting sets of the requested tags. The catalog is synced incrementally so
+    only tools that are new, removed or whose tags changed touch the postings.
+    """
+
+    def __init__(self, key_fn: Callable[[Any], str] = default_tool_key):
+        self._key_fn = key_fn
+        self._slots: dict[str, int] = {}
+        self._tools: dict[int, Any] = {}
+        self._tags: dict[int, frozenset[str]] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._next_slot = 0
+        self._catalog: Optional[Sequence[Any]] = None
+        self._catalog_size = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    def postings(self, tag: str) -> frozenset[int]:
+        return frozenset(self._postings.get(tag, ()))
+
+    def add(self, tools: Iterable[Any]) -> None:
+        """Add tools to the index, re-indexing tools already present if their tags changed."""
+        for tool in tools:
+            key = self._key_fn(tool)
+            tags = tool_tags(tool)
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._next_slot
+                self._next_slot += 1
+                self._slots[key] = slot
+            elif self._tags[slot] != tags:
+                self._unpost(slot)
+            else:
+                self._tools[slot] = tool
+                continue
+            self._tools[slot] = tool
+            self._tags[slot] = tags
+            for tag in tags:
+                self._postings.setdefault(tag, set()).add(slot)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Remove tools from the index by key."""
+        for key in keys:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                continue
+            self._unpost(slot)
+            del self._tools[slot]
+            del self._tags[slot]
+
+    def apply(self, diff: CatalogDiff[Any]) -> None:
+        """Apply a catalog diff without rescanning the rest of the catalog."""
+        self.remove(diff.removed)
+        self.add([*diff.added, *diff.changed])
+        self._catalog = None
+
+    def update(self, tools: Sequence[Any]) -> None:
+        """Bring the index in line with the tool catalog.
+
+        Passing the same catalog list again (with the same length) is a no-op, so this is
+        cheap to call per request; a new catalog is diffed against the indexed tools.
+        """
+        if tools is self._catalog and len(tools) == self._catalog_size:
+            return
+        keys = {self._key_fn(tool) for tool in tools}
+        self.remove([key for key in self._slots if key not in keys])
+        self.add(tools)
+        self._catalog = tools
+        self._catalog_size = len(tools)
+
+    def match(self, tags: Iterable[str]) -> list[Any]:
+        """Tools carrying any of the tags, in the order they were indexed."""
+        slots: set[int] = set()
+        for tag in tags:
+            posting = self._postings.get(tag)
+            if posting:
+                slots |= posting
+        return [self._tools[slot] for slot in sorted(slots)]
+
+    def score(self, weights: Mapping[str, float]) -> list[tuple[Any, float]]:
+        """Tools carrying any of the tags with the sum of their matched tag weights, best first."""
+        totals: dict[int, float] = {}
+        for tag, weight in weights.items():
+            for slot in self._postings.get(tag, ()):
+                totals[slot] = totals.get(slot, 0.0) + weight
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(self._tools[slot], total) for slot, total in ranked]
+
+    def _unpost(self, slot: int) -> None:
+        for tag in self._tags[slot]:
+            posting = self._postings[tag]
+            posting.discard(slot)
+            if not posting:
+                del self._postings[tag]
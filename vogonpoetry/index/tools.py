@@ -0,0 +1,132 @@
+"""Precomputed index of tool description vectors."""
+import asyncio
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.index.base import BaseVectorIndex, normalize
+from vogonpoetry.index.exact import ExactVectorIndex
+from vogonpoetry.mcp.catalog import CatalogDiff
+from vogonpoetry.metrics import MetricsCollection
+
+
+def default_tool_key(tool: Any) -> str:
+    return getattr(tool, "name", None) or tool.description
+
+
+class ToolVectorIndex:
+    """Normalized tool description vectors kept in a vector index.
+
+    Tools are embedded once; updating the catalog only re-embeds tools that are new
+    or whose description changed, and only rebuilds the index if the catalog changed.
+    Updates are serialized, so concurrent requests never rebuild from a half-applied one.
+    """
+
+    def __init__(
+        self,
+        index: Optional[BaseVectorIndex] = None,
+        key_fn: Callable[[Any], str] = default_tool_key,
+    ):
+        self.index = index if index is not None else ExactVectorIndex()
+        self._key_fn = key_fn
+        self._entries: dict[str, tuple[str, np.ndarray]] = {}
+        self._keys: list[str] = []
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    async def update(
+        self,
+        embedder: BaseEmbedder,
+        tools: Sequence[Any],
+        metrics: Optional[MetricsCollection] = None,
+    ) -> None:
+        """Bring the index in line with the tool catalog."""
+        async with self._lock:
+            await self._update(embedder, tools, metrics)
+
+    async def _update(
+        self,
+        embedder: BaseEmbedder,
+        tools: Sequence[Any],
+        metrics: Optional[MetricsCollection],
+    ) -> None:
+        tools_by_key = {self._key_fn(tool): tool for tool in tools}
+        keys = list(tools_by_key)
+        stale = [
+            (key, tool.description)
+            for key, tool in tools_by_key.items()
+            if key not in self._entries or self._entries[key][0] != tool.description
+        ]
+        await self._embed(embedder, stale, metrics)
+        if not stale and keys == self._keys:
+            return
+        for key in self._entries.keys() - tools_by_key.keys():
+            del self._entries[key]
+        self._keys = keys
+        self._build()
+
+    async def apply(
+        self,
+        embedder: BaseEmbedder,
+        diff: CatalogDiff[Any],
+        metrics: Optional[MetricsCollection] = None,
+    ) -> None:
+        """Apply a catalog diff, embedding only the added and changed tools."""
+        if not diff:
+            return
+        async with self._lock:
+            await self._apply(embedder, diff, metrics)
+
+    async def _apply(
+        self,
+        embedder: BaseEmbedder,
+        diff: CatalogDiff[Any],
+        metrics: Optional[MetricsCollection],
+    ) -> None:
+        stale = [
+            (key, tool.description)
+            for key, tool in ((self._key_fn(tool), tool) for tool in [*diff.added, *diff.changed])
+            if key not in self._entries or self._entries[key][0] != tool.description
+        ]
+        await self._embed(embedder, stale, metrics)
+        removed = set(diff.removed)
+        for key in removed:
+            self._entries.pop(key, None)
+        self._keys = [key for key in dict.fromkeys([*self._keys, *(self._key_fn(tool) for tool in diff.added)]) if key not in removed]
+        self._build()
+
+    async def _embed(
+        self,
+        embedder: BaseEmbedder,
+        stale: list[tuple[str, str]],
+        metrics: Optional[MetricsCollection],
+    ) -> None:
+        if not stale:
+            return
+        vectors = await embedder.embed([description for _, description in stale], metrics=metrics, persist=True)
+        normalized = normalize(np.asarray(vectors, dtype=np.float32))
+        for (key, description), vector in zip(stale, normalized):
+            self._entries[key] = (description, vector)
+        if metrics is not None:
+            metrics.observe("tool_index.embedded", len(stale))
+
+    def _build(self) -> None:
+        if self._keys:
+            self.index.build(np.ascontiguousarray(np.stack([self._entries[key][1] for key in self._keys])))
+        else:
+            self.index.build(np.zeros((0, 0), dtype=np.float32))
+
+    def search(self, vector: Sequence[float], threshold: float) -> list[str]:
+        """Keys of the tools scoring at or above the threshold."""
+        if not self._keys:
+            return []
+        # The index keeps scores strictly above the threshold, tools scoring exactly at it pass too.
+        inclusive = float(np.nextafter(np.float32(threshold), np.float32(-np.inf)))
+        indices, _ = self.index.search(normalize(np.asarray(vector, dtype=np.float32)), threshold=inclusive)
+        return [self._keys[i] for i in indices.tolist()]
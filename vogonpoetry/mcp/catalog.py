@@ -0,0 +1,144 @@
+"""Versioned, TTL-cached MCP catalogs (tools, prompts)."""
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Optional, Sequence, TypeVar
+
+from vogonpoetry.logging import logger
+
+T = TypeVar('T')
+
+
+def fingerprint(item: Any) -> str:
+    """Content hash of a catalog item, used to detect changed entries."""
+    payload = item.model_dump_json() if hasattr(item, "model_dump_json") else repr(item)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CatalogDiff(Generic[T]):
+    """Changes between two versions of a catalog, keyed by item name."""
+    version: str
+    added: list[T] = field(default_factory=list)
+    changed: list[T] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+@dataclass
+class Catalog(Generic[T]):
+    """A fetched catalog with its ETag-like version."""
+    items: list[T]
+    version: str
+    fingerprints: dict[str, str]
+    fetched_at: float
+
+
+CatalogListener = Callable[[CatalogDiff[T]], Any]
+
+
+class CatalogCache(Generic[T]):
+    """Caches a catalog fetched from an MCP server.
+
+    The catalog is refetched once its TTL expired or after ``invalidate`` (e.g. on a
+    ``list_changed`` notification). The version is a hash of the item fingerprints,
+    so it only changes when the content does; listeners receive the diff against the
+    previous version so they can update incrementally.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Sequence[T]]],
+        key_fn: Callable[[T], str],
+        ttl: Optional[float] = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self._fetch = fetch
+        self._key_fn = key_fn
+        self._logger = logger(f"CatalogCache-{name}")
+        self._catalog: Optional[Catalog[T]] = None
+        self._stale = True
+        self._in_flight: Optional[asyncio.Future[Catalog[T]]] = None
+        self._listeners: list[CatalogListener[T]] = []
+        self.fetches = 0
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._catalog.version if self._catalog else None
+
+    @property
+    def fresh(self) -> bool:
+        if self._catalog is None or self._stale:
+            return False
+        return self.ttl is None or time.monotonic() - self._catalog.fetched_at < self.ttl
+
+    def subscribe(self, listener: CatalogListener[T]) -> None:
+        """Register a callback (sync or async) receiving the diff whenever the catalog changes."""
+        self._listeners.append(listener)
+
+    def invalidate(self) -> None:
+        """Mark the catalog stale so the next read refetches it."""
+        self._stale = True
+
+    async def get(self, force: bool = False) -> Catalog[T]:
+        """Get the catalog, refetching it if stale. Concurrent refetches share one request."""
+        if self.fresh and not force:
+            assert self._catalog is not None
+            return self._catalog
+        if self._in_flight is None:
+            self._in_flight = asyncio.ensure_future(self._refresh())
+            self._in_flight.add_done_callback(self._clear_in_flight)
+        return await asyncio.shield(self._in_flight)
+
+    def _clear_in_flight(self, _: "asyncio.Future[Catalog[T]]") -> None:
+        self._in_flight = None
+
+    async def _refresh(self) -> Catalog[T]:
+        self._stale = False
+        try:
+            items = list(await self._fetch())
+        except BaseException:
+            self._stale = True
+            raise
+        self.fetches += 1
+        previous = self._catalog
+        fingerprints = {self._key_fn(item): fingerprint(item) for item in items}
+        version = hashlib.sha256("".join(f"{k}={v};" for k, v in sorted(fingerprints.items())).encode("utf-8")).hexdigest()[:16]
+        catalog = Catalog(items, version, fingerprints, time.monotonic())
+        self._catalog = catalog
+        if previous is None or previous.version != version:
+            await self._notify(self._diff(previous, catalog))
+        return catalog
+
+    def _diff(self, previous: Optional[Catalog[T]], current: Catalog[T]) -> CatalogDiff[T]:
+        old = previous.fingerprints if previous else {}
+        diff: CatalogDiff[T] = CatalogDiff(current.version)
+        for item in current.items:
+            key = self._key_fn(item)
+            if key not in old:
+                diff.added.append(item)
+            elif old[key] != current.fingerprints[key]:
+                diff.changed.append(item)
+        diff.removed = [key for key in old if key not in current.fingerprints]
+        return diff
+
+    async def _notify(self, diff: CatalogDiff[T]) -> None:
+        self._logger.info(
+            "Catalog changed",
+            version=diff.version,
+            added=len(diff.added),
+            changed=len(diff.changed),
+            removed=len(diff.removed),
+        )
+        for listener in self._listeners:
+            try:
+                result = listener(diff)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self._logger.error("Catalog listener failed", error=str(e))
@@ -1,15 +1,18 @@
 """MCP client model."""
-from typing import Annotated, Any, Literal, MutableSequence, Optional, Union
+from typing import Annotated, Any, Awaitable, Callable, Literal, MutableSequence, Optional, TypeVar, Union
 import mcp
 from pydantic import BaseModel, Field
 from mcp.client.session import ClientSession
 from mcp.shared.context import RequestContext, LifespanContextT
 from mcp.shared.session import RequestResponder
-from mcp.types import ServerRequest,ClientResult, ServerNotification, LoggingMessageNotificationParams, SamplingMessage, CreateMessageRequestParams, Prompt
+from mcp.types import ServerRequest,ClientResult, ServerNotification, LoggingMessageNotificationParams, SamplingMessage, CreateMessageRequestParams, Prompt, PromptListChangedNotification, ToolListChangedNotification
 from fastmcp import Client
 from fastmcp.client import ClientTransport, StdioTransport, WSTransport, SSETransport, StreamableHttpTransport
 
 from vogonpoetry.logging import logger
+from vogonpoetry.mcp.catalog import CatalogCache
+from vogonpoetry.mcp.limits import ProcessLimits
+from vogonpoetry.mcp.pool import SessionPool, SessionPoolConfig
 from vogonpoetry.utils.filter_config import FilterConfig, FilterUtility
 
 Transport = Union[Literal['stdio'], Literal['websocket'], Literal['sse'], Literal['streamable']]
@@ -22,6 +25,7 @@ class StdioConfig(BaseModel):
     env: Annotated[dict[str, str], Field(default_factory=dict, description="Environment variables for the process.")]
     cwd: Annotated[Optional[str], Field(None, description="Working directory for the process.")]
     keep_alive: Annotated[Optional[bool], Field(None, description="Whether to keep the process alive.")]
+    limits: Annotated[Optional[ProcessLimits], Field(None, description="Resource limits for each server process.")]
 
 class WebsocketConfig(BaseModel):
     """WebSocket transport configuration."""
@@ -60,39 +64,102 @@ class MCPClientConfig(BaseModel):
 
 SamplingResponse = str | mcp.CreateMessageResult
 
+T = TypeVar('T')
+
 class MCPClient(BaseModel):
     """MCP client model."""
     id: Annotated[str, Field(description="Unique identifier for the MCP client.")]
     transport: Annotated[TransportConfig, Field(description="Transport configuration for the MCP client.")]
     resource_template: Annotated[list[FilterConfig], Field([], description="Resource template filter configuration.")]
     tools: Annotated[list[FilterConfig], Field([], description="Tools filter configuration.")]
-    prompts: Annotated[list[FilterConfig], Field([], description="Prompts filter configuration.")]  
+    prompts: Annotated[list[FilterConfig], Field([], description="Prompts filter configuration.")]
+    pool: Annotated[SessionPoolConfig, Field(default_factory=SessionPoolConfig, description="Session pool configuration.")]
+    discovery_timeout: Annotated[Optional[float], Field(None, gt=0, description="Seconds to wait for this server during tool discovery, defaults to the discovery timeout.")]
+    catalog_ttl: Annotated[Optional[float], Field(300.0, gt=0, description="Seconds the tool and prompt catalogs are cached, or None to only refetch on list_changed notifications.")]
 
     def model_post_init(self, context: Any) -> None:
         """Initialize the MCP client."""
         self._logger = logger(f"MCPClient-{self.id}")
-        self._transport: ClientTransport
+        self._pool = SessionPool(self.id, self._create_client, self.pool)
+        self._tool_catalog = CatalogCache[mcp.Tool](
+            f"{self.id}-tools",
+            lambda: self._call(lambda client: client.list_tools()),
+            lambda tool: tool.name,
+            self.catalog_ttl,
+        )
+        self._prompt_catalog = CatalogCache[Prompt](
+            f"{self.id}-prompts",
+            lambda: self._call(lambda client: client.list_prompts()),
+            lambda prompt: prompt.name,
+            self.catalog_ttl,
+        )
+
+    @property
+    def tool_catalog(self) -> CatalogCache[mcp.Tool]:
+        """Cached, unfiltered tool catalog of the server."""
+        return self._tool_catalog
+
+    @property
+    def prompt_catalog(self) -> CatalogCache[Prompt]:
+        """Cached, unfiltered prompt catalog of the server."""
+        return self._prompt_catalog
+
+    def _create_transport(self) -> ClientTransport:
         if self.transport.type == 'stdio':
-            transport = StdioTransport(self.transport.command, self.transport.args, self.transport.env, self.transport.cwd, self.transport.keep_alive)
+            command, args = self.transport.command, self.transport.args
+            if self.transport.limits is not None:
+                command, args = self.transport.limits.wrap(command, args)
+            return StdioTransport(command, args, self.transport.env, self.transport.cwd, self.transport.keep_alive)
         elif self.transport.type == 'websocket':
-            transport = WSTransport(self.transport.url)
+            return WSTransport(self.transport.url)
         elif self.transport.type == 'sse':
-            transport = SSETransport(url=self.transport.url, headers=self.transport.headers, sse_read_timeout=self.transport.timeout)
+            return SSETransport(url=self.transport.url, headers=self.transport.headers, sse_read_timeout=self.transport.timeout)
         elif self.transport.type == 'streamable':
-            transport = StreamableHttpTransport(url=self.transport.url, headers=self.transport.headers, sse_read_timeout=self.transport.timeout)
+            return StreamableHttpTransport(url=self.transport.url, headers=self.transport.headers, sse_read_timeout=self.transport.timeout)
         else:
             raise ValueError(f"Unsupported transport type: {self.transport.type}")
-        self._client = Client(
-            transport,
+
+    def _create_client(self) -> Client:
+        """Create a client with its own transport, one per pooled session."""
+        return Client(
+            self._create_transport(),
             message_handler=self.handle_message,
             progress_handler=self.handle_progress,
             log_handler=self.handle_logging_message,
             sampling_handler=self.handle_sampling,
         )
 
+    async def start(self) -> None:
+        """Open the pooled sessions to the server."""
+        await self._pool.start()
+
+    async def close(self) -> None:
+        """Close the pooled sessions to the server."""
+        await self._pool.close()
+
+    async def _call(self, operation: Callable[[Client], Awaitable[T]]) -> T:
+        """Run an operation on a pooled session, retrying once on a fresh session if the connection dropped.
+
+        Only for operations that are safe to repeat, such as listing the catalogs.
+        """
+        async with self._pool.session() as client:
+            try:
+                return await operation(client)
+            except Exception:
+                if client.is_connected():
+                    raise
+                self._logger.warning("Session dropped during call, retrying")
+        async with self._pool.session() as client:
+            return await operation(client)
+
     async def handle_message(self, message: RequestResponder[ServerRequest, ClientResult] | ServerNotification | Exception) -> None:
         """Handle incoming messages from the MCP client."""
         self._logger.info("Received message", message=message)
+        if isinstance(message, ServerNotification):
+            if isinstance(message.root, ToolListChangedNotification):
+                self._tool_catalog.invalidate()
+            elif isinstance(message.root, PromptListChangedNotification):
+                self._prompt_catalog.invalidate()
 
     async def handle_progress(self, progress: float, total: float | None, message: str | None) -> None:
         """Handle progress updates from the MCP client."""
@@ -111,10 +178,19 @@ class MCPClient(BaseModel):
 
     async def list_tools(self) -> MutableSequence[mcp.Tool]:
         """List available tools from the MCP client."""
-        async with self._client:
-            return FilterUtility[mcp.Tool].filter_items(self.tools, await self._client.list_tools(), lambda tool: tool.name)
-        
+        tools = (await self._tool_catalog.get()).items
+        return FilterUtility[mcp.Tool].filter_items(self.tools, tools, lambda tool: tool.name)
+
     async def list_prompts(self) -> MutableSequence[Prompt]:
-        """List available tools from the MCP client."""
-        async with self._client:
-            return FilterUtility[Prompt].filter_items(self.prompts, await self._client.list_prompts(), lambda prompt: prompt.name)
\ No newline at end of file
+        """List available prompts from the MCP client."""
+        prompts = (await self._prompt_catalog.get()).items
+        return FilterUtility[Prompt].filter_items(self.prompts, prompts, lambda prompt: prompt.name)
+
+    async def call_tool(self, name: str, arguments: Optional[dict[str, Any]] = None) -> Any:
+        """Call a tool on the MCP server.
+
+        Not retried when the connection drops: the tool may have run already and may
+        have side effects, so the error is surfaced to the caller.
+        """
+        async with self._pool.session() as client:
+            return await client.call_tool(name, arguments or {})
@@ -0,0 +1,158 @@
+"""Concurrent tool discovery across MCP servers."""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Annotated, Any, Optional, Sequence
+
+import mcp
+from pydantic import BaseModel, Field
+
+from vogonpoetry.index.tags import tool_tags
+from vogonpoetry.logging import logger
+from vogonpoetry.mcp.catalog import CatalogDiff, CatalogListener
+from vogonpoetry.mcp.client import MCPClient
+from vogonpoetry.metrics import MetricsCollection
+
+
+class DiscoveryConfig(BaseModel):
+    """Tool discovery configuration."""
+    timeout: Annotated[float, Field(5.0, gt=0, description="Default seconds to wait for a server's tool catalog.")]
+    separator: Annotated[str, Field(".", min_length=1, description="Separator between the server id and the tool name in namespaced tool names.")]
+
+
+@dataclass(frozen=True)
+class DiscoveredTool:
+    """A tool of one MCP server, exposed under a name namespaced by the server id."""
+    name: str
+    server: str
+    tool: mcp.Tool
+
+    @property
+    def description(self) -> str:
+        return self.tool.description or ""
+
+    @property
+    def tags(self) -> list[str]:
+        return sorted(tool_tags(self.tool))
+
+    @property
+    def input_schema(self) -> dict[str, Any]:
+        return self.tool.inputSchema
+
+
+class ToolDiscovery:
+    """Queries all MCP servers concurrently and publishes a merged, namespaced tool catalog.
+
+    Each server is given its own timeout. A server that fails keeps serving its last
+    known tools; a server that is slow keeps being fetched in the background and is
+    merged in once it answers, so it never holds back the catalog. The merged list is
+    only replaced when a server's catalog version changed, so consumers can detect
+    changes by identity, or subscribe to receive the diffs keyed by namespaced name.
+    """
+
+    def __init__(self, servers: Sequence[MCPClient], config: Optional[DiscoveryConfig] = None):
+        self.servers = list(servers)
+        self.config = config or DiscoveryConfig()
+        self._logger = logger("ToolDiscovery")
+        self._catalogs: dict[str, tuple[Optional[str], list[DiscoveredTool]]] = {
+            server.id: (None, []) for server in self.servers
+        }
+        self._pending: dict[str, asyncio.Task[None]] = {}
+        self._tools: list[DiscoveredTool] = []
+        self._listeners: list[CatalogListener[DiscoveredTool]] = []
+
+    @property
+    def tools(self) -> list[DiscoveredTool]:
+        """The merged catalog, in server configuration order."""
+        return self._tools
+
+    def subscribe(self, listener: CatalogListener[DiscoveredTool]) -> None:
+        """Register a callback (sync or async) receiving the diff whenever a server's tools change."""
+        self._listeners.append(listener)
+
+    def timeout_for(self, server: MCPClient) -> float:
+        return server.discovery_timeout if server.discovery_timeout is not None else self.config.timeout
+
+    async def refresh(self, metrics: Optional[MetricsCollection] = None) -> list[DiscoveredTool]:
+        """Refresh every server's catalog concurrently, waiting at most the per-server timeouts."""
+        if not self.servers:
+            return self._tools
+        tasks = {server.id: self._fetch(server, metrics) for server in self.servers}
+        waits = [self._wait(server, tasks[server.id], metrics) for server in self.servers]
+        await asyncio.gather(*waits)
+        self._merge()
+        return self._tools
+
+    def _fetch(self, server: MCPClient, metrics: Optional[MetricsCollection]) -> "asyncio.Task[None]":
+        pending = self._pending.get(server.id)
+        if pending is not None and not pending.done():
+            return pending
+        task = asyncio.create_task(self._load(server, metrics))
+        self._pending[server.id] = task
+        return task
+
+    async def _load(self, server: MCPClient, metrics: Optional[MetricsCollection]) -> None:
+        start = time.perf_counter_ns()
+        try:
+            tools = await server.list_tools()
+        except Exception as e:
+            self._logger.warning("Tool discovery failed", server=server.id, error=str(e))
+            if metrics is not None:
+                metrics.increment("mcp.discovery_failures", server=server.id)
+            return
+        finally:
+            if metrics is not None:
+                metrics.observe("mcp.discovery_time_ms", (time.perf_counter_ns() - start) / 1e6, server=server.id)
+        version = server.tool_catalog.version
+        previous_version, previous = self._catalogs[server.id]
+        if previous and version is not None and version == previous_version:
+            return
+        separator = self.config.separator
+        discovered = [DiscoveredTool(f"{server.id}{separator}{tool.name}", server.id, tool) for tool in tools]
+        self._catalogs[server.id] = (version, discovered)
+        await self._notify(self._diff(version, previous, discovered))
+
+    def _diff(self, version: Optional[str], previous: list[DiscoveredTool], current: list[DiscoveredTool]) -> CatalogDiff[DiscoveredTool]:
+        old = {tool.name: tool.tool for tool in previous}
+        diff: CatalogDiff[DiscoveredTool] = CatalogDiff(version or "")
+        for tool in current:
+            if tool.name not in old:
+                diff.added.append(tool)
+            elif old.pop(tool.name) != tool.tool:
+                diff.changed.append(tool)
+        diff.removed = list(old)
+        return diff
+
+    async def _notify(self, diff: CatalogDiff[DiscoveredTool]) -> None:
+        if not diff:
+            return
+        for listener in self._listeners:
+            try:
+                result = listener(diff)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self._logger.error("Catalog listener failed", error=str(e))
+
+    async def _wait(self, server: MCPClient, task: "asyncio.Task[None]", metrics: Optional[MetricsCollection]) -> None:
+        done, _ = await asyncio.wait([task], timeout=self.timeout_for(server))
+        if done:
+            return
+        self._logger.warning("Tool discovery timed out, serving the last known tools", server=server.id)
+        if metrics is not None:
+            metrics.increment("mcp.discovery_timeouts", server=server.id)
+        # Merge the slow server's tools whenever they arrive.
+        task.add_done_callback(lambda _: self._merge())
+
+    def _merge(self) -> None:
+        merged = [tool for server in self.servers for tool in self._catalogs[server.id][1]]
+        if len(merged) != len(self._tools) or any(a is not b for a, b in zip(merged, self._tools)):
+            self._tools = merged
+            self._logger.info("Tool catalog updated", tools=len(merged))
+
+    async def close(self) -> None:
+        """Cancel background fetches still in flight."""
+        for task in self._pending.values():
+            task.cancel()
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
+        self._pending.clear()
@@ -0,0 +1,48 @@
+"""Launcher running a command under resource limits.
+
+It sets the limits on itself and then execs the command, so they hold for the server
+process without any hook into the transport:
+
+    python vogonpoetry/mcp/launcher.py --memory-mb 512 --cpu-seconds 3600 -- npx some-server
+
+It is run by file path from the server's environment, where this package may not be
+importable, so it only uses the standard library.
+"""
+import argparse
+import os
+from typing import Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None  # type: ignore[assignment]
+
+
+def apply_limits(memory_mb: Optional[int], cpu_seconds: Optional[int], nice: Optional[int]) -> None:
+    if resource is None and (memory_mb is not None or cpu_seconds is not None):
+        raise RuntimeError("Resource limits are only supported on POSIX systems.")
+    if memory_mb is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    if cpu_seconds is not None:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    if nice:
+        os.nice(nice)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a command under resource limits.")
+    parser.add_argument("--memory-mb", type=int)
+    parser.add_argument("--cpu-seconds", type=int)
+    parser.add_argument("--nice", type=int)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("No command given.")
+    apply_limits(args.memory_mb, args.cpu_seconds, args.nice)
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Resource limits for stdio MCP server processes.
+
+The limits are applied by the launcher in ``launcher.py``, which sets them on itself
+and then execs the server command.
+
+Memory is capped with ``RLIMIT_DATA`` rather than ``RLIMIT_AS``: runtimes such as
+Node/V8 reserve far more address space than they use and fail to start under an
+address space limit. ``RLIMIT_CPU`` counts the CPU time used over the whole life of the
+process, not per call, so a long-lived pooled server is killed once it used that much
+in total and its session is restarted by the pool; size it as a guard against runaway
+servers. The limits rely on the POSIX ``resource`` module and are not available on
+Windows.
+"""
+import sys
+from typing import Annotated, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from vogonpoetry.mcp import launcher
+
+
+class ProcessLimits(BaseModel):
+    """Resource limits applied to each server process."""
+    memory_mb: Annotated[Optional[int], Field(None, gt=0, description="Maximum data segment (heap and anonymous mappings) of the process in MiB.")]
+    cpu_seconds: Annotated[Optional[int], Field(None, gt=0, description="Maximum CPU time of the process in seconds, counted over its whole lifetime, after which it is killed and restarted.")]
+    nice: Annotated[Optional[int], Field(None, ge=0, le=19, description="Niceness added to the process, lowering its CPU priority.")]
+
+    def wrap(self, command: str, args: Sequence[str]) -> tuple[str, list[str]]:
+        """The command and arguments that run ``command`` under these limits.
+
+        The launcher is run by file path, as the server process may not be able to
+        import this package: its environment has no PYTHONPATH and its cwd may differ.
+        """
+        options = []
+        if self.memory_mb is not None:
+            options += ["--memory-mb", str(self.memory_mb)]
+        if self.cpu_seconds is not None:
+            options += ["--cpu-seconds", str(self.cpu_seconds)]
+        if self.nice is not None:
+            options += ["--nice", str(self.nice)]
+        return sys.executable, [launcher.__file__, *options, "--", command, *args]
@@ -0,0 +1,182 @@
+"""Persistent, bounded session pools for MCP servers."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Callable, Optional
+
+from fastmcp import Client
+from pydantic import BaseModel, Field
+
+from vogonpoetry.logging import logger
+
+
+class SessionPoolConfig(BaseModel):
+    """Session pool configuration for an MCP server."""
+    size: Annotated[int, Field(1, gt=0, description="Number of sessions kept open to the server, bounding concurrent calls.")]
+    health_check_interval: Annotated[Optional[float], Field(30.0, gt=0, description="Seconds between pings of idle sessions, or None to disable health checks.")]
+    ping_timeout: Annotated[float, Field(5.0, gt=0, description="Seconds to wait for a health check ping.")]
+    reconnect_backoff: Annotated[float, Field(0.5, ge=0, description="Initial delay in seconds between reconnect attempts, doubled on each failure.")]
+    max_reconnect_backoff: Annotated[float, Field(30.0, ge=0, description="Maximum delay in seconds between reconnect attempts.")]
+    max_reconnect_attempts: Annotated[int, Field(5, gt=0, description="Connect attempts when the pool starts, and per restart round before backing off for max_reconnect_backoff.")]
+    acquire_timeout: Annotated[Optional[float], Field(30.0, gt=0, description="Seconds a call waits for a healthy session before failing.")]
+
+
+class SessionPool:
+    """Keeps ``size`` connected clients to one server and lends them out one call at a time.
+
+    Sessions are opened once on ``start`` (or lazily on first use) and stay open; for
+    stdio servers each session owns a pre-spawned server process. Sessions are handed
+    out round-robin: a returned session goes to the back of the queue.
+
+    Idle sessions are pinged periodically. Sessions found disconnected, by a failed ping,
+    a crashed process or a failed call, are taken out of rotation and restarted in the
+    background with exponential backoff, so calls keep going to the healthy sessions and
+    never wait for a process to spawn unless every session is down.
+    """
+
+    def __init__(self, name: str, client_factory: Callable[[], Client], config: Optional[SessionPoolConfig] = None):
+        self.name = name
+        self.config = config or SessionPoolConfig()
+        self._client_factory = client_factory
+        self._logger = logger(f"SessionPool-{name}")
+        self._clients: list[Client] = []
+        self._idle: Optional[asyncio.Queue[Client]] = None
+        self._start_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task[None]] = None
+        self._restarting: set[asyncio.Task[None]] = set()
+        self.reconnects = 0
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Open all sessions and start health checks."""
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            clients = [self._client_factory() for _ in range(self.config.size)]
+            await asyncio.gather(*[self._reconnect(client, initial=True) for client in clients])
+            idle: asyncio.Queue[Client] = asyncio.Queue()
+            for client in clients:
+                idle.put_nowait(client)
+            self._clients = clients
+            self._idle = idle
+            if self.config.health_check_interval is not None:
+                self._health_task = asyncio.create_task(self._health_loop())
+            self._logger.info("Session pool started", size=self.config.size)
+
+    async def close(self) -> None:
+        """Stop health checks and close all sessions."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for task in self._restarting:
+            task.cancel()
+        await asyncio.gather(*self._restarting, return_exceptions=True)
+        clients, self._clients, self._idle = self._clients, [], None
+        await asyncio.gather(*[self._disconnect(client) for client in clients])
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Client]:
+        """Borrow a connected client for the duration of a call."""
+        if self._idle is None:
+            await self.start()
+        idle = self._idle
+        assert idle is not None
+        client = await self._acquire(idle)
+        try:
+            yield client
+        finally:
+            if client.is_connected():
+                idle.put_nowait(client)
+            else:
+                self._restart(client, idle)
+
+    async def _acquire(self, idle: "asyncio.Queue[Client]") -> Client:
+        async def next_healthy() -> Client:
+            while True:
+                client = await idle.get()
+                if client.is_connected():
+                    return client
+                self._restart(client, idle)
+
+        try:
+            return await asyncio.wait_for(next_healthy(), self.config.acquire_timeout)
+        except asyncio.TimeoutError as e:
+            raise RuntimeError(f"No healthy session to MCP server '{self.name}'.") from e
+
+    def _restart(self, client: Client, idle: "asyncio.Queue[Client]") -> None:
+        """Restart a dead session in the background, returning it to rotation once connected."""
+        task = asyncio.create_task(self._supervise(client, idle))
+        self._restarting.add(task)
+        task.add_done_callback(self._restarting.discard)
+
+    async def _supervise(self, client: Client, idle: "asyncio.Queue[Client]") -> None:
+        while True:
+            try:
+                await self._reconnect(client)
+                break
+            except RuntimeError:
+                await asyncio.sleep(self.config.max_reconnect_backoff)
+        if self._idle is idle:
+            idle.put_nowait(client)
+        else:
+            await self._disconnect(client)
+
+    async def _health_loop(self) -> None:
+        assert self.config.health_check_interval is not None
+        while True:
+            await asyncio.sleep(self.config.health_check_interval)
+            await self.check_health()
+
+    async def check_health(self) -> None:
+        """Ping the idle sessions, restarting those that do not answer.
+
+        Sessions are taken out of rotation one at a time, so callers are never left
+        waiting on a health check while other sessions are idle.
+        """
+        idle = self._idle
+        if idle is None:
+            return
+        for _ in range(idle.qsize()):
+            if idle.empty():
+                break
+            client = idle.get_nowait()
+            if await self._check(client):
+                idle.put_nowait(client)
+            else:
+                self._restart(client, idle)
+
+    async def _check(self, client: Client) -> bool:
+        try:
+            if client.is_connected():
+                await asyncio.wait_for(client.ping(), self.config.ping_timeout)
+                return True
+        except Exception as e:
+            self._logger.warning("Session health check failed", error=str(e))
+        return False
+
+    async def _reconnect(self, client: Client, initial: bool = False) -> None:
+        delay = self.config.reconnect_backoff
+        for attempt in range(1, self.config.max_reconnect_attempts + 1):
+            if not initial or attempt > 1:
+                await self._disconnect(client)
+            try:
+                await client.__aenter__()
+                if not initial:
+                    self.reconnects += 1
+                    self._logger.info("Session reconnected", attempt=attempt)
+                return
+            except Exception as e:
+                self._logger.warning("Session connect failed", attempt=attempt, error=str(e))
+                if attempt == self.config.max_reconnect_attempts:
+                    raise RuntimeError(f"Could not connect to MCP server '{self.name}'.") from e
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.config.max_reconnect_backoff)
+
+    async def _disconnect(self, client: Client) -> None:
+        try:
+            await client.close()
+        except Exception as e:
+            self._logger.warning("Session close failed", error=str(e))
@@ -31,3 +31,7 @@ class MetricsCollection(DefaultMetricsRecorder):
     def time(self, name: str, **tags) -> Timer:
         """Get or create a gauge metric."""
         return self.timer(name,resolution=TimerResolution.NANOSECONDS, **tags)
+
+    def observe(self, name: str, value: float, **tags) -> None:
+        """Record a single histogram observation."""
+        self.histogram(name, force_new=True, **tags).set(value)
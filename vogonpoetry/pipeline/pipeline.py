@@ -10,68 +10,36 @@ from pydantic import BaseModel, Field
 from vogonpoetry.logging import logger
 from vogonpoetry.context import BaseContext
 from vogonpoetry.embedders import Embedder
+from vogonpoetry.pipeline.scheduler import DagScheduler, ExecutionPlan, PlannedStep, topological_sort
 from vogonpoetry.pipeline.steps import PipelineStep
 from vogonpoetry.pipeline.steps.base import BaseStep
 from vogonpoetry.pipeline.steps.fork import ForkStep
 
-_logger = logger("topological_sort")
-
-
-def topological_sort(nodes: dict[str, PipelineStep], edges):
-    from collections import defaultdict, deque
-
-    in_degree = defaultdict(int)
-    graph = defaultdict(list)
-
-    for src, targets in edges.items():
-        for tgt in targets:
-            graph[src].append(tgt)
-            in_degree[tgt] += 1
-    _logger.info("Graph", graph=graph, in_degree=dict(in_degree))
-    queue = deque([n for n in nodes if in_degree[n] == 0])
-    result = []
-    while queue:
-        _logger.info("Queue", queue=list(queue))
-        node = queue.popleft()
-        _logger.info("Visiting node", node=node)
-        result.append(node)
-
-        for neighbor in graph.get(node, []):
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
-    if len(result) != len(nodes):
-        raise ValueError("Cycle detected in pipeline graph")
-
-    return result
-
 
 async def run_steps(
     self, context: BaseContext, steps: list[PipelineStep]
 ) -> BaseContext:
     # trace_id = context.get("_trace_id")
 
-    def eval_condition(expr, ctx):
-        try:
-            return eval(expr, {}, ctx)
-        except:
-            return False
-    async def run_step(step: PipelineStep, ctx: BaseContext) -> BaseContext:
-        self._logger.info("running_step", step=step.id, type=step.type)
-        result = await step.execute(ctx)
-
-        if step.output_key:
-            ctx.data.update({step.output_key: result})
+    async def run_step(planned: PlannedStep, ctx: BaseContext) -> BaseContext:
+        planned.logger.info("running_step")
+        result = await planned.step.execute(ctx)
+
+        if planned.output_key:
+            ctx.data[planned.output_key] = result
         return ctx
 
-    try:
-        topological_sort(self._nodes, self._edges)
-    except ValueError as e:
-        self._logger.error("topology_error", error=str(e))
-        raise
-    self._logger.info("pipeline_start", pipeline=self.id, steps=self.steps)
-    for step in self.steps:
-        context = await run_step(step, context)
+    plan = self._plan if steps is self.steps else ExecutionPlan.compile(self.id, steps)
+    self._logger.info("pipeline_start", pipeline=self.id, steps=len(plan))
+    report = await DagScheduler(plan, self.max_concurrency).run(context, run_step)
+    context.schedule = report
+    for planned in plan.steps:
+        timing = report.timings.get(planned.step.id)
+        if timing is not None:
+            context.metrics.observe("pipeline.step_wait_ms", timing.wait * 1e3, **planned.tags)
+    critical_path_ms = sum(report.timings[step_id].duration for step_id in report.critical_path) * 1e3
+    context.metrics.observe("pipeline.critical_path_ms", critical_path_ms, pipeline_id=self.id)
+    self._logger.info("pipeline_done", pipeline=self.id, critical_path=report.critical_path, critical_path_ms=critical_path_ms)
 
     # if trace_id:
     #     write_trace(trace_id, context.get("_trace", []))
@@ -87,33 +55,45 @@ class Pipeline(BaseModel):
         default=None, description="Description of the pipeline."
     )
     steps: list[PipelineStep] = Field(description="Steps in the pipeline.")
+    max_concurrency: Optional[int] = Field(
+        default=None, gt=0, description="Maximum number of steps running at once, unbounded if not set."
+    )
+    timeout: Optional[float] = Field(
+        default=None, gt=0, description="Seconds budget of a run, setting the context deadline every step is held to."
+    )
 
     def model_post_init(self, context: Any) -> None:
         self._logger = logger(f"Pipeline-{self.id}")
-        self._nodes: dict[str, PipelineStep] = {step.id: step for step in self.steps}
-        self._edges: dict[str, set[str]] = {step.id: set() for step in self.steps}
-
-        def collect_edges(parent_step):
-            if hasattr(parent_step.options, "steps"):
-                for child in parent_step.options.steps:
-                    self._edges[parent_step.id].add(child.id)
-                    if child.id not in self._nodes:
-                        self._nodes[child.id] = child
-                    if child.id not in self._edges:
-                        self._edges[child.id] = set()
-
-        for step in self.steps:
-            collect_edges(step)
-
-        step_ids = list(self._nodes.keys())
-        dupes = set([x for x in step_ids if step_ids.count(x) > 1])
-        if dupes:
-            raise ValueError(f"Duplicate step IDs found (after namespacing?): {dupes}")
+        self._plan = ExecutionPlan.compile(self.id, self.steps)
+        self._initialized = False
+        self._initialize_lock = asyncio.Lock()
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        """The execution plan compiled from the steps."""
+        return self._plan
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the steps have been initialized."""
+        return self._initialized
+
+    async def initialize(self, context: BaseContext) -> None:
+        """Initialize the steps once, loading their models and indexes; later calls return immediately."""
+        if self._initialized:
+            return
+        async with self._initialize_lock:
+            if self._initialized:
+                return
+            with context.metrics.timer("pipeline.initialization_time", pipeline_id=self.id):
+                await asyncio.gather(*[step.initialize(context) for step in self.steps])
+            self._initialized = True
 
     async def run(self, context: BaseContext) -> BaseContext:
-        """Run the pipeline with the given context."""
+        """Run the pipeline with the given context, initializing the steps on the first run."""
         with context.metrics.timer("pipeline.process_time", pipeline_id=self.id):
-            with context.metrics.timer("pipeline.initialization_time", pipeline_id=self.id):
-                await asyncio.gather(*[step.initialize(context) for step in self.steps])
+            await self.initialize(context)
+            if self.timeout is not None:
+                context.set_timeout(self.timeout)
             with context.metrics.timer("pipeline.execution_time", pipeline_id=self.id):
                 return await run_steps(self, context, self.steps)
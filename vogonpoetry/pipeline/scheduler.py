@@ -0,0 +1,251 @@
+"""Dependency-driven concurrent scheduling of pipeline steps."""
+import asyncio
+import heapq
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.logging import logger
+
+
+def topological_sort(nodes: Mapping[str, Any], edges: Mapping[str, set[str]]) -> list[str]:
+    """Order the nodes so every edge points forward, raising ValueError on a cycle."""
+    in_degree: dict[str, int] = defaultdict(int)
+    for targets in edges.values():
+        for target in targets:
+            in_degree[target] += 1
+    queue = deque(node for node in nodes if in_degree[node] == 0)
+    result = []
+    while queue:
+        node = queue.popleft()
+        result.append(node)
+        for neighbor in edges.get(node, ()):
+            in_degree[neighbor] -= 1
+            if in_degree[neighbor] == 0:
+                queue.append(neighbor)
+    if len(result) != len(nodes):
+        raise ValueError("Cycle detected in pipeline graph")
+    return result
+
+
+def fork_children(step: Any) -> list[Any]:
+    """All steps nested under a fork step, recursively."""
+    children = []
+    for child in getattr(step.options, "steps", None) or []:
+        children.append(child)
+        children.extend(fork_children(child))
+    return children
+
+
+def step_dependencies(steps: Sequence[Any]) -> dict[str, set[str]]:
+    """Dependencies between the top-level steps, from ``requires``, conditions and fork children.
+
+    Steps without dependencies run concurrently, so a step whose condition reads the
+    ``output_key`` of other steps implicitly requires them. A step nested in a fork is
+    run by the fork, so requiring it means requiring the fork, and anything the nested
+    step requires is required by the fork. The steps of a fork run concurrently, so a
+    step cannot require another step of the same fork.
+    """
+    owner: dict[str, str] = {}
+    ancestors: dict[str, set[str]] = {}
+    producers: dict[str, list[str]] = defaultdict(list)
+
+    def register(step: Any, top: str, parents: set[str]) -> None:
+        owner[step.id] = top
+        ancestors[step.id] = parents
+        if step.output_key:
+            producers[step.output_key].append(step.id)
+        for child in getattr(step.options, "steps", None) or []:
+            register(child, top, parents | {step.id})
+
+    for step in steps:
+        register(step, step.id, set())
+    dependencies: dict[str, set[str]] = {step.id: set() for step in steps}
+    for step in steps:
+        for member in [step, *fork_children(step)]:
+            for required in member.requires or []:
+                if required not in owner:
+                    raise ValueError(f"Step '{member.id}' requires unknown step '{required}'.")
+                if required == member.id:
+                    raise ValueError(f"Step '{member.id}' requires itself.")
+                if owner[required] == step.id:
+                    raise ValueError(f"Step '{member.id}' requires '{required}' in the same fork '{step.id}', which runs concurrently.")
+                dependencies[step.id].add(owner[required])
+            condition = getattr(member, "condition", None)
+            for key in sorted(condition.keys) if condition is not None else []:
+                for producer in producers.get(key, []):
+                    # A step may read its own previous output, or the output of a fork it runs in.
+                    if producer == member.id or producer in ancestors[member.id]:
+                        continue
+                    if owner[producer] == step.id:
+                        raise ValueError(f"Step '{member.id}' has a condition on '{key}', the output of '{producer}' in the same fork '{step.id}', which runs concurrently.")
+                    dependencies[step.id].add(owner[producer])
+    return dependencies
+
+
+def bit_indices(mask: int) -> list[int]:
+    """Indices of the set bits of a bitset."""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+@dataclass(frozen=True)
+class PlannedStep:
+    """A step with everything needed to run it resolved when the pipeline is compiled."""
+    index: int
+    step: Any
+    output_key: Optional[str]
+    requires: int
+    """Bitset of the plan indices of the steps this step waits on."""
+    dependents: tuple[int, ...]
+    level: int
+    tags: Mapping[str, str]
+    logger: Any
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Immutable schedule of a pipeline, compiled once and walked on every run.
+
+    ``levels`` groups the steps by their longest chain of dependencies: a step in level
+    ``n`` only waits on steps in earlier levels.
+    """
+    pipeline_id: str
+    steps: tuple[PlannedStep, ...]
+    levels: tuple[tuple[int, ...], ...]
+
+    @classmethod
+    def compile(cls, pipeline_id: str, steps: Sequence[Any]) -> "ExecutionPlan":
+        seen: set[str] = set()
+        dupes: set[str] = set()
+        for step in steps:
+            for member in [step, *fork_children(step)]:
+                (dupes if member.id in seen else seen).add(member.id)
+        if dupes:
+            raise ValueError(f"Duplicate step IDs found (after namespacing?): {dupes}")
+
+        dependencies = step_dependencies(steps)
+        dependents: dict[str, set[str]] = {step.id: set() for step in steps}
+        for step_id, required in dependencies.items():
+            for dependency in required:
+                dependents[dependency].add(step_id)
+        order = topological_sort({step.id: step for step in steps}, dependents)
+
+        index = {step.id: i for i, step in enumerate(steps)}
+        level: dict[str, int] = {}
+        for step_id in order:
+            level[step_id] = max((level[dependency] + 1 for dependency in dependencies[step_id]), default=0)
+        levels: list[list[int]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for i, step in enumerate(steps):
+            levels[level[step.id]].append(i)
+
+        pipeline_logger = logger(f"Pipeline-{pipeline_id}")
+        planned = tuple(
+            PlannedStep(
+                index=i,
+                step=step,
+                output_key=step.output_key,
+                requires=sum(1 << index[dependency] for dependency in dependencies[step.id]),
+                dependents=tuple(sorted(index[dependent] for dependent in dependents[step.id])),
+                level=level[step.id],
+                tags={"pipeline_id": pipeline_id, "step_id": step.id},
+                logger=pipeline_logger.bind(step=step.id, type=getattr(step, "type", "unknown")),
+            )
+            for i, step in enumerate(steps)
+        )
+        return cls(pipeline_id, planned, tuple(tuple(indices) for indices in levels))
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+@dataclass
+class StepTiming:
+    """When a step became ready, started and finished, in seconds since the pipeline started."""
+    ready: float
+    start: float = 0.0
+    end: float = 0.0
+
+    @property
+    def wait(self) -> float:
+        return self.start - self.ready
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class ScheduleReport:
+    """Timing breakdown of a pipeline run."""
+    timings: dict[str, StepTiming] = field(default_factory=dict)
+    critical_path: list[str] = field(default_factory=list)
+    total: float = 0.0
+
+
+class DagScheduler:
+    """Runs the steps of a plan as soon as their dependencies finished, at most ``max_concurrency`` at a time.
+
+    Ready steps start in declaration order. If a step fails the running steps are
+    cancelled and the error is raised.
+    """
+
+    def __init__(self, plan: ExecutionPlan, max_concurrency: Optional[int] = None):
+        self.plan = plan
+        self.max_concurrency = max_concurrency or max(len(plan), 1)
+
+    async def run(self, context: BaseContext, run_step: Callable[[PlannedStep, BaseContext], Awaitable[Any]]) -> ScheduleReport:
+        steps = self.plan.steps
+        origin = time.perf_counter()
+        timings: list[Optional[StepTiming]] = [None] * len(steps)
+        ready: list[int] = []
+        for i in self.plan.levels[0] if self.plan.levels else ():
+            timings[i] = StepTiming(ready=0.0)
+            ready.append(i)
+        done = 0
+        running: dict[asyncio.Task[Any], int] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    i = heapq.heappop(ready)
+                    timings[i].start = time.perf_counter() - origin  # type: ignore[union-attr]
+                    running[asyncio.create_task(run_step(steps[i], context))] = i
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                now = time.perf_counter() - origin
+                for task in finished:
+                    i = running.pop(task)
+                    timings[i].end = now  # type: ignore[union-attr]
+                    task.result()
+                    done |= 1 << i
+                    for dependent in steps[i].dependents:
+                        if steps[dependent].requires & done == steps[dependent].requires:
+                            timings[dependent] = StepTiming(ready=now)
+                            heapq.heappush(ready, dependent)
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+        return ScheduleReport(
+            timings={steps[i].step.id: timing for i, timing in enumerate(timings) if timing is not None},
+            critical_path=self.critical_path(timings),
+            total=time.perf_counter() - origin,
+        )
+
+    def critical_path(self, timings: Sequence[Optional[StepTiming]]) -> list[str]:
+        """The chain of steps, each waiting on the last to finish, ending in the last step to finish."""
+        ran = [i for i, timing in enumerate(timings) if timing is not None]
+        if not ran:
+            return []
+        current: Optional[int] = max(ran, key=lambda i: timings[i].end)  # type: ignore[union-attr]
+        path = []
+        while current is not None:
+            path.append(self.plan.steps[current].step.id)
+            required = bit_indices(self.plan.steps[current].requires)
+            current = max(required, key=lambda i: timings[i].end) if required else None  # type: ignore[union-attr]
+        return path[::-1]
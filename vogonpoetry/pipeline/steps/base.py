@@ -1,9 +1,12 @@
 """Base configuration for pipeline steps."""
+import asyncio
 from typing import Any, Generic, Optional, Sequence, TypeVar, Union
 from uuid import uuid4
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from vogonpoetry.logging import logger
 from vogonpoetry.context import BaseContext
+from vogonpoetry.pipeline.steps.cache import StepCacheConfig, StepResultCache, content_hash, shared_step_cache
+from vogonpoetry.utils.condition import Condition, compile_condition
 
 TStepOptions = TypeVar("TStepOptions", bound=Union[BaseModel, Sequence[BaseModel]])
 TOutput = TypeVar('TOutput')
@@ -15,13 +18,45 @@ class BaseStep(BaseModel, Generic[TStepOptions, TOutput]):
     requires: Optional[list[str]] = Field(description="Ids of the steps required for this step.", default=None)
     output_key: Optional[str] = Field(description="Key for the output of the step.", default=None)
     options: TStepOptions = Field(description="Options for the step.")
+    timeout: Optional[float] = Field(description="Seconds the step may run before it is abandoned, capped by the context deadline.", default=None, gt=0)
+    cache: Optional[StepCacheConfig] = Field(description="Memoization of the step result, disabled if not set.", default=None)
+    _result_cache: Optional[StepResultCache] = PrivateAttr(None)
+
+    @field_validator("if_")
+    @classmethod
+    def _compile_condition(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            compile_condition(value)
+        return value
+
+    @property
+    def condition(self) -> Optional[Condition]:
+        """The compiled condition of the step, if any."""
+        return compile_condition(self.if_) if self.if_ is not None else None
+
+    @property
+    def result_cache(self) -> Optional[StepResultCache]:
+        """The cache holding the results of the step, if caching is enabled."""
+        if self.cache is None:
+            return None
+        if self._result_cache is None:
+            if self.cache.scope == 'shared':
+                namespace = content_hash([getattr(self, "type", "unknown"), self.options, self.cache])
+                self._result_cache = shared_step_cache(namespace, self.cache.max_entries)
+            else:
+                self._result_cache = StepResultCache(self.cache.max_entries)
+        return self._result_cache
 
     def should_skip(self, context: BaseContext) -> bool:
         """Determine if the step should be skipped based on the context."""
         if self.if_ is None:
             return False
+        condition = compile_condition(self.if_)
+        if not condition.ready(context.data):
+            self._logger.info("Condition reads missing keys, skipping.", condition=self.if_, missing=sorted(key for key in condition.keys if key not in context.data))
+            return True
         try:
-            return not eval(self.if_, {}, context.data)
+            return not condition(context.data)
         except Exception as e:
             self._logger.error(f"Error evaluating condition '{self.if_}': {e}")
             return True
@@ -56,15 +91,54 @@ class BaseStep(BaseModel, Generic[TStepOptions, TOutput]):
             return context.data.get(self.output_key) if self.output_key else None # type: ignore
         try:
             with context.metrics.timer("step.execution_time", step_id=self.id, step_type=getattr(self, "type", "unknown")):
+                cache = self.result_cache
+                if cache is not None:
+                    assert self.cache is not None
+                    key = self.cache.key(context)
+                    hit, cached = cache.get(key)
+                    if hit:
+                        context.metrics.increment("step.cache_hits", step_id=self.id, step_type=getattr(self, "type", "unknown"))
+                        self._logger.info("Using cached result.", id=self.id)
+                        return cached
+                    context.metrics.increment("step.cache_misses", step_id=self.id, step_type=getattr(self, "type", "unknown"))
                 self._logger.info("Executing step", id=self.id)
-                result = await self._process_step(context)
+                result = await self._run_with_budget(context)
+                if cache is not None:
+                    cache.put(key, result, self.cache.ttl)
                 self._logger.info("Executed step.", id=self.id, result=result)
+                context.metrics.increment("step.outcomes", step_id=self.id, step_type=getattr(self, "type", "unknown"), outcome="ok")
                 return result
+        except asyncio.CancelledError:
+            context.metrics.increment("step.outcomes", step_id=self.id, step_type=getattr(self, "type", "unknown"), outcome="cancelled")
+            self._logger.info("Step cancelled.", id=self.id)
+            raise
+        except TimeoutError:
+            context.metrics.increment("step.outcomes", step_id=self.id, step_type=getattr(self, "type", "unknown"), outcome="timeout")
+            self._logger.error("Step timed out.", id=self.id, timeout=self.timeout)
+            raise
         except Exception as e:
+            context.metrics.increment("step.outcomes", step_id=self.id, step_type=getattr(self, "type", "unknown"), outcome="error")
             context.metrics.increment("step.execution_errors", step_id=self.id, step_type=getattr(self, "type", "unknown"), error_type=type(e).__name__)
             self._logger.error("Error executing step %s: %s", self.id, str(e))
             raise
 
+    def budget(self, context: BaseContext) -> Optional[float]:
+        """Seconds the step may run: its timeout, capped by the time left until the context deadline."""
+        remaining = context.remaining()
+        if self.timeout is None:
+            return remaining
+        return self.timeout if remaining is None else min(self.timeout, remaining)
+
+    async def _run_with_budget(self, context: BaseContext) -> TOutput:
+        budget = self.budget(context)
+        if budget is None:
+            return await self._process_step(context)
+        try:
+            return await asyncio.wait_for(self._process_step(context), budget)
+        except asyncio.TimeoutError as e:
+            # asyncio.TimeoutError is only an alias of TimeoutError from Python 3.11.
+            raise TimeoutError(f"Step '{self.id}' timed out after {budget:.3f}s.") from e
+
     async def _process_step(self, context: BaseContext) -> TOutput:
         """Process the step. This method can be overridden by subclasses."""
         raise NotImplementedError("Subclasses must implement this method.")
\ No newline at end of file
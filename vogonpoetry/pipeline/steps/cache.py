@@ -0,0 +1,108 @@
+"""Memoization of step results."""
+import dataclasses
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Annotated, Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.tags.tag_score import TagScore
+
+CacheScope = Literal['process', 'shared']
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, TagScore):
+        # The tag serializer leaves the score out, which is what results differ by.
+        return {"id": value.id, "score": value.score}
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=_encode)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Cannot hash a value of type {type(value).__name__}, it has no stable representation.")
+
+
+def _encode(payload: Any) -> str:
+    return json.dumps(payload, sort_keys=True, default=_canonical, separators=(",", ":"))
+
+
+def content_hash(payload: Any) -> str:
+    """Hash of a JSON-like payload, independent of key order.
+
+    Models, dataclasses, sets and bytes are hashed by content; other values that JSON
+    cannot encode raise ``TypeError`` rather than being hashed by identity.
+    """
+    return hashlib.sha256(_encode(payload).encode("utf-8")).hexdigest()
+
+
+class StepCacheConfig(BaseModel):
+    """Memoization of a step's result, keyed by a hash of its declared inputs."""
+    key_fields: Annotated[list[str], Field([], description="Keys in the context data the result depends on.")]
+    include_message: Annotated[bool, Field(True, description="Whether the result depends on the latest message.")]
+    include_tools: Annotated[bool, Field(False, description="Whether the result depends on the names and descriptions of the context tools.")]
+    ttl: Annotated[Optional[float], Field(300.0, gt=0, description="Seconds a result is reused, or None to keep it until evicted.")]
+    max_entries: Annotated[int, Field(1024, gt=0, description="Maximum number of cached results.")]
+    scope: Annotated[CacheScope, Field('process', description="'process' caches per step; 'shared' shares one cache between identically configured steps, across pipelines.")]
+
+    def key(self, context: BaseContext) -> str:
+        """Content hash of the inputs declared for the step in the context."""
+        payload: dict[str, Any] = {"data": {field: context.data.get(field) for field in self.key_fields}}
+        if self.include_message:
+            message = context.latest_message
+            payload["message"] = [message.role, message.content] if message is not None else None
+        if self.include_tools:
+            payload["tools"] = [[getattr(tool, "name", None), getattr(tool, "description", None)] for tool in context.tools]
+        return content_hash(payload)
+
+
+class StepResultCache:
+    """Bounded LRU of step results with a per-entry expiry.
+
+    Cached results are returned as-is to every hit, so they must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Whether a live result is cached for the key, and the result."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() + ttl if ttl is not None else None, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+shared_step_caches: dict[str, StepResultCache] = {}
+
+
+def shared_step_cache(namespace: str, max_entries: int) -> StepResultCache:
+    """The process-wide cache for a step configuration, created on first use."""
+    cache = shared_step_caches.get(namespace)
+    if cache is None:
+        cache = shared_step_caches[namespace] = StepResultCache(max_entries)
+    return cache
@@ -0,0 +1,134 @@
+"""Parallel tool invocation step for the pipeline."""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Annotated, Any, Literal, Mapping, Optional
+
+from pydantic import BaseModel, Field
+
+from vogonpoetry.context import BaseContext
+from vogonpoetry.logging import logger
+from vogonpoetry.pipeline.steps.base import BaseStep
+
+CallStatus = Literal['ok', 'error', 'timeout', 'cancelled']
+
+
+class CallToolsOptions(BaseModel):
+    """Options for calling tools in parallel."""
+    calls_key: Annotated[str, Field(description="Key in the context data holding the tools to call, e.g. the output of filter_tools.")]
+    arguments_key: Annotated[Optional[str], Field(None, description="Key in the context data holding the arguments per namespaced tool name.")]
+    result_key: Annotated[str, Field("tool_results", description="Key in the context data the results are streamed into as they complete, keyed by call index.")]
+    separator: Annotated[str, Field(".", min_length=1, description="Separator between the server id and the tool name in namespaced tool names.")]
+    max_concurrency_per_server: Annotated[int, Field(4, gt=0, description="Maximum number of concurrent calls to one server.")]
+    timeout: Annotated[Optional[float], Field(10.0, gt=0, description="Seconds before a single call is abandoned.")]
+    deadline: Annotated[Optional[float], Field(None, gt=0, description="Seconds before all outstanding calls are cancelled.")]
+
+
+@dataclass
+class ToolCall:
+    """A tool to call on a server, with its arguments."""
+    name: str
+    server: str
+    tool: str
+    arguments: dict[str, Any]
+
+
+@dataclass
+class ToolCallResult:
+    """Outcome of a tool call."""
+    name: str
+    server: str
+    status: CallStatus
+    result: Any = None
+    error: Optional[str] = None
+    duration_ms: float = 0.0
+
+
+class CallToolsStep(BaseStep[CallToolsOptions, list[ToolCallResult]]):
+    """Pipeline step calling the selected tools in parallel through the MCP session pools.
+
+    Calls are bounded per server, each call has its own timeout and whatever is still
+    running at the deadline is cancelled. Each result is written to
+    ``context.data[result_key]`` as soon as it completes, keyed by the index of the call,
+    since the same tool may be called several times.
+    """
+    type: Literal['call_tools'] = 'call_tools'
+
+    def model_post_init(self, context: Any) -> None:
+        self._logger = logger(f"CallToolsStep-{self.id}")
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, server: str) -> asyncio.Semaphore:
+        if server not in self._semaphores:
+            self._semaphores[server] = asyncio.Semaphore(self.options.max_concurrency_per_server)
+        return self._semaphores[server]
+
+    def _resolve(self, item: Any, arguments: Mapping[str, Any]) -> ToolCall:
+        """Turn a discovered tool, or a mapping with a name and arguments, into a call."""
+        if isinstance(item, Mapping):
+            name = item["name"]
+            args = item.get("arguments")
+        else:
+            name = item.name
+            args = None
+        server = getattr(item, "server", None)
+        tool = getattr(getattr(item, "tool", None), "name", None)
+        if server is None or tool is None:
+            server, _, tool = name.partition(self.options.separator)
+            if not tool:
+                raise ValueError(f"Tool name '{name}' is not namespaced by a server.")
+        return ToolCall(name, server, tool, dict(args if args is not None else arguments.get(name, {})))
+
+    def call_timeout(self, context: BaseContext) -> Optional[float]:
+        """Seconds a call may run: the call timeout, capped by the time left until the context deadline."""
+        remaining = context.remaining()
+        if self.options.timeout is None:
+            return remaining
+        return self.options.timeout if remaining is None else min(self.options.timeout, remaining)
+
+    async def _process_step(self, context: BaseContext) -> list[ToolCallResult]:
+        """Call the tools and collect their results."""
+        items = context.data.get(self.options.calls_key) or []
+        arguments = context.data.get(self.options.arguments_key, {}) if self.options.arguments_key else {}
+        calls = [self._resolve(item, arguments) for item in items]
+        streamed: dict[int, ToolCallResult] = {}
+        context.data[self.options.result_key] = streamed
+        if not calls:
+            return []
+        tasks = [asyncio.create_task(self._call(context, index, call, streamed)) for index, call in enumerate(calls)]
+        pending = set(tasks)
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=self.options.deadline)
+            if pending:
+                self._logger.warning("Deadline reached, cancelled outstanding tool calls", cancelled=len(pending))
+        finally:
+            # Also reached when the step itself is cancelled, e.g. on its timeout or by a fork.
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [streamed[index] for index in range(len(calls))]
+
+    async def _call(self, context: BaseContext, index: int, call: ToolCall, streamed: dict[int, ToolCallResult]) -> None:
+        start = time.perf_counter()
+        outcome: ToolCallResult = ToolCallResult(call.name, call.server, 'cancelled')
+        timeout: Optional[float] = None
+        try:
+            server = context.mcp_servers.get(call.server)
+            if server is None:
+                raise ValueError(f"MCP server '{call.server}' not found in context.")
+            async with self._semaphore(call.server):
+                timeout = self.call_timeout(context)
+                result = await asyncio.wait_for(server.call_tool(call.tool, call.arguments), timeout)
+            outcome = ToolCallResult(call.name, call.server, 'ok', result=result)
+        except asyncio.TimeoutError:
+            outcome = ToolCallResult(call.name, call.server, 'timeout', error=f"Timed out after {timeout:.3f}s" if timeout is not None else "Timed out")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._logger.warning("Tool call failed", tool=call.name, error=str(e))
+            outcome = ToolCallResult(call.name, call.server, 'error', error=str(e))
+        finally:
+            outcome.duration_ms = (time.perf_counter() - start) * 1e3
+            streamed[index] = outcome
+            context.metrics.increment("tools.calls", step_id=self.id, server=call.server, status=outcome.status)
+            context.metrics.observe("tools.call_time_ms", outcome.duration_ms, step_id=self.id, server=call.server)
@@ -1,16 +1,24 @@
 """Request classification step configuration for the pipeline."""
 
+import random
 from typing import Any, Callable, Generic, Literal, MutableSequence, Optional, Sequence, Union, cast
+import numpy as np
 from pydantic import BaseModel, Field
 
 from vogonpoetry.context import BaseContext
 from vogonpoetry.embedders.base import BaseEmbedder
+from vogonpoetry.index import VectorIndex
+from vogonpoetry.index.base import IndexStats
+from vogonpoetry.index.exact import ExactVectorIndex
 from vogonpoetry.pipeline.steps.base import BaseStep
 from vogonpoetry.tags.tag import Tag
-from vogonpoetry.tags.tag_score import TagScore, cosine_similarity, process_tag
+from vogonpoetry.tags.tag_matrix import TagMatrix
+from vogonpoetry.tags.tag_score import TagScore
 from vogonpoetry.tags.tag_vector import TagVector
 from vogonpoetry.logging import logger
 from vogonpoetry.tags.utils import TagUtilities
+from vogonpoetry.utils.matcher_set import MatcherBackend, MatcherSet
+from vogonpoetry.utils.pattern_matcher import MatcherString, PatternMatcher
 
 # ----- Configuration Models -----
 
@@ -18,13 +26,27 @@ class ClassifyTagsOptions(BaseModel):
     method: Literal['tags'] = 'tags'
     tags: list[Tag] = Field(default_factory=list, description="Tags used for classification.")
 
+class HierarchyOptions(BaseModel):
+    branch_threshold: float = Field(default=0.3, description="Minimum score of a tag for its sub-tags to be scored.")
+    beam_width: Optional[int] = Field(default=None, gt=0, description="Maximum number of tags per level whose sub-tags are scored.")
+    accuracy_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="Fraction of requests also scored exhaustively to measure accuracy.")
+
 class EmbedderClassifyTagsOptions(BaseModel):
     method: Literal['embedder'] = 'embedder'
     tags: list[Tag] = Field(default_factory=list, description="Tags used for classification.")
     embedder: str = Field(description="Embedder name to use.")
     threshold: float = Field(default=0.5, description="Similarity threshold.")
+    index: VectorIndex = Field(default_factory=ExactVectorIndex, description="Vector index used to search the tags.")
+    hierarchy: Optional[HierarchyOptions] = Field(default=None, description="Score the tag tree top-down instead of searching every tag.")
+
+class KeywordClassifyTagsOptions(BaseModel):
+    method: Literal['keyword'] = 'keyword'
+    tags: list[Tag] = Field(default_factory=list, description="Tags used for classification.")
+    patterns: dict[str, list[str]] = Field(default_factory=dict, description="Keyword, glob or regex patterns per tag id, matched against the message.")
+    case_sensitive: bool = Field(default=False, description="Match the patterns case-sensitively instead of ignoring case.")
+    backend: MatcherBackend = Field(default='auto', description="Matcher backend, 'auto' uses the Rust matcher when it is installed.")
 
-ClassifyStepOptions = Union[ClassifyTagsOptions, EmbedderClassifyTagsOptions]
+ClassifyStepOptions = Union[ClassifyTagsOptions, EmbedderClassifyTagsOptions, KeywordClassifyTagsOptions]
 
 class ClassifyStep(BaseStep[ClassifyStepOptions, dict[str, TagScore]]):
     """Configuration class for classify request step with tags."""
@@ -34,7 +56,11 @@ class ClassifyStep(BaseStep[ClassifyStepOptions, dict[str, TagScore]]):
         self._logger = logger(f"ClassifyStep-{self.id}")
         self._tagConfigs = TagUtilities[Tag, Tag].gather_tags({}, self.options.tags)
         self._tag_vectors: dict[str, TagVector] = {}
+        self._tag_matrix = TagMatrix([])
         self._embedder: Optional[BaseEmbedder] = None
+        self._hierarchy_stats = IndexStats()
+        self._keyword_tags: list[str] = []
+        self._keyword_matchers: Optional[MatcherSet] = None
 
     async def initialize(self, context: BaseContext) -> None:
         """Initialize the step."""
@@ -42,14 +68,30 @@ class ClassifyStep(BaseStep[ClassifyStepOptions, dict[str, TagScore]]):
             self._logger.info("Initializing classify request step with tags", tags=TagUtilities[Tag, Tag].gather_tags({}, [t for t in self.options.tags]))
             self._tag_vectors = TagUtilities.vectored_tag_map(self.options.tags, lambda _: [])
             return await super().initialize(context)
+        elif self.options.method == "keyword":
+            matchers = [
+                (tag_id, PatternMatcher(pattern=MatcherString(pattern)))
+                for tag_id, patterns in self.options.patterns.items()
+                for pattern in patterns
+            ]
+            self._keyword_tags = [tag_id for tag_id, _ in matchers]
+            self._keyword_matchers = MatcherSet(
+                [matcher for _, matcher in matchers], backend=self.options.backend, case_sensitive=self.options.case_sensitive
+            )
+            self._logger.info("Initializing classify request step with keywords", patterns=len(matchers), backend=self._keyword_matchers.backend)
+            return await super().initialize(context)
         elif self.options.embedder is not None and self.options.embedder in context.embedders:
             self._embedder = context.embedders[self.options.embedder]
             self._logger.info("Initializing classify request step with embedder %s", self._embedder.name)
             try:
                 self._logger.debug("Initializing classify request step with embedder %s", self._embedder.name)
-                keys = list(self._tag_vectors.keys())
-                vectors = await self._embedder.embed([self._tag_vectors[t].description for t in keys]) # type: ignore
-                self._tag_vectors = {k: TagVector(vector=list(vector), **self._tag_vectors[k].model_dump()) for k, vector in zip(keys, vectors)}
+                tag_vectors = TagUtilities.vectored_tag_map(self.options.tags, lambda _: [])
+                keys = list(tag_vectors.keys())
+                vectors = await self._embedder.embed([tag_vectors[t].description for t in keys], persist=True) # type: ignore
+                for k, vector in zip(keys, vectors):
+                    tag_vectors[k].vector = list(vector)
+                self._tag_vectors = tag_vectors
+                self._tag_matrix = TagMatrix(list(tag_vectors.values()), self.options.index)
                 self._logger.info("Initialization completed successfully.")
                 return await super().initialize(context)
             except Exception as e:
@@ -61,6 +103,8 @@ class ClassifyStep(BaseStep[ClassifyStepOptions, dict[str, TagScore]]):
         """Classify the request using the configured method."""
         if self.options.method == "tags":  # Yield control to the event loop
             return TagUtilities[Tag, TagScore].scored_tag_map(self.options.tags, lambda _: 1.0)
+        elif self.options.method == "keyword" and self._keyword_matchers is not None:
+            return self._classify_keywords(context)
         elif self.options.method == "embedder" and self._embedder is not None:
             latest_message = context.latest_message
             if latest_message is None or not latest_message.content:
@@ -72,16 +116,12 @@ class ClassifyStep(BaseStep[ClassifyStepOptions, dict[str, TagScore]]):
                 return {}
             try:
                 self._logger.debug("Classifying using embedder %s", self._embedder.name)
-                vector = await self._embedder.embed([content])
-                scores: dict[str, TagScore] = {
-                    id: t
-                    for id, t
-                    in TagUtilities[TagVector, TagScore].scored_tag_map(
-                        list(self._tag_vectors.values()),
-                        lambda t: cosine_similarity(cast(TagVector, t).vector, list(vector[0]))
-                    ).items()
-                    if t.score > self.options.threshold
-                }
+                vector = await context.embed(self._embedder, content)
+                if self.options.hierarchy is not None:
+                    scores = self._score_hierarchical(context, vector, self.options.hierarchy)
+                else:
+                    with context.metrics.timer("index.search_time", step_id=self.id, index=self.options.index.type):
+                        scores = self._tag_matrix.score_tags(vector, self.options.threshold)
 
                 for tag in scores.values():
                     if tag.parent is not None and tag.score * 0.8 > tag.parent.score:
@@ -94,3 +134,40 @@ class ClassifyStep(BaseStep[ClassifyStepOptions, dict[str, TagScore]]):
         else:
             self._logger.error("Invalid method or embedder not found.", context=context)
             raise ValueError("Invalid method or embedder not found.")
+
+    def _classify_keywords(self, context: BaseContext) -> dict[str, TagScore]:
+        """Score the tags whose patterns match the latest message."""
+        assert self._keyword_matchers is not None
+        latest_message = context.latest_message
+        if latest_message is None or not latest_message.content or not isinstance(latest_message.content, str):
+            self._logger.warning("No latest message content found in context.")
+            return {}
+        with context.metrics.timer("classify.keyword_time", step_id=self.id, backend=self._keyword_matchers.backend):
+            matched = {self._keyword_tags[i] for i in self._keyword_matchers.which(latest_message.content)}
+        if not matched:
+            return {}
+        scores = TagUtilities[Tag, TagScore].scored_tag_map(self.options.tags, lambda tag: 1.0 if tag.id in matched else 0.0)
+        for tag_id in matched:
+            tag = scores.get(tag_id)
+            if tag is not None and tag.parent is not None and tag.score * 0.8 > tag.parent.score:
+                tag.parent.score = tag.score * 0.8
+        return {tag_id: scores[tag_id] for tag_id in matched if tag_id in scores}
+
+    def _score_hierarchical(self, context: BaseContext, vector: Sequence[float], hierarchy: HierarchyOptions) -> dict[str, TagScore]:
+        """Score the tags top-down, sampling the accuracy against exhaustive scoring."""
+        with context.metrics.timer("classify.hierarchical_time", step_id=self.id):
+            scores = self._tag_matrix.score_tags_hierarchical(
+                vector,
+                self.options.threshold,
+                hierarchy.branch_threshold,
+                hierarchy.beam_width,
+            )
+        if hierarchy.accuracy_sample_rate and random.random() < hierarchy.accuracy_sample_rate:
+            all_scores = self._tag_matrix.scores(vector)
+            expected = {self._tag_matrix.ids[i] for i in np.flatnonzero(all_scores > self.options.threshold)}
+            recall = len(expected & scores.keys()) / len(expected) if expected else 1.0
+            self._hierarchy_stats.recall_samples += 1
+            self._hierarchy_stats.recall_total += recall
+            context.metrics.observe("classify.hierarchical_recall", recall, step_id=self.id)
+            self._logger.debug("Hierarchical classification accuracy", recall=recall, mean_recall=self._hierarchy_stats.recall)
+        return scores
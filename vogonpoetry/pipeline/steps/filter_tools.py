@@ -1,20 +1,32 @@
-from typing import Annotated, Any, Literal, Sequence, Union
+from typing import TYPE_CHECKING, Annotated, Any, Literal, Optional, Sequence, Union
 from pydantic import BaseModel, Field
 from vogonpoetry.context import BaseContext
 from vogonpoetry.embedders import Embedder
+from vogonpoetry.index import VectorIndex
+from vogonpoetry.index.exact import ExactVectorIndex
+from vogonpoetry.index.tags import TagToolIndex, tag_weights
+from vogonpoetry.index.tools import ToolVectorIndex, default_tool_key
+from vogonpoetry.mcp.catalog import CatalogDiff
+from vogonpoetry.metrics import MetricsCollection
 from vogonpoetry.pipeline.steps.base import BaseStep
-from vogonpoetry.tags.tag_score import cosine_similarity
+
+if TYPE_CHECKING:
+    from vogonpoetry.mcp.discovery import ToolDiscovery
 
 class ContextTagFilterOptions(BaseModel):
     """Options for filtering tools based on context tags."""
     type: Literal['context_tag'] = 'context_tag'
     context_key: Annotated[str, Field(description="Key in the context to retrieve tags for filtering.")]
+    mode: Annotated[Literal['any', 'weighted'], Field('any', description="Keep tools carrying any of the tags, or rank them by the summed scores of their matching tags.")]
+    min_score: Annotated[float, Field(0.0, description="Minimum summed tag score for a tool to be kept in weighted mode.")]
+    top_k: Annotated[Optional[int], Field(None, gt=0, description="Maximum number of tools kept in weighted mode.")]
 
 class EmbedderSimilarityFilterOptions(BaseModel):
     """Options for filtering tools based on embedder similarity."""
     type: Literal['embedder_similarity'] = 'embedder_similarity'
     embedder: Annotated[str, Field(description="Key in the context to retrieve the embedder for similarity calculation.")]
     threshold: Annotated[float, Field(description="Similarity threshold for filtering tools.")]
+    index: Annotated[VectorIndex, Field(default_factory=ExactVectorIndex, description="Vector index used to search the tools.")]
 
 FilterToolsOptions = Annotated[
     Union[
@@ -29,16 +41,48 @@ class FilterToolsStep(BaseStep[FilterToolsOptions, Sequence[Any]]):
     """Pipeline step for filtering tools based on specified criteria."""
     type: Literal['filter_tools'] = 'filter_tools'
 
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        self._tool_index = ToolVectorIndex(self.options.index) if self.options.type == 'embedder_similarity' else None
+        self._tag_index = TagToolIndex() if self.options.type == 'context_tag' else None
+        self._embedder: Optional[Embedder] = None
+        self._following = False
+
     async def initialize(self, context: Any) -> Any:
         """Initialize the step."""
         self._logger.info("Initializing filter tools step", options=self.options)
+        if self._tag_index is not None and context.tools:
+            self._tag_index.update(context.tools)
         if self.options.type == 'embedder_similarity':
             embedder_key = self.options.embedder
             if embedder_key not in context.embedders:
                 raise ValueError(f"Embedder '{embedder_key}' not found in context.")
-            self._embedder: Embedder = context.embedders[embedder_key]
+            self._embedder = context.embedders[embedder_key]
+            if self._tool_index is not None and context.tools:
+                # Embed the known catalog up front so requests only embed the message.
+                await self._tool_index.update(self._embedder, context.tools, context.metrics)
         return await super().initialize(context)
 
+    async def follow(self, discovery: "ToolDiscovery", metrics: Optional[MetricsCollection] = None) -> None:
+        """Keep the indexes in line with the discovered tools through the catalog diffs.
+
+        Once following, requests no longer sync the indexes with the tools they carry.
+        """
+        discovery.subscribe(self.apply_catalog_diff)
+        self._following = True
+        # Catch up with changes discovered before subscribing.
+        if self._tag_index is not None:
+            self._tag_index.update(discovery.tools)
+        if self._tool_index is not None and self._embedder is not None:
+            await self._tool_index.update(self._embedder, discovery.tools, metrics)
+
+    async def apply_catalog_diff(self, diff: CatalogDiff[Any]) -> None:
+        """Apply a diff of the tool catalog to the indexes."""
+        if self._tag_index is not None:
+            self._tag_index.apply(diff)
+        if self._tool_index is not None and self._embedder is not None:
+            await self._tool_index.apply(self._embedder, diff)
+
     async def _process_step(self, context: BaseContext) -> Sequence[Any]:
         """Run the filter tools step."""
         self._logger.info("Running filter tools step", options=self.options)
@@ -49,24 +93,32 @@ class FilterToolsStep(BaseStep[FilterToolsOptions, Sequence[Any]]):
             context_key = self.options.context_key
             if context_key not in context.data:
                 raise ValueError(f"Context key '{context_key}' not found in context.")
-            tags = context.data[context_key]
-            # Implement filtering logic based on tags
-            filtered_tools = [tool for tool in context.tools if any(tag in tool.tags for tag in tags)]
-            return filtered_tools
+            if self._tag_index is None:
+                self._tag_index = TagToolIndex()
+            if not self._following:
+                # No-op unless the catalog changed since it was indexed.
+                self._tag_index.update(context.tools)
+            weights = tag_weights(context.data[context_key])
+            if self.options.mode == 'any':
+                return self._tag_index.match(weights)
+            ranked = [tool for tool, score in self._tag_index.score(weights) if score >= self.options.min_score]
+            return ranked[:self.options.top_k] if self.options.top_k else ranked
         elif self.options.type == 'embedder_similarity':
             if context.latest_message is None or context.latest_message.content is None:
                 self._logger.warning("No latest message or content found in context.")
                 return []
             threshold = self.options.threshold
-            tools = context.data.get('tools', [])
-            texts = [tool.description for tool in tools]
-            texts.append(context.latest_message.content)
-            vectors = await self._embedder.embed(texts)
-            print(f"Vectors: {vectors}")
-            print(f"Tools: {tools}")
-            return [
-                tool for tool, vector in zip(tools, vectors[:-1])
-                if cosine_similarity(list(vector), list(vectors[-1])) >= threshold
-            ]
+            tools = context.tools
+            if self._tool_index is None:
+                self._tool_index = ToolVectorIndex(self.options.index)
+            if self._embedder is None:
+                raise ValueError("Filter tools step used before it was initialized.")
+            if not self._following:
+                # Only new tools or tools whose description changed are embedded.
+                await self._tool_index.update(self._embedder, tools, context.metrics)
+            message_vector = await context.embed(self._embedder, context.latest_message.content)
+            with context.metrics.timer("index.search_time", step_id=self.id, index=self.options.index.type):
+                matched = set(self._tool_index.search(message_vector, threshold))
+            return [tool for tool in tools if default_tool_key(tool) in matched]
         else:
             raise ValueError(f"Unknown filter type: {self.options.type}")
\ No newline at end of file
@@ -1,9 +1,9 @@
 """Fork step configuration for the Vogon Poetry project."""
 from __future__ import annotations
 import asyncio
-from typing import Annotated, Any, Literal, Sequence, TypeVar, Union
+from typing import Annotated, Any, Literal, Optional, Sequence, TypeVar, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from vogonpoetry.context import BaseContext
 from vogonpoetry.pipeline import steps
 from vogonpoetry.pipeline.steps.base import BaseStep
@@ -19,10 +19,30 @@ PipelineStep = Annotated[
 
 
 MergeStrategy = Literal['concatenate'] | Literal['replace'] | Literal['prefix']
+ContextMergeStrategy = Literal['overwrite', 'deep_merge', 'prefix_keys']
+ForkCompletion = Literal['all', 'first_completed', 'quorum']
 
 class BaseForkStepOptions(BaseModel):
     """Options for the fork step in the pipeline."""
     steps: Annotated[Sequence['PipelineStep'], Field(description="List of steps to execute in parallel after the fork.")] # type: ignore
+    context_merge: Annotated[ContextMergeStrategy, Field('overwrite', description="Strategy to merge the context data written by each completed branch back once the fork ends.")]
+    completion: Annotated[ForkCompletion, Field('all', description="When the fork ends: once all branches, the first branch or 'quorum' branches completed; the remaining branches are cancelled.")]
+    quorum: Annotated[Optional[int], Field(None, gt=0, description="Number of branches to wait for with completion 'quorum'.")]
+
+    @model_validator(mode="after")
+    def _check_quorum(self) -> "BaseForkStepOptions":
+        if self.completion == 'quorum' and (self.quorum is None or self.quorum > len(self.steps)):
+            raise ValueError(f"Completion 'quorum' needs a quorum between 1 and the number of steps ({len(self.steps)}).")
+        return self
+
+    @property
+    def required(self) -> int:
+        """Number of branches that must complete for the fork to end."""
+        if self.completion == 'first_completed':
+            return min(1, len(self.steps))
+        if self.completion == 'quorum' and self.quorum is not None:
+            return self.quorum
+        return len(self.steps)
 
 class ConcatenateStepOptions(BaseForkStepOptions):
     """Options for concatenating results from parallel steps."""
@@ -66,31 +86,68 @@ class ForkStep(BaseStep[ForkStepOptions, Any]):
     async def _process_step(self, context: BaseContext) -> Any:
         """Process the fork step."""
         self._logger.info("Processing fork step", steps=len(self.options.steps))
-        results = await asyncio.gather(*[
-            step.execute(context)
-            for step in self.options.steps
-        ])
-        return await self.merge_results(results)
-
-
-    async def merge_results(self, results: Sequence[Any]) -> Any:
+        # Each branch writes to its own copy-on-write view of the data instead of racing on the shared one.
+        branches = [context.branch() for _ in self.options.steps]
+        skipped = [i for i, (step, branch) in enumerate(zip(self.options.steps, branches)) if step.should_skip(branch)]
+        # Skipped branches neither run nor count towards completion; executing them only records the skip.
+        for i in skipped:
+            await self.options.steps[i].execute(branches[i])
+        tasks = {
+            asyncio.create_task(step.execute(branch)): i
+            for i, (step, branch) in enumerate(zip(self.options.steps, branches))
+            if i not in skipped
+        }
+        required = min(self.options.required, len(tasks))
+        completed: dict[int, Any] = {}
+        pending = set(tasks)
+        try:
+            while pending and len(completed) < required:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                errors = []
+                for task in done:
+                    if task.exception() is None:
+                        completed[tasks[task]] = task.result()
+                    else:
+                        errors.append(task.exception())
+                if errors and len(completed) + len(pending) < required:
+                    raise errors[0]
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            self._logger.info("Cancelled remaining branches", completion=self.options.completion, cancelled=len(pending))
+        # Writes of cancelled or failed branches are discarded with their views.
+        merged = sorted([*completed, *skipped])
+        context.merge(*[branches[i] for i in merged], strategy=self.options.context_merge, indices=merged)
+        indices = sorted(completed)
+        return await self.merge_results([completed[i] for i in indices], [self.options.steps[i] for i in indices])
+
+
+    async def merge_results(self, results: Sequence[Any], steps: Optional[Sequence[Any]] = None) -> Any:
+        """Merge the results of the branches, ``steps`` being the steps that produced them."""
+        steps = self.options.steps if steps is None else steps
+        # Branches without a result, e.g. skipped by their condition, have nothing to merge.
+        kept = [(step, result) for step, result in zip(steps, results) if result is not None]
         self._logger.info("Merging results from forked steps", strategy=self.options.merge_strategy, results=results)
         if self.options.merge_strategy == "concatenate":
             merged = {}
-            for result in results:
+            for _, result in kept:
                 for k, v in result.items():
                     merged.setdefault(k, []).append(v)
             return merged
 
         elif self.options.merge_strategy == "replace":
+            # Fallback keys follow the branch position, not the position among the merged results.
+            positions = {step.id: i for i, step in enumerate(self.options.steps)}
             return {
-                step.output_key or f"step_{i}": result
-                for i, (step, result) in enumerate(zip(self.options.steps, results))
+                step.output_key or f"step_{positions.get(step.id, i)}": result
+                for i, (step, result) in enumerate(kept)
             }
 
         elif self.options.merge_strategy == "prefix":
             merged = {}
-            for result in results:
+            for _, result in kept:
                 for k, v in result.items():
                     merged[f"{self.options.prefix}{k}"] = v
             return merged
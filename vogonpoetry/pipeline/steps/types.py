@@ -1,7 +1,8 @@
 """Types for pipeline steps in the Vogon Poetry project."""
 from typing import Annotated, Union
 
-from tests.pipeline.steps.test_fork import DummyStep
+from vogonpoetry.pipeline.steps.dummy import DummyStep
+from vogonpoetry.pipeline.steps.call_tools import CallToolsStep
 from vogonpoetry.pipeline.steps.classify import ClassifyStep
 from vogonpoetry.pipeline.steps.filter_tools import FilterToolsStep
 from vogonpoetry.pipeline.steps.merge_prompts import MergePromptsStep
@@ -11,5 +12,6 @@ PipelineStep = Union[
     ClassifyStep,
     MergePromptsStep,
     FilterToolsStep,
+    CallToolsStep,
     DummyStep,
 ]
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Vectorized tag scoring for the pipeline."""
+from typing import Optional, Sequence
+
+import numpy as np
+
+from vogonpoetry.index.base import BaseVectorIndex, normalize
+from vogonpoetry.index.exact import ExactVectorIndex
+from vogonpoetry.tags.tag_score import TagScore
+from vogonpoetry.tags.tag_vector import TagVector
+
+
+class TagMatrix:
+    """Pre-normalized, contiguous float32 matrix of tag vectors.
+
+    Scoring a query against every tag is a single matrix-vector product, which
+    equals the cosine similarity of the query with each tag. Thresholded lookups go
+    through the configured vector index, which may be approximate.
+    """
+
+    def __init__(self, tags: Sequence[TagVector], index: Optional[BaseVectorIndex] = None):
+        self.tags: list[TagVector] = list(tags)
+        self.ids: list[str] = [tag.id for tag in self.tags]
+        self._index: dict[str, int] = {tag_id: i for i, tag_id in enumerate(self.ids)}
+        self.parents = np.array(
+            [self._index.get(tag.parent.id, -1) if tag.parent else -1 for tag in self.tags],
+            dtype=np.int32,
+        )
+        self.roots = np.flatnonzero(self.parents < 0)
+        order = np.argsort(self.parents, kind="stable")
+        bounds = np.searchsorted(self.parents[order], np.arange(len(self.tags) + 1))
+        self.children: list[np.ndarray] = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.tags))]
+        if self.tags:
+            self.matrix = normalize(np.asarray([tag.vector for tag in self.tags], dtype=np.float32))
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.index = index if index is not None else ExactVectorIndex()
+        self.index.build(self.matrix)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def index_of(self, tag_id: str) -> Optional[int]:
+        """Get the row index of a tag, if present."""
+        return self._index.get(tag_id)
+
+    def scores(self, vector: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of the query vector with every tag."""
+        if not self.tags:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ normalize(np.asarray(vector, dtype=np.float32))
+
+    def above(self, vector: Sequence[float], threshold: float) -> tuple[np.ndarray, np.ndarray]:
+        """Get the indices and scores of the tags scoring strictly above the threshold."""
+        if not self.tags:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices, scores = self.index.search(normalize(np.asarray(vector, dtype=np.float32)), threshold=threshold)
+        order = np.argsort(indices)
+        return indices[order], scores[order]
+
+    def score_tags(self, vector: Sequence[float], threshold: float) -> dict[str, TagScore]:
+        """Score the query against all tags, materializing only the tags above the threshold.
+
+        Ancestors of surviving tags are materialized as well so the parent links stay
+        intact, but they are only part of the result if they pass the threshold themselves.
+        """
+        indices, scores = self.above(vector, threshold)
+        if not len(indices):
+            return {}
+        return self._materialize(
+            indices.tolist(),
+            dict(zip(indices.tolist(), scores.tolist())),
+            normalize(np.asarray(vector, dtype=np.float32)),
+        )
+
+    def score_tags_hierarchical(
+        self,
+        vector: Sequence[float],
+        threshold: float,
+        branch_threshold: float,
+        beam_width: Optional[int] = None,
+    ) -> dict[str, TagScore]:
+        """Score the tag tree top-down, only descending into promising subtrees.
+
+        Each level is scored with one matrix-vector product. Only the children of tags
+        scoring above ``branch_threshold`` (at most the ``beam_width`` best per level) are
+        scored next, so the cost follows depth times branching rather than catalog size.
+        """
+        if not self.tags:
+            return {}
+        query = normalize(np.asarray(vector, dtype=np.float32))
+        known: dict[int, float] = {}
+        selected: list[int] = []
+        level = self.roots
+        while len(level):
+            scores = self.matrix[level] @ query
+            known.update(zip(level.tolist(), scores.tolist()))
+            selected.extend(level[scores > threshold].tolist())
+            expand = np.flatnonzero(scores > branch_threshold)
+            if beam_width is not None and len(expand) > beam_width:
+                expand = expand[np.argpartition(-scores[expand], beam_width - 1)[:beam_width]]
+            children = [self.children[i] for i in level[expand].tolist() if len(self.children[i])]
+            level = np.concatenate(children) if children else np.zeros(0, dtype=np.int64)
+        return self._materialize(sorted(selected), known, query)
+
+    def _materialize(self, indices: list[int], known: dict[int, float], query: np.ndarray) -> dict[str, TagScore]:
+        materialized: dict[int, TagScore] = {}
+
+        def materialize(i: int) -> TagScore:
+            if i in materialized:
+                return materialized[i]
+            tag = self.tags[i]
+            # Ancestors outside the search results are scored individually.
+            score = known[i] if i in known else float(self.matrix[i] @ query)
+            scored = TagScore.model_construct(
+                id=tag.id,
+                name=tag.name,
+                description=tag.description,
+                score=score,
+                parent=None,
+                sub_tags=None,
+            )
+            materialized[i] = scored
+            parent_index = int(self.parents[i])
+            if parent_index >= 0:
+                parent = materialize(parent_index)
+                if parent.sub_tags is None:
+                    parent.sub_tags = []
+                parent.sub_tags.append(scored)
+                scored.parent = parent
+            return scored
+
+        return {self.ids[i]: materialize(i) for i in indices}
@@ -0,0 +1,113 @@
+"""Restricted, precompiled expressions for step conditions."""
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+COMPARISONS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+
+class Condition:
+    """A condition over the context data, parsed and compiled once.
+
+    Only literals, context lookups (``name``, ``name["key"]``, ``name[0]``), comparisons,
+    ``and``/``or``/``not`` and unary minus are allowed; anything else, such as calls or
+    attribute access, is rejected when the condition is compiled. ``keys`` holds the
+    top-level context keys the condition reads.
+
+    Evaluating a condition whose keys are missing raises ``KeyError``.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid condition '{expression}': {e.msg}") from e
+        self.keys: frozenset[str] = frozenset(
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+        )
+        self._evaluate = self._compile(tree.body)
+
+    def __call__(self, data: Mapping[str, Any]) -> bool:
+        return bool(self._evaluate(data))
+
+    def ready(self, data: Mapping[str, Any]) -> bool:
+        """Whether all the keys the condition reads are in the data."""
+        return all(key in data for key in self.keys)
+
+    def __repr__(self) -> str:
+        return f"Condition({self.expression!r})"
+
+    def _compile(self, node: ast.AST) -> Evaluator:
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return lambda data: value
+        if isinstance(node, ast.Name):
+            key = node.id
+            return lambda data: data[key]
+        if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant):
+            container = self._compile(node.value)
+            index = node.slice.value
+            return lambda data: container(data)[index]
+        if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+            items = [self._compile(item) for item in node.elts]
+            return lambda data: tuple(item(data) for item in items)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda data: not operand(data)
+            return lambda data: -operand(data)
+        if isinstance(node, ast.BoolOp):
+            values = [self._compile(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                def all_of(data: Mapping[str, Any]) -> Any:
+                    result = None
+                    for value in values:
+                        result = value(data)
+                        if not result:
+                            return result
+                    return result
+                return all_of
+
+            def any_of(data: Mapping[str, Any]) -> Any:
+                result = None
+                for value in values:
+                    result = value(data)
+                    if result:
+                        return result
+                return result
+            return any_of
+        if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+            left = self._compile(node.left)
+            comparators = [(COMPARISONS[type(op)], self._compile(right)) for op, right in zip(node.ops, node.comparators)]
+
+            def compare(data: Mapping[str, Any]) -> bool:
+                current = left(data)
+                for compare_op, right in comparators:
+                    value = right(data)
+                    if not compare_op(current, value):
+                        return False
+                    current = value
+                return True
+            return compare
+        raise ValueError(f"Unsupported expression in condition '{self.expression}': {ast.unparse(node)}")
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(expression: str) -> Condition:
+    """Compile a condition, reusing the compiled condition for repeated expressions."""
+    return Condition(expression)
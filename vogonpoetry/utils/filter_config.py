@@ -1,6 +1,7 @@
-from typing import Any, Callable, Generic, TypeVar, Optional, MutableSequence
+from typing import Any, Callable, Generic, TypeVar, Optional, MutableSequence, Sequence
 from pydantic import BaseModel, Field, model_validator
 
+from vogonpoetry.utils.matcher_set import MatcherBackend, MatcherSet
 from vogonpoetry.utils.pattern_matcher import PatternMatcher
 
 T = TypeVar('T')
@@ -11,6 +12,7 @@ def default_prop_fn(item: Any) -> str:
 class FilterConfig(BaseModel):
     whitelist: Optional[MutableSequence[PatternMatcher]] = Field(default=None, description="Allowlist patterns.")
     blacklist: Optional[MutableSequence[PatternMatcher]] = Field(default=None, description="Blocklist patterns.")
+    backend: MatcherBackend = Field(default='auto', description="Matcher backend, 'auto' uses the Rust matcher when it is installed.")
 
     @model_validator(mode="after")
     def check_exclusive_fields(self) -> "FilterConfig":
@@ -18,17 +20,41 @@ class FilterConfig(BaseModel):
             raise ValueError("Only one of 'whitelist' or 'blacklist' can be set, not both.")
         return self
     
-    def filter(self, items: MutableSequence[T], prop_fn: Callable[[T], str] = default_prop_fn) -> MutableSequence[T]:
+    def model_post_init(self, __context: Any) -> None:
+        self._matchers = MatcherSet(self.whitelist or self.blacklist or [], backend=self.backend)
+
+    def keeps(self, value: str) -> bool:
+        """Whether a value passes the filter."""
         if self.whitelist:
-            return [item for item in items if any(matcher.matches(prop_fn(item)) for matcher in self.whitelist)]
+            return self._matchers.matches(value)
         elif self.blacklist:
-            return [item for item in items if not any(matcher.matches(prop_fn(item)) for matcher in self.blacklist)]
+            return not self._matchers.matches(value)
         else:
+            return True
+
+    def keeps_many(self, values: Sequence[str]) -> list[bool]:
+        """Whether each value passes the filter, matched as one batch."""
+        if self.whitelist:
+            return self._matchers.matches_many(values)
+        elif self.blacklist:
+            return [not verdict for verdict in self._matchers.matches_many(values)]
+        else:
+            return [True] * len(values)
+
+    def filter(self, items: MutableSequence[T], prop_fn: Callable[[T], str] = default_prop_fn) -> MutableSequence[T]:
+        if not self.whitelist and not self.blacklist:
             return items
+        return [item for item in items if self.keeps(prop_fn(item))]
 
 class FilterUtility(Generic[T]):
     @staticmethod
     def filter_items(filters: MutableSequence[FilterConfig], items: MutableSequence[T], prop_fn: Callable[[T], str] = default_prop_fn) -> MutableSequence[T]:
-        for filter_config in filters:
-            items = filter_config.filter(items, prop_fn)
-        return items
\ No newline at end of file
+        active = [filter_config for filter_config in filters if filter_config.whitelist or filter_config.blacklist]
+        if not active:
+            return items
+        # Each filter matches the names still kept as one batch, answering repeats from its memo.
+        kept = list(zip([prop_fn(item) for item in items], items))
+        for filter_config in active:
+            verdicts = filter_config.keeps_many([name for name, _ in kept])
+            kept = [entry for entry, verdict in zip(kept, verdicts) if verdict]
+        return [item for _, item in kept]
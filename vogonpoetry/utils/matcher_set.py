@@ -0,0 +1,147 @@
+import re
+from collections import OrderedDict
+from typing import Any, Literal, Optional, Sequence
+
+from vogonpoetry.utils.pattern_matcher import MatchMode, PatternMatcher
+
+try:
+    from rust_tag_matcher import CompiledMatcher  # type: ignore[import-not-found]
+except ImportError:
+    CompiledMatcher = None
+
+MatcherBackend = Literal['auto', 'python', 'rust']
+
+RUST_KINDS = {MatchMode.regex: "regex", MatchMode.glob: "glob", MatchMode.snake: "literal"}
+
+
+def rust_available() -> bool:
+    return CompiledMatcher is not None
+
+
+class MatcherSet:
+    """A set of pattern matchers compiled into a single regex.
+
+    Regexes are searched as-is, globs are anchored at the start (their translation is
+    already anchored at the end) and snake case literals are escaped, all joined into one
+    alternation so a value is tested in a single scan. Regexes with capture groups are
+    kept apart, since joining them would renumber backreferences or clash group names.
+    Verdicts are memoized per value, up to ``max_entries``. With ``case_sensitive`` off,
+    every pattern is compiled to ignore case.
+
+    With the ``rust_tag_matcher`` extension installed, the patterns are compiled into its
+    ``CompiledMatcher`` instead (backend ``auto`` or ``rust``) and batches are matched
+    without holding the GIL. ``auto`` falls back to Python for patterns the Rust regex
+    engine does not support, such as lookarounds.
+    """
+
+    def __init__(
+        self,
+        matchers: Sequence[PatternMatcher],
+        max_entries: int = 4096,
+        backend: MatcherBackend = 'auto',
+        case_sensitive: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.case_sensitive = case_sensitive
+        self._matchers = list(matchers)
+        self._memo: OrderedDict[str, bool] = OrderedDict()
+        self._rust = self._compile_rust(backend)
+        flags = 0 if case_sensitive else re.IGNORECASE
+        parts: list[str] = []
+        self._patterns: list[re.Pattern[str]] = []
+        self._separate: list[re.Pattern[str]] = []
+        if self._rust is None:
+            for matcher in self._matchers:
+                mode, source = matcher.compiled_source
+                if mode == MatchMode.snake:
+                    part = re.escape(source)
+                elif mode == MatchMode.glob:
+                    part = rf"\A(?:{source})"
+                else:
+                    part = f"(?:{source})"
+                joinable = mode != MatchMode.regex or self._joinable(source)
+                pattern = re.compile(part if joinable else source, flags)
+                self._patterns.append(pattern)
+                if joinable:
+                    parts.append(part)
+                else:
+                    self._separate.append(pattern)
+        self._regex = re.compile("|".join(parts), flags) if parts else None
+
+    @property
+    def backend(self) -> str:
+        return 'rust' if self._rust is not None else 'python'
+
+    def _compile_rust(self, backend: MatcherBackend) -> Optional[Any]:
+        if backend == 'python' or not self._matchers:
+            return None
+        if CompiledMatcher is None:
+            if backend == 'rust':
+                raise RuntimeError("The rust_tag_matcher extension is not installed.")
+            return None
+        patterns, kinds = [], []
+        for matcher in self._matchers:
+            mode, source = matcher.compiled_source
+            # Globs go to Rust as written, not as their Python regex translation.
+            patterns.append(matcher.pattern if mode == MatchMode.glob else source)
+            kinds.append(RUST_KINDS[mode])
+        try:
+            return CompiledMatcher(patterns, kinds, case_sensitive=self.case_sensitive)
+        except ValueError:
+            if backend == 'rust':
+                raise
+            return None
+
+    @staticmethod
+    def _joinable(source: str) -> bool:
+        try:
+            # Global inline flags are only valid at the start of a whole pattern.
+            return re.compile(f"(?:{source})").groups == 0
+        except re.error:
+            return False
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def _match(self, value: str) -> bool:
+        if self._rust is not None:
+            return self._rust.is_match(value)
+        return (self._regex is not None and self._regex.search(value) is not None) or any(
+            pattern.search(value) is not None for pattern in self._separate
+        )
+
+    def _remember(self, value: str, verdict: bool) -> None:
+        self._memo[value] = verdict
+        if len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+
+    def matches(self, value: str) -> bool:
+        """Whether any of the matchers matches the value."""
+        verdict = self._memo.get(value)
+        if verdict is not None:
+            self._memo.move_to_end(value)
+            return verdict
+        verdict = self._match(value)
+        self._remember(value, verdict)
+        return verdict
+
+    def matches_many(self, values: Sequence[str]) -> list[bool]:
+        """Whether any of the matchers matches each value, matching the unseen values as one batch."""
+        misses = list(dict.fromkeys(value for value in values if value not in self._memo))
+        if misses:
+            if self._rust is not None:
+                verdicts = self._rust.is_match_batch(misses)
+            else:
+                verdicts = [self._match(value) for value in misses]
+            fresh = dict(zip(misses, verdicts))
+            for value, verdict in fresh.items():
+                self._remember(value, verdict)
+        else:
+            fresh = {}
+        return [fresh[value] if value in fresh else self.matches(value) for value in values]
+
+    def which(self, value: str) -> list[int]:
+        """Indices of the matchers matching the value."""
+        if self._rust is not None:
+            return list(self._rust.matches(value))
+        return [i for i, pattern in enumerate(self._patterns) if pattern.search(value) is not None]
@@ -28,22 +28,34 @@ class PatternMatcher(BaseModel):
         self._matcher = self._build_matcher(self.pattern)
 
     def _build_matcher(self, value: str) -> Matcher:
+        kind, source = self.compiled_source
+        if kind == MatchMode.snake:
+            return lambda s: value in s
+        regex = re.compile(source)
+        if kind == MatchMode.glob:
+            return lambda s: regex.match(s) is not None
+        return lambda s: regex.search(s) is not None
+
+    @property
+    def mode(self) -> str:
+        return self.compiled_source[0]
+
+    @property
+    def compiled_source(self) -> tuple[str, str]:
+        """The match mode and the regex source (or literal, for snake case) the pattern compiles to."""
+        value = self.pattern
         if value.startswith("r'") or value.startswith('r"'):
             # Regex pattern
-            pattern = value[2:-1]
-            regex = re.compile(pattern)
-            return lambda s: regex.search(s) is not None
+            return MatchMode.regex, value[2:-1]
         elif value.startswith("/") and value.endswith("/"):
             # Regex pattern with slashes
-            pattern = value[1:-1]
-            regex = re.compile(pattern)
-            return lambda s: regex.search(s) is not None
+            return MatchMode.regex, value[1:-1]
         elif "*" in value or "?" in value or "[" in value:
-            # Glob pattern
-            return lambda s: fnmatch.fnmatch(s, value)
+            # Glob pattern, translated once instead of on every fnmatch call
+            return MatchMode.glob, fnmatch.translate(value)
         else:
             # Snake case match
-            return lambda s: value in s
-        
+            return MatchMode.snake, value
+
     def matches(self, value: str) -> bool:
-        return self._matcher(value)
\ No newline at end of file
+        return self._matcher(value)